@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     
     # Banco de Dados
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str = ""  # Opcional; derivado de DATABASE_URL (asyncpg)
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
     DB_NAME: str = "fala_comigo_db"
@@ -23,6 +24,32 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 horas
     
+    # Hashing de senhas (bcrypt fora do event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread | process
+    PASSWORD_HASH_WORKERS: int = 4
+    
+    # Cache de principais autenticados (get_current_user / get_current_lawyer)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    
+    # Ligação LISTEN/NOTIFY (chat em tempo real e invalidação de caches)
+    REALTIME_HEALTHCHECK_SECONDS: int = 10  # Ping e religação da ligação LISTEN
+    
+    # Atribuição automática de advogados (ressincronização do estado em memória)
+    ASSIGNMENT_SYNC_SECONDS: int = 30
+    
+    # Cache do diretório de advogados (GET /lawyers)
+    LAWYER_DIRECTORY_CACHE_SECONDS: int = 30
+    LAWYER_DIRECTORY_CACHE_MAX_SIZE: int = 1000
+    
+    # Totais das listagens paginadas (contagens filtradas em cache)
+    PAGINATION_COUNT_CACHE_SECONDS: int = 30
+    PAGINATION_COUNT_CACHE_MAX_SIZE: int = 1000
+    
+    # Rollups do dashboard administrativo (GET /admin/analytics)
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 300
+    ANALYTICS_ROLLUP_LOOKBACK_DAYS: int = 2  # Dias recalculados a cada execução
+    
     # API
     API_VERSION: str = "v1"
     API_PREFIX: str = "/api/v1"
@@ -41,10 +68,37 @@ class Settings(BaseSettings):
     MPESA_SERVICE_PROVIDER_CODE: str = "171717"
     MPESA_BASE_URL: str = "https://api.sandbox.vm.co.mz:18352"
     MPESA_CALLBACK_URL: str = ""
+    MPESA_CONNECT_TIMEOUT: float = 5.0
+    MPESA_PAYMENT_TIMEOUT: float = 30.0  # c2bPayment aguarda o PIN do cliente
+    MPESA_QUERY_TIMEOUT: float = 10.0
+    MPESA_MAX_CONNECTIONS: int = 20  # Pool partilhado (keep-alive)
+    MPESA_KEEPALIVE_SECONDS: float = 30.0
+    MPESA_BREAKER_FAILURES: int = 5  # Falhas seguidas até abrir o circuito
+    MPESA_BREAKER_RESET_SECONDS: float = 30.0
+    MPESA_FAKE_GATEWAY: bool = False  # Gateway simulado em memória
+    MPESA_TOKEN_TTL_SECONDS: int = 3600  # Reutilização do bearer token
+    MPESA_TOKEN_REFRESH_MARGIN_SECONDS: int = 300  # Renovar antes de expirar
+    
+    # Reconciliação de pagamentos pendentes (tarefa de fundo)
+    PAYMENT_RECONCILE_INTERVAL_SECONDS: float = 5.0
+    PAYMENT_RECONCILE_BATCH_SIZE: int = 100
+    PAYMENT_RECONCILE_CONCURRENCY: int = 10  # Consultas simultâneas ao gateway
+    PAYMENT_RECONCILE_INITIAL_DELAY_SECONDS: float = 10.0  # Dá tempo ao callback
+    PAYMENT_RECONCILE_MAX_BACKOFF_SECONDS: float = 300.0
+    PAYMENT_RECONCILE_EXPIRE_SECONDS: int = 3600  # Pendente há mais tempo = falhado
+    
+    # Caixa de entrada de callbacks M-Pesa
+    MPESA_CALLBACK_POLL_SECONDS: float = 1.0
+    MPESA_CALLBACK_BATCH_SIZE: int = 100
+    MPESA_CALLBACK_MAX_ATTEMPTS: int = 10  # Tentativas sem pagamento correspondente
     
     # Upload
     UPLOAD_DIR: str = "./uploads"
+    UPLOAD_TMP_DIR: str = "./uploads_tmp"  # Temporários fora de UPLOAD_DIR (servido); noutro volume são copiados
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB
+    UPLOAD_GC_INTERVAL_SECONDS: int = 3600  # Limpeza de arquivos sem referência
+    UPLOAD_GC_GRACE_SECONDS: int = 3600
+    UPLOAD_CONCURRENCY: int = 4  # Arquivos copiados em paralelo por pedido
     ALLOWED_EXTENSIONS: Union[List[str], str] = ["pdf", "jpg", "jpeg", "png", "docx"]
     
     # Email (opcional)
@@ -93,5 +147,6 @@ class Settings(BaseSettings):
 # Instância global de configurações
 settings = Settings()
 
-# Criar diretório de uploads se não existir
+# Criar diretórios de uploads se não existirem
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
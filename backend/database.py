@@ -1,12 +1,30 @@
 """
 Configuração do Banco de Dados PostgreSQL
 """
+import os
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
-# Engine do SQLAlchemy
+
+def _async_database_url(url: str) -> str:
+    """
+    Converte a DATABASE_URL síncrona para o driver assíncrono (asyncpg)
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# Engine do SQLAlchemy (síncrono - scripts como seed_lawyers.py e migrações)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -15,17 +33,35 @@ engine = create_engine(
     echo=settings.DEBUG
 )
 
-# Session factory
+# Engine assíncrono (rotas FastAPI)
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+    echo=settings.DEBUG
+)
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False: atributos continuam acessíveis após commit sem
+# disparar lazy loads (que não são permitidos em sessões assíncronas)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para modelos
 Base = declarative_base()
 
 
 def get_db():
     """
-    Dependency para obter sessão do banco de dados
-    Usar em rotas FastAPI com Depends(get_db)
+    Dependency para obter sessão síncrona do banco de dados
+    Usar apenas em código bloqueante (scripts, tarefas em thread)
     """
     db = SessionLocal()
     try:
@@ -34,9 +70,50 @@ def get_db():
         db.close()
 
 
-def init_db():
+async def get_async_db():
+    """
+    Dependency para obter sessão assíncrona do banco de dados
+    Usar em rotas FastAPI com Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Migrações Alembic (backend/migrations)
+ALEMBIC_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def expected_schema_revision() -> str:
+    """Última revisão das migrações (head)"""
+    return ScriptDirectory.from_config(Config(ALEMBIC_CONFIG)).get_current_head()
+
+
+async def check_schema_version():
+    """
+    Confirma que o banco de dados está na última migração
+    
+    Só lê alembic_version; o esquema é criado e alterado fora da aplicação
+    com "alembic upgrade head".
+    
+    Raises:
+        RuntimeError: Se o esquema estiver atrasado ou não inicializado
+    """
+    expected = expected_schema_revision()
+    async with async_engine.connect() as connection:
+        current = await connection.run_sync(
+            lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision()
+        )
+    
+    if current != expected:
+        raise RuntimeError(
+            f"Esquema do banco na revisão {current or 'nenhuma'}, esperada {expected}. "
+            "Execute: alembic upgrade head"
+        )
+    print(f"✅ Esquema do banco de dados na revisão {current}")
+
+
+async def close_db():
     """
-    Inicializa o banco de dados criando todas as tabelas
+    Fecha o pool de conexões assíncronas (shutdown da aplicação)
     """
-    Base.metadata.create_all(bind=engine)
-    print("✅ Banco de dados inicializado com sucesso!")
+    await async_engine.dispose()
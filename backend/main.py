@@ -6,7 +6,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from config import settings
-from database import init_db
+from database import check_schema_version, close_db
+from servicos.autenticacao import shutdown_password_hash_pool
+from servicos.tempo_real import chat_hub
+from servicos.upload import upload_gc_loop
+from servicos.mpesa import mpesa_client
+from servicos.pagamentos import payment_reconciler, callback_inbox
+from servicos.estatisticas import analytics_rollup_loop
+import asyncio
 import os
 
 # Importar rotas (serão criadas)
@@ -44,13 +51,39 @@ async def startup_event():
     print(f"📊 Ambiente: {settings.ENVIRONMENT}")
     print(f"🔧 Debug: {settings.DEBUG}")
     
-    # Inicializar banco de dados
-    init_db()
+    # Esquema gerido pelas migrações (alembic upgrade head)
+    await check_schema_version()
+    
+    # Ponte LISTEN/NOTIFY do chat em tempo real
+    await chat_hub.start()
+    
+    # Limpeza periódica de uploads sem referência
+    app.state.upload_gc_task = asyncio.create_task(upload_gc_loop())
+    
+    # Reconciliação de pagamentos M-Pesa pendentes
+    app.state.payment_reconciler_task = asyncio.create_task(payment_reconciler.run_forever())
+    app.state.callback_inbox_task = asyncio.create_task(callback_inbox.run_forever())
+    
+    # Rollups do dashboard administrativo
+    app.state.analytics_rollup_task = asyncio.create_task(analytics_rollup_loop())
     
     print("✅ API iniciada com sucesso!")
     print(f"📖 Documentação: http://localhost:8000{settings.API_PREFIX}/docs")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Executado ao encerrar a aplicação"""
+    app.state.upload_gc_task.cancel()
+    app.state.payment_reconciler_task.cancel()
+    app.state.callback_inbox_task.cancel()
+    app.state.analytics_rollup_task.cancel()
+    await chat_hub.stop()
+    await mpesa_client.close()
+    await close_db()
+    shutdown_password_hash_pool()
+
+
 @app.get("/")
 async def root():
     """Endpoint raiz"""
@@ -64,11 +97,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "environment": settings.ENVIRONMENT
-    }
+    """
+    Health check endpoint (público)
+    
+    As métricas internas (pools, gateway, tarefas de fundo) ficam em
+    GET /admin/system, só para administradores.
+    """
+    return {"status": "healthy"}
 
 
 # Registrar rotas
@@ -0,0 +1,201 @@
+"""
+Esquema inicial (o que o antigo Base.metadata.create_all criava)
+
+Bases criadas antes das migrações já têm este esquema: marcar com
+"alembic stamp 0001" e depois "alembic upgrade head". As tabelas, colunas
+e índices posteriores vêm nas revisões seguintes.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("full_name", sa.String(255), nullable=False),
+        sa.Column("birth_date", sa.DateTime(), nullable=False),
+        sa.Column("nationality", sa.String(100), nullable=False),
+        sa.Column("gender", sa.Enum("MASCULINO", "FEMININO", "OUTRO", name="gender"), nullable=True),
+        sa.Column(
+            "document_type",
+            sa.Enum("BI", "PASSAPORTE", "CARTA_CONDUCAO", name="documenttype"),
+            nullable=False
+        ),
+        sa.Column("document_number", sa.String(50), nullable=False),
+        sa.Column("phone_number", sa.String(20), nullable=False),
+        sa.Column("phone_verified", sa.Boolean(), nullable=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("email_verified", sa.Boolean(), nullable=True),
+        sa.Column("address", sa.JSON(), nullable=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("two_factor_enabled", sa.Boolean(), nullable=True),
+        sa.Column("two_factor_secret", sa.String(255), nullable=True),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("last_login", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_users_document_number", "users", ["document_number"], unique=True)
+    op.create_index("ix_users_phone_number", "users", ["phone_number"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "lawyers",
+        sa.Column("lawyer_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("nome", sa.String(255), nullable=False),
+        sa.Column("birth_date", sa.DateTime(), nullable=False),
+        sa.Column("nationality", sa.String(100), nullable=False),
+        sa.Column("document_type", sa.String(50), nullable=False),
+        sa.Column("document_number", sa.String(50), nullable=False, unique=True),
+        sa.Column("document_issue_date", sa.DateTime(), nullable=False),
+        sa.Column("document_expiry_date", sa.DateTime(), nullable=False),
+        sa.Column("document_file_url", sa.String(500), nullable=True),
+        sa.Column("oam_number", sa.String(20), nullable=False),
+        sa.Column("oam_registration_year", sa.Integer(), nullable=False),
+        sa.Column("oam_card_file_url", sa.String(500), nullable=True),
+        sa.Column("especialidade", sa.String(255), nullable=False),
+        sa.Column("specializations", postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column("cv_file_url", sa.String(500), nullable=True),
+        sa.Column("additional_docs_urls", postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column("professional_email", sa.String(255), nullable=False),
+        sa.Column("professional_phone", sa.String(20), nullable=False, unique=True),
+        sa.Column("phone_number", sa.String(20), nullable=True),
+        sa.Column("office_address", sa.String(500), nullable=False),
+        sa.Column("city", sa.String(100), nullable=False),
+        sa.Column("province", sa.String(100), nullable=False),
+        sa.Column("avatar_url", sa.String(500), nullable=True),
+        sa.Column("is_online", sa.Boolean(), nullable=True),
+        sa.Column("rating", sa.Float(), nullable=True),
+        sa.Column("total_reviews", sa.Integer(), nullable=True),
+        sa.Column("cases_completed", sa.Integer(), nullable=True),
+        sa.Column("verification_status", sa.String(50), nullable=True),
+        sa.Column("verification_notes", sa.Text(), nullable=True),
+        sa.Column("terms_accepted", sa.Boolean(), nullable=True),
+        sa.Column("legal_declaration", sa.Boolean(), nullable=True),
+        sa.Column("verification_authorization", sa.Boolean(), nullable=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_lawyers_oam_number", "lawyers", ["oam_number"], unique=True)
+    op.create_index("ix_lawyers_professional_email", "lawyers", ["professional_email"], unique=True)
+
+    op.create_table(
+        "orders",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("human_id", sa.String(20), nullable=False),
+        sa.Column("order_id", sa.String(20), nullable=False),
+        sa.Column("parent_order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("client_phone_number", sa.String(20), nullable=False),
+        sa.Column("topic", sa.JSON(), nullable=False),
+        sa.Column("pkg", sa.JSON(), nullable=False),
+        sa.Column("consultation_type", sa.String(20), nullable=False),
+        sa.Column("payment_status", sa.String(20), nullable=True),
+        sa.Column("payment_method", sa.String(20), nullable=True),
+        sa.Column("transaction_reference", sa.String(100), nullable=True),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("terms_accepted", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_orders_human_id", "orders", ["human_id"], unique=True)
+    op.create_index("ix_orders_transaction_reference", "orders", ["transaction_reference"])
+    op.create_index("ix_orders_status", "orders", ["status"])
+
+    op.create_table(
+        "assignments",
+        sa.Column("assignment_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=False, unique=True),
+        sa.Column("lawyer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("lawyers.lawyer_id"), nullable=False),
+        sa.Column("assigned_at", sa.DateTime(), nullable=False)
+    )
+
+    op.create_table(
+        "sessions",
+        sa.Column("session_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "assignment_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("assignments.assignment_id"), nullable=False, unique=True
+        ),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=True)
+    )
+
+    op.create_table(
+        "payments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("transaction_id", sa.String(100), nullable=False),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("client_name", sa.String(255), nullable=False),
+        sa.Column("client_phone", sa.String(20), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("method", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("confirmed_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_payments_transaction_id", "payments", ["transaction_id"], unique=True)
+
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("sender_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("sender", sa.String(20), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False)
+    )
+    op.create_index("ix_chat_messages_order_id", "chat_messages", ["order_id"])
+    op.create_index("ix_chat_messages_timestamp", "chat_messages", ["timestamp"])
+
+    op.create_table(
+        "documents",
+        sa.Column("document_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("message_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("chat_messages.id"), nullable=True),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("url", sa.String(500), nullable=False),
+        sa.Column("file_size", sa.String(50), nullable=True),
+        sa.Column("file_type", sa.String(50), nullable=True),
+        sa.Column("uploaded_by", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("uploaded_at", sa.DateTime(), nullable=False)
+    )
+    op.create_index("ix_documents_order_id", "documents", ["order_id"])
+
+    op.create_table(
+        "ratings",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("lawyer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("lawyers.lawyer_id"), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("stars", sa.Integer(), nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False)
+    )
+    op.create_index("ix_ratings_order_id", "ratings", ["order_id"], unique=True)
+    op.create_index("ix_ratings_lawyer_id", "ratings", ["lawyer_id"])
+
+
+def downgrade():
+    for table in (
+        "ratings", "documents", "chat_messages", "payments",
+        "sessions", "assignments", "orders", "lawyers", "users"
+    ):
+        op.drop_table(table)
+    sa.Enum(name="documenttype").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="gender").drop(op.get_bind(), checkfirst=True)
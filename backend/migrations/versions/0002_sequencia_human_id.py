@@ -0,0 +1,25 @@
+"""
+Sequência dos IDs legíveis dos pedidos (INCREMENT BY = HUMAN_ID_BLOCK_SIZE)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Começa em "A00000" (IDs antigos FC-HHMMSS são só dígitos)
+    op.execute(sa.schema.CreateSequence(
+        sa.Sequence("order_human_id_seq", start=335544320, increment=1000)
+    ))
+
+
+def downgrade():
+    op.execute(sa.schema.DropSequence(sa.Sequence("order_human_id_seq")))
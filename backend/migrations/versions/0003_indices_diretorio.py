@@ -0,0 +1,30 @@
+"""
+Índices do diretório de advogados (filtros + ordenação por rating)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_lawyers_directory_specialty", "lawyers",
+        ["verification_status", "is_active", "especialidade", "is_online"]
+    )
+    op.create_index(
+        "ix_lawyers_directory_rating", "lawyers",
+        ["verification_status", "is_active", sa.text("rating DESC"), "lawyer_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_lawyers_directory_rating", table_name="lawyers")
+    op.drop_index("ix_lawyers_directory_specialty", table_name="lawyers")
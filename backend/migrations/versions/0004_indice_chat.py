@@ -0,0 +1,24 @@
+"""
+Histórico do chat por consulta com paginação em (timestamp, id)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_chat_messages_order_timestamp", "chat_messages", ["order_id", "timestamp", "id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_chat_messages_order_timestamp", table_name="chat_messages")
@@ -0,0 +1,35 @@
+"""
+Arquivos endereçados por conteúdo (SHA-256) com contagem de referências
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "stored_files",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("extension", sa.String(10), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(500), nullable=False, unique=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("sha256", "extension", name="uq_stored_files_content")
+    )
+    op.create_index("ix_stored_files_garbage", "stored_files", ["ref_count", "updated_at"])
+
+
+def downgrade():
+    op.drop_table("stored_files")
@@ -0,0 +1,30 @@
+"""
+Reconciliação de pagamentos pendentes em segundo plano
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # next_check_at NULL: pagamento verificado na próxima execução
+    op.add_column("payments", sa.Column("next_check_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "payments",
+        sa.Column("check_attempts", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.create_index("ix_payments_reconcile", "payments", ["status", "next_check_at"])
+
+
+def downgrade():
+    op.drop_index("ix_payments_reconcile", table_name="payments")
+    op.drop_column("payments", "check_attempts")
+    op.drop_column("payments", "next_check_at")
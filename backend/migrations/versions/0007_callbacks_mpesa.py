@@ -0,0 +1,37 @@
+"""
+Caixa de entrada durável dos callbacks M-Pesa
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "mpesa_callbacks",
+        sa.Column("transaction_id", sa.String(100), primary_key=True),
+        sa.Column("third_party_reference", sa.String(100), nullable=True),
+        sa.Column("response_code", sa.String(20), nullable=True),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(500), nullable=True)
+    )
+    op.create_index(
+        "ix_mpesa_callbacks_pending", "mpesa_callbacks", ["received_at"],
+        postgresql_where=sa.text("processed_at IS NULL")
+    )
+
+
+def downgrade():
+    op.drop_table("mpesa_callbacks")
@@ -0,0 +1,43 @@
+"""
+Rollups do dashboard administrativo (analytics_daily / analytics_snapshot)
+
+Preenchidos pelo job de rollup; a primeira execução sem linhas recalcula
+todo o histórico.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analytics_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("new_users", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("new_lawyers", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cases_created", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("payments_completed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("ratings_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ratings_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+    op.create_table(
+        "analytics_snapshot",
+        sa.Column("metric", sa.String(100), primary_key=True),
+        sa.Column("value", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_table("analytics_snapshot")
+    op.drop_table("analytics_daily")
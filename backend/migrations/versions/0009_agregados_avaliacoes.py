@@ -0,0 +1,58 @@
+"""
+Agregados incrementais das avaliações no advogado
+
+Preenche rating_sum, o histograma, total_reviews e rating a partir da
+tabela ratings; a partir daqui são mantidos por record_rating.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("rating_sum",) + tuple(f"rating_{stars}_count" for stars in range(1, 6))
+
+
+def upgrade():
+    for name in COLUMNS:
+        op.add_column(
+            "lawyers",
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.execute(sa.text("""
+        UPDATE lawyers l SET
+            total_reviews = r.total,
+            rating_sum = r.stars_sum,
+            rating_1_count = r.c1,
+            rating_2_count = r.c2,
+            rating_3_count = r.c3,
+            rating_4_count = r.c4,
+            rating_5_count = r.c5,
+            rating = round(r.stars_sum::numeric / r.total, 1)
+        FROM (
+            SELECT
+                lawyer_id,
+                count(*) AS total,
+                sum(stars) AS stars_sum,
+                count(*) FILTER (WHERE stars = 1) AS c1,
+                count(*) FILTER (WHERE stars = 2) AS c2,
+                count(*) FILTER (WHERE stars = 3) AS c3,
+                count(*) FILTER (WHERE stars = 4) AS c4,
+                count(*) FILTER (WHERE stars = 5) AS c5
+            FROM ratings
+            GROUP BY lawyer_id
+        ) r
+        WHERE r.lawyer_id = l.lawyer_id
+    """))
+
+
+def downgrade():
+    for name in COLUMNS:
+        op.drop_column("lawyers", name)
@@ -0,0 +1,64 @@
+"""
+Contadores diários por advogado (GET /lawyers/{id}/stats)
+
+Preenche o histórico a partir de assignments (consultas e preço do
+pacote), orders concluídos (dia da última atualização) e ratings.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "lawyer_stats_daily",
+        sa.Column(
+            "lawyer_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("lawyers.lawyer_id"), primary_key=True
+        ),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("consultations", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cases_completed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ratings_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ratings_sum", sa.Integer(), nullable=False, server_default="0")
+    )
+
+    op.execute(sa.text("""
+        INSERT INTO lawyer_stats_daily
+            (lawyer_id, day, consultations, revenue, cases_completed, ratings_count, ratings_sum)
+        SELECT lawyer_id, day, sum(consultations), sum(revenue),
+               sum(cases_completed), sum(ratings_count), sum(ratings_sum)
+        FROM (
+            SELECT a.lawyer_id, a.assigned_at::date AS day,
+                   1 AS consultations,
+                   CASE WHEN o.pkg ->> 'price' ~ '^[0-9]+(\.[0-9]+)?$'
+                        THEN (o.pkg ->> 'price')::float8 ELSE 0 END AS revenue,
+                   0 AS cases_completed, 0 AS ratings_count, 0 AS ratings_sum
+            FROM assignments a
+            JOIN orders o ON o.id = a.order_id
+            UNION ALL
+            SELECT a.lawyer_id, coalesce(o.updated_at, o.created_at)::date,
+                   0, 0, 1, 0, 0
+            FROM assignments a
+            JOIN orders o ON o.id = a.order_id
+            WHERE o.status = 'completed'
+            UNION ALL
+            SELECT lawyer_id, created_at::date, 0, 0, 0, 1, stars
+            FROM ratings
+        ) history
+        GROUP BY lawyer_id, day
+    """))
+
+
+def downgrade():
+    op.drop_table("lawyer_stats_daily")
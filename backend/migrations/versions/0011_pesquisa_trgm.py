@@ -0,0 +1,42 @@
+"""
+Pesquisa administrativa com pg_trgm (ILIKE '%termo%' e similarity())
+
+Requer permissão para criar a extensão (ver README).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+TRGM_INDEXES = (
+    ("ix_users_full_name_trgm", "users", "full_name"),
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_lawyers_nome_trgm", "lawyers", "nome"),
+    ("ix_orders_human_id_trgm", "orders", "human_id"),
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name, table, [column],
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+        )
+    op.create_index(
+        "ix_orders_topic_name_trgm", "orders", [sa.text("(topic ->> 'name') gin_trgm_ops")],
+        postgresql_using="gin"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_orders_topic_name_trgm", table_name="orders")
+    for name, table, _ in TRGM_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""
+Chaves da paginação por cursor (created_at, id)
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+    ("ix_orders_created_at_id", "orders", ["created_at", "id"]),
+    ("ix_orders_user_created_at_id", "orders", ["user_id", "created_at", "id"]),
+    ("ix_ratings_lawyer_created_at_id", "ratings", ["lawyer_id", "created_at", "id"]),
+)
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,42 @@
+"""
+Índices dos filtros mais usados nas rotas
+
+assignments.lawyer_id   carga por advogado (atribuição), joins de casos e estatísticas
+payments.order_id       pagamentos de um pedido (chave estrangeira)
+payments(status, confirmed_at)  rollups de pagamentos concluídos por dia
+ratings.user_id         avaliações de um cliente (chave estrangeira)
+ratings.created_at      rollups de avaliações por dia
+
+payments.status sozinho já é servido por ix_payments_reconcile (status à
+esquerda). Criados com CONCURRENTLY para não bloquear escritas.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_assignments_lawyer_id", "assignments", ["lawyer_id"]),
+    ("ix_payments_order_id", "payments", ["order_id"]),
+    ("ix_payments_status_confirmed_at", "payments", ["status", "confirmed_at"]),
+    ("ix_ratings_user_id", "ratings", ["user_id"]),
+    ("ix_ratings_created_at", "ratings", ["created_at"]),
+)
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,132 @@
+"""
+Catálogo de temas e pacotes
+
+Cria topics e packages (com o catálogo atual do frontend) e liga os
+pedidos ao catálogo: orders.topic_id, orders.package_id e orders.price.
+Os JSON topic/pkg ficam como snapshot da compra. Pedidos antigos são
+preenchidos a partir dos JSON; ids fora do catálogo ficam a NULL.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+# Especialidade = nome do tema (o critério usado até aqui na atribuição)
+TOPICS = [
+    ("familia", "Família"),
+    ("trabalho", "Trabalho"),
+    ("consumo", "Consumo"),
+    ("terra", "Terra/DUAT"),
+    ("multas", "Multas"),
+    ("heranca", "Herança"),
+    ("outros", "Outros"),
+]
+
+PACKAGES = [
+    ("rapida", "consultation", "Consulta Rápida", 15, "minutes", 500,
+     "Orientação expressa para dúvidas pontuais."),
+    ("padrao", "consultation", "Consulta Padrão", 30, "minutes", 900,
+     "Análise detalhada e parecer verbal."),
+    ("aprofundada", "consultation", "Consulta Aprofundada", 60, "minutes", 1500,
+     "Análise de documentos e estratégia legal."),
+    ("abertura", "follow_up", "Abertura de Processo", None, "fixed_fee", 5000,
+     "Preparação e submissão inicial da peça processual."),
+    ("acompanhamento-mensal", "follow_up", "Retença Mensal", 1, "monthly", 3500,
+     "Acompanhamento contínuo de trâmites e diligências."),
+    ("defesa", "follow_up", "Defesa/Contestação", None, "fixed_fee", 7000,
+     "Elaboração de defesa complexa em processo existente."),
+    ("recurso", "follow_up", "Recurso", None, "fixed_fee", 10000,
+     "Interposição de recurso para instâncias superiores."),
+]
+
+
+def upgrade():
+    topics = op.create_table(
+        "topics",
+        sa.Column("id", sa.String(50), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("specialty", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_topics_specialty", "topics", ["specialty"])
+
+    packages = op.create_table(
+        "packages",
+        sa.Column("id", sa.String(50), primary_key=True),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("duration", sa.Integer(), nullable=True),
+        sa.Column("unit", sa.String(20), nullable=False),
+        sa.Column("price", sa.Integer(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True)
+    )
+
+    now = datetime.utcnow()
+    op.bulk_insert(topics, [
+        {
+            "id": id_, "name": name, "specialty": name, "is_active": True,
+            "created_at": now, "updated_at": now
+        }
+        for id_, name in TOPICS
+    ])
+    op.bulk_insert(packages, [
+        {
+            "id": id_, "type": type_, "name": name, "duration": duration,
+            "unit": unit, "price": price, "description": description, "is_active": True,
+            "created_at": now, "updated_at": now
+        }
+        for id_, type_, name, duration, unit, price, description in PACKAGES
+    ])
+
+    # Pedidos ligados ao catálogo
+    op.add_column("orders", sa.Column("topic_id", sa.String(50), sa.ForeignKey("topics.id"), nullable=True))
+    op.add_column("orders", sa.Column("package_id", sa.String(50), sa.ForeignKey("packages.id"), nullable=True))
+    op.add_column("orders", sa.Column("price", sa.Integer(), nullable=False, server_default="0"))
+
+    op.execute(sa.text("""
+        UPDATE orders o SET
+            topic_id = t.id
+        FROM topics t
+        WHERE t.id = o.topic ->> 'id'
+    """))
+    op.execute(sa.text("""
+        UPDATE orders o SET
+            package_id = p.id
+        FROM packages p
+        WHERE p.id = o.pkg ->> 'id'
+    """))
+    op.execute(sa.text("""
+        UPDATE orders SET
+            price = round((pkg ->> 'price')::numeric)::integer
+        WHERE pkg ->> 'price' ~ '^[0-9]+(\\.[0-9]+)?$'
+    """))
+    op.alter_column("orders", "price", server_default=None)
+
+    op.create_index("ix_orders_topic_id", "orders", ["topic_id"])
+    op.create_index("ix_orders_package_id", "orders", ["package_id"])
+    op.create_index("ix_orders_created_at_price", "orders", ["created_at", "price"])
+
+
+def downgrade():
+    op.drop_index("ix_orders_created_at_price", table_name="orders")
+    op.drop_index("ix_orders_package_id", table_name="orders")
+    op.drop_index("ix_orders_topic_id", table_name="orders")
+    op.drop_column("orders", "price")
+    op.drop_column("orders", "package_id")
+    op.drop_column("orders", "topic_id")
+    op.drop_table("packages")
+    op.drop_table("topics")
@@ -0,0 +1,36 @@
+"""
+lawyers.rating obrigatório (chave da paginação do diretório)
+
+O diretório pagina por (rating desc, lawyer_id); com rating NULL essas
+linhas ficavam fora do keyset. Advogados sem avaliações passam a 0.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.text("UPDATE lawyers SET rating = 0 WHERE rating IS NULL"))
+    op.alter_column(
+        "lawyers", "rating",
+        existing_type=sa.Float(),
+        nullable=False,
+        server_default="0"
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "lawyers", "rating",
+        existing_type=sa.Float(),
+        nullable=True,
+        server_default=None
+    )
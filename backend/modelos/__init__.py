@@ -4,9 +4,12 @@ Modelos do Banco de Dados - Fala Comigo Advogado
 from .usuarios import User
 from .advogados import Lawyer
 from .consultas import Order, Assignment, Session
-from .pagamentos import Payment
+from .pagamentos import Payment, MpesaCallback
 from .mensagens import ChatMessage, Document
 from .avaliacoes import Rating
+from .arquivos import StoredFile
+from .estatisticas import AnalyticsDaily, AnalyticsSnapshot
+from .catalogo import Topic, Package
 
 __all__ = [
     "User",
@@ -15,7 +18,13 @@ __all__ = [
     "Assignment",
     "Session",
     "Payment",
+    "MpesaCallback",
     "ChatMessage",
     "Document",
-    "Rating"
+    "Rating",
+    "StoredFile",
+    "AnalyticsDaily",
+    "AnalyticsSnapshot",
+    "Topic",
+    "Package"
 ]
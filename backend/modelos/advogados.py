@@ -1,7 +1,7 @@
 """
 Modelo de Advogados
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Float, Text, ARRAY
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Float, Text, ARRAY, Index
 from sqlalchemy.dialects.postgresql import UUID
 from database import Base
 import uuid
@@ -65,10 +65,18 @@ class Lawyer(Base):
     is_online = Column(Boolean, default=False)
     
     # Avaliações
-    rating = Column(Float, default=0.0)
+    rating = Column(Float, default=0.0, nullable=False)  # chave do diretório (keyset)
     total_reviews = Column(Integer, default=0)
     cases_completed = Column(Integer, default=0)
     
+    # Agregados das avaliações (atualizados com cada INSERT em ratings)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_1_count = Column(Integer, default=0, nullable=False)
+    rating_2_count = Column(Integer, default=0, nullable=False)
+    rating_3_count = Column(Integer, default=0, nullable=False)
+    rating_4_count = Column(Integer, default=0, nullable=False)
+    rating_5_count = Column(Integer, default=0, nullable=False)
+    
     # Verificação
     verification_status = Column(String(50), default=VerificationStatus.PENDING_VERIFICATION.value)
     verification_notes = Column(Text, nullable=True)
@@ -88,13 +96,71 @@ class Lawyer(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Índices do diretório (GET /lawyers): filtros + ordenação por rating
+    __table_args__ = (
+        Index(
+            "ix_lawyers_directory_specialty",
+            "verification_status", "is_active", "especialidade", "is_online"
+        ),
+        Index(
+            "ix_lawyers_directory_rating",
+            "verification_status", "is_active", rating.desc(), "lawyer_id"
+        ),
+        # Pesquisa administrativa de casos pelo nome do advogado (pg_trgm)
+        Index(
+            "ix_lawyers_nome_trgm", "nome",
+            postgresql_using="gin", postgresql_ops={"nome": "gin_trgm_ops"}
+        ),
+    )
+    
     def __repr__(self):
         return f"<Lawyer {self.nome} - OAM {self.oam_number}>"
     
+    @classmethod
+    def rating_count_column(cls, stars: int):
+        """Coluna do histograma para o número de estrelas (1-5)"""
+        return getattr(cls, f"rating_{stars}_count")
+    
+    def rating_distribution(self):
+        """Distribuição das avaliações por estrelas"""
+        return {str(i): getattr(self, f"rating_{i}_count") or 0 for i in range(1, 6)}
+    
+    @classmethod
+    def card_columns(cls):
+        """Colunas da vista resumida ("card") do diretório"""
+        return (
+            cls.lawyer_id,
+            cls.nome,
+            cls.especialidade,
+            cls.specializations,
+            cls.avatar_url,
+            cls.city,
+            cls.is_online,
+            cls.rating,
+            cls.total_reviews,
+            cls.cases_completed
+        )
+    
+    @staticmethod
+    def card_to_dict(row):
+        """Converte uma linha de card_columns() para dicionário (UUID nativo)"""
+        return {
+            "lawyer_id": row.lawyer_id,
+            "nome": row.nome,
+            "especialidade": row.especialidade,
+            "specializations": row.specializations,
+            "avatarUrl": row.avatar_url,
+            "city": row.city,
+            "isOnline": row.is_online,
+            "rating": row.rating,
+            "totalReviews": row.total_reviews,
+            "casesCompleted": row.cases_completed
+        }
+    
     def to_dict(self):
-        """Converte para dicionário"""
+        """Converte para dicionário (UUID e datetime nativos, ver utils/respostas.py)"""
         return {
-            "lawyer_id": str(self.lawyer_id),
+            "lawyer_id": self.lawyer_id,
             "nome": self.nome,
             "especialidade": self.especialidade,
             "specializations": self.specializations,
@@ -113,5 +179,5 @@ class Lawyer(Base):
             "casesCompleted": self.cases_completed,
             "verificationStatus": self.verification_status,
             "isActive": self.is_active,
-            "createdAt": self.created_at.isoformat() if self.created_at else None
+            "createdAt": self.created_at
         }
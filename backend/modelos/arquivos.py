@@ -0,0 +1,50 @@
+"""
+Modelo de Arquivos Armazenados (conteúdo endereçado por SHA-256)
+"""
+from sqlalchemy import Column, String, DateTime, Integer, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from database import Base
+import uuid
+from datetime import datetime
+
+
+class StoredFile(Base):
+    """Modelo de Arquivo Armazenado (um por conteúdo distinto)"""
+    __tablename__ = "stored_files"
+
+    # Identificação
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Conteúdo
+    sha256 = Column(String(64), nullable=False)
+    extension = Column(String(10), nullable=False)
+    size = Column(Integer, nullable=False)
+
+    # URL pública (ex: /uploads/cas/ab/abcdef....pdf)
+    url = Column(String(500), unique=True, nullable=False)
+
+    # Número de registros que apontam para este arquivo
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("sha256", "extension", name="uq_stored_files_content"),
+        Index("ix_stored_files_garbage", "ref_count", "updated_at"),
+    )
+
+    def __repr__(self):
+        return f"<StoredFile {self.sha256[:12]}.{self.extension} refs={self.ref_count}>"
+
+    def to_dict(self):
+        """Converte para dicionário"""
+        return {
+            "id": str(self.id),
+            "sha256": self.sha256,
+            "url": self.url,
+            "size": self.size,
+            "refCount": self.ref_count,
+            "createdAt": self.created_at.isoformat() if self.created_at else None
+        }
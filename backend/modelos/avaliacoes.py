@@ -1,7 +1,7 @@
 """
 Modelo de Avaliações
 """
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
@@ -19,20 +19,25 @@ class Rating(Base):
     # Relacionamentos
     order_id = Column(UUID(as_uuid=True), ForeignKey('orders.id'), nullable=False, unique=True, index=True)
     lawyer_id = Column(UUID(as_uuid=True), ForeignKey('lawyers.lawyer_id'), nullable=False, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True)
     
     # Avaliação
     stars = Column(Integer, nullable=False)  # 1-5
     comment = Column(Text, nullable=True)
     
     # Data
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     # Relacionamentos
     order = relationship("Order", foreign_keys=[order_id])
     lawyer = relationship("Lawyer", foreign_keys=[lawyer_id])
     user = relationship("User", foreign_keys=[user_id])
     
+    # Paginação por cursor das avaliações de um advogado
+    __table_args__ = (
+        Index("ix_ratings_lawyer_created_at_id", "lawyer_id", "created_at", "id"),
+    )
+    
     def __repr__(self):
         return f"<Rating {self.stars} stars for Lawyer {self.lawyer_id}>"
     
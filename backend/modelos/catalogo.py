@@ -0,0 +1,74 @@
+"""
+Modelos do Catálogo (temas e pacotes de consulta)
+"""
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, Text
+from database import Base
+from datetime import datetime
+
+
+class Topic(Base):
+    """Tema de consulta (ex: familia) e a especialidade que o atende"""
+    __tablename__ = "topics"
+
+    # Identificação (slug usado pelo frontend)
+    id = Column(String(50), primary_key=True)
+    name = Column(String(100), nullable=False)
+
+    # Especialidade dos advogados (Lawyer.especialidade / specializations)
+    specialty = Column(String(255), nullable=False, index=True)
+
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Topic {self.id} -> {self.specialty}>"
+
+    def to_dict(self):
+        """Converte para dicionário (também gravado como snapshot em Order.topic)"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "specialty": self.specialty
+        }
+
+
+class Package(Base):
+    """Pacote de consulta ou de acompanhamento com preço em MZN"""
+    __tablename__ = "packages"
+
+    # Identificação (slug usado pelo frontend)
+    id = Column(String(50), primary_key=True)
+    type = Column(String(20), nullable=False)  # consultation | follow_up
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+
+    # Duração (ex: 30 minutes, 1 monthly; vazio em fixed_fee)
+    duration = Column(Integer, nullable=True)
+    unit = Column(String(20), nullable=False)  # minutes | monthly | fixed_fee
+
+    # Preço atual em MZN (o pedido guarda o preço pago)
+    price = Column(Integer, nullable=False)
+
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Package {self.id} {self.price} MZN>"
+
+    def to_dict(self):
+        """Converte para dicionário (também gravado como snapshot em Order.pkg)"""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "name": self.name,
+            "description": self.description,
+            "duration": self.duration,
+            "unit": self.unit,
+            "price": self.price
+        }
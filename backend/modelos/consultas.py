@@ -1,7 +1,7 @@
 """
 Modelos de Consultas e Casos
 """
-from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, ForeignKey, JSON, Text
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, ForeignKey, JSON, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
@@ -50,12 +50,20 @@ class Order(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     client_phone_number = Column(String(20), nullable=False)
     
-    # Tema e Pacote (JSON)
+    # Tema e Pacote do catálogo (modelos/catalogo.py); vazios em pedidos
+    # antigos cujo tema/pacote não existe no catálogo
+    topic_id = Column(String(50), ForeignKey('topics.id'), nullable=True, index=True)
+    package_id = Column(String(50), ForeignKey('packages.id'), nullable=True, index=True)
+    
+    # Preço pago em MZN (relatórios de receita somam esta coluna)
+    price = Column(Integer, nullable=False, default=0)
+    
+    # Snapshots do tema e pacote no momento da compra (auditoria)
     topic = Column(JSON, nullable=False)
-    # Exemplo: {"id": "familia", "name": "Direito de Família"}
+    # Exemplo: {"id": "familia", "name": "Família", "specialty": "Família"}
     
     pkg = Column(JSON, nullable=False)
-    # Exemplo: {"id": "basico", "name": "Consulta Básica", "price": 2500, ...}
+    # Exemplo: {"id": "padrao", "name": "Consulta Padrão", "price": 900, ...}
     
     # Tipo de Consulta
     consultation_type = Column(String(20), nullable=False)  # digital | phone
@@ -79,6 +87,23 @@ class Order(Base):
     user = relationship("User", foreign_keys=[user_id])
     parent_order = relationship("Order", remote_side=[id], foreign_keys=[parent_order_id])
     
+    # Pesquisa administrativa (pg_trgm) por ID legível e nome do tema e
+    # chaves da paginação por cursor (created_at, id)
+    __table_args__ = (
+        Index(
+            "ix_orders_human_id_trgm", "human_id",
+            postgresql_using="gin", postgresql_ops={"human_id": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_orders_topic_name_trgm", text("(topic ->> 'name') gin_trgm_ops"),
+            postgresql_using="gin"
+        ),
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_created_at_id", "user_id", "created_at", "id"),
+        # Receita por período e por pacote
+        Index("ix_orders_created_at_price", "created_at", "price"),
+    )
+    
     def __repr__(self):
         return f"<Order {self.human_id} - Status: {self.status}>"
     
@@ -93,6 +118,9 @@ class Order(Base):
             "clientPhoneNumber": self.client_phone_number,
             "topic": self.topic,
             "pkg": self.pkg,
+            "topicId": self.topic_id,
+            "packageId": self.package_id,
+            "price": self.price,
             "consultationType": self.consultation_type,
             "payment_status": self.payment_status,
             "payment_method": self.payment_method,
@@ -112,7 +140,7 @@ class Assignment(Base):
     
     # Relacionamentos
     order_id = Column(UUID(as_uuid=True), ForeignKey('orders.id'), nullable=False, unique=True)
-    lawyer_id = Column(UUID(as_uuid=True), ForeignKey('lawyers.lawyer_id'), nullable=False)
+    lawyer_id = Column(UUID(as_uuid=True), ForeignKey('lawyers.lawyer_id'), nullable=False, index=True)
     
     # Data de Atribuição
     assigned_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,93 @@
+"""
+Modelos de Estatísticas (rollups do dashboard administrativo e contadores
+diários por advogado)
+"""
+from sqlalchemy import Column, String, DateTime, Date, Integer, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from database import Base
+from datetime import datetime
+
+
+class AnalyticsDaily(Base):
+    """
+    Totais por dia (UTC) recalculados pelo job de rollup
+
+    Receita conta pagamentos concluídos no dia da confirmação; as
+    restantes métricas usam o dia de criação do registro.
+    """
+    __tablename__ = "analytics_daily"
+
+    day = Column(Date, primary_key=True)
+
+    # Crescimento
+    new_users = Column(Integer, default=0, nullable=False)
+    new_lawyers = Column(Integer, default=0, nullable=False)
+
+    # Casos e receita
+    cases_created = Column(Integer, default=0, nullable=False)
+    payments_completed = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)
+
+    # Avaliações (média = ratings_sum / ratings_count)
+    ratings_count = Column(Integer, default=0, nullable=False)
+    ratings_sum = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AnalyticsDaily {self.day}>"
+
+    def to_dict(self):
+        """Converte para dicionário"""
+        return {
+            "day": self.day.isoformat(),
+            "newUsers": self.new_users,
+            "newLawyers": self.new_lawyers,
+            "casesCreated": self.cases_created,
+            "paymentsCompleted": self.payments_completed,
+            "revenue": self.revenue,
+            "ratingsCount": self.ratings_count,
+            "ratingsSum": self.ratings_sum
+        }
+
+
+class AnalyticsSnapshot(Base):
+    """
+    Valor atual de uma métrica agregada (ex: cases_status:assigned)
+
+    Métricas de estado (casos por status, advogados verificados) e totais
+    acumulados, regravados a cada execução do job de rollup.
+    """
+    __tablename__ = "analytics_snapshot"
+
+    metric = Column(String(100), primary_key=True)
+    value = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AnalyticsSnapshot {self.metric}={self.value}>"
+
+
+class LawyerStatsDaily(Base):
+    """
+    Contadores diários (UTC) de um advogado
+
+    Incrementados na transação que cria a atribuição ou a avaliação;
+    GET /lawyers/{id}/stats soma apenas as linhas do período pedido.
+    """
+    __tablename__ = "lawyer_stats_daily"
+
+    lawyer_id = Column(UUID(as_uuid=True), ForeignKey('lawyers.lawyer_id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    # Consultas atribuídas e receita (preço do pacote)
+    consultations = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)
+
+    # Casos concluídos e avaliações recebidas
+    cases_completed = Column(Integer, default=0, nullable=False)
+    ratings_count = Column(Integer, default=0, nullable=False)
+    ratings_sum = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<LawyerStatsDaily {self.lawyer_id} {self.day}>"
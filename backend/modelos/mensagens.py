@@ -1,7 +1,7 @@
 """
 Modelos de Mensagens e Documentos
 """
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
@@ -33,18 +33,23 @@ class ChatMessage(Base):
     # Relacionamento
     order = relationship("Order", foreign_keys=[order_id])
     
+    # Histórico por consulta com paginação em (timestamp, id)
+    __table_args__ = (
+        Index("ix_chat_messages_order_timestamp", "order_id", "timestamp", "id"),
+    )
+    
     def __repr__(self):
         return f"<ChatMessage {self.id} - {self.sender}>"
     
     def to_dict(self):
-        """Converte para dicionário"""
+        """Converte para dicionário (UUID e datetime nativos, ver utils/respostas.py)"""
         return {
-            "id": str(self.id),
-            "sender_id": str(self.sender_id),
+            "id": self.id,
+            "sender_id": self.sender_id,
             "sender": self.sender,
             "text": self.text,
             "type": self.type,
-            "timestamp": self.timestamp.isoformat() if self.timestamp else None
+            "timestamp": self.timestamp
         }
 
 
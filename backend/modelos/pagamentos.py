@@ -1,8 +1,8 @@
 """
-Modelo de Pagamentos
+Modelo de Pagamentos e caixa de entrada de callbacks M-Pesa
 """
-from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from database import Base
 import uuid
@@ -20,7 +20,7 @@ class Payment(Base):
     transaction_id = Column(String(100), unique=True, nullable=False, index=True)
     
     # Relacionamento com Order
-    order_id = Column(UUID(as_uuid=True), ForeignKey('orders.id'), nullable=False)
+    order_id = Column(UUID(as_uuid=True), ForeignKey('orders.id'), nullable=False, index=True)
     
     # Cliente
     client_name = Column(String(255), nullable=False)
@@ -39,9 +39,20 @@ class Payment(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     confirmed_at = Column(DateTime, nullable=True)
     
+    # Reconciliação com o gateway (servicos/pagamentos.py)
+    next_check_at = Column(DateTime, nullable=True)
+    check_attempts = Column(Integer, default=0, nullable=False)
+    
     # Relacionamento
     order = relationship("Order", foreign_keys=[order_id])
     
+    __table_args__ = (
+        # Pagamentos pendentes por data da próxima verificação
+        Index("ix_payments_reconcile", "status", "next_check_at"),
+        # Rollups de pagamentos concluídos por dia
+        Index("ix_payments_status_confirmed_at", "status", "confirmed_at"),
+    )
+    
     def __repr__(self):
         return f"<Payment {self.transaction_id} - {self.amount} MT>"
     
@@ -58,3 +69,41 @@ class Payment(Base):
             "date": self.created_at.isoformat() if self.created_at else None,
             "confirmedAt": self.confirmed_at.isoformat() if self.confirmed_at else None
         }
+
+
+class MpesaCallback(Base):
+    """
+    Callback M-Pesa recebido (caixa de entrada durável)
+    
+    Um registro por output_TransactionID (ou chave derivada): reenvios da
+    Vodacom não criam duplicados. O estado é aplicado a payments/orders pelo
+    CallbackInboxWorker, que marca processed_at na mesma transação.
+    """
+    __tablename__ = "mpesa_callbacks"
+    
+    # ID da transação no M-Pesa (output_TransactionID); sem ele, chave
+    # derivada (conv:, ref: ou sha256:) - ver callback_inbox_key
+    transaction_id = Column(String(100), primary_key=True)
+    
+    # Nossa referência (output_ThirdPartyReference = Payment.transaction_id)
+    third_party_reference = Column(String(100), nullable=True)
+    response_code = Column(String(20), nullable=True)
+    payload = Column(JSONB, nullable=False)
+    
+    # Processamento
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String(500), nullable=True)
+    
+    __table_args__ = (
+        # Callbacks por processar, por ordem de chegada
+        Index(
+            "ix_mpesa_callbacks_pending",
+            "received_at",
+            postgresql_where=processed_at.is_(None)
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<MpesaCallback {self.transaction_id} {self.response_code}>"
@@ -1,7 +1,7 @@
 """
 Modelo de Usuários
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Enum, JSON
+from sqlalchemy import Column, String, DateTime, Boolean, Enum, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from database import Base
 import uuid
@@ -66,6 +66,20 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
     
+    # Pesquisa administrativa (pg_trgm): ILIKE '%termo%' e similarity();
+    # chave da paginação por cursor (created_at, id)
+    __table_args__ = (
+        Index(
+            "ix_users_full_name_trgm", "full_name",
+            postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_users_email_trgm", "email",
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}
+        ),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+    
     def __repr__(self):
         return f"<User {self.full_name} ({self.email})>"
     
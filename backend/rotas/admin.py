@@ -3,18 +3,32 @@ Rotas Administrativas
 GET /admin/analytics
 GET /admin/cases
 PATCH /admin/cases/{orderId}/reassign
+GET /admin/assignment-engine
+GET /admin/system
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
-from database import get_db
+from database import get_async_db
 from modelos.usuarios import User
 from modelos.advogados import Lawyer
 from modelos.consultas import Order, Assignment, OrderStatus
 from modelos.pagamentos import Payment
-from utils.dependencias import get_current_admin
+from modelos.catalogo import Topic
+from servicos.atribuicao import assignment_engine, OPEN_CASE_STATUSES
+from servicos.pesquisa import normalize_search, ranked_search, case_search_ids, case_search_score, order_topic_name
+from servicos.estatisticas import get_analytics_summary, bump_lawyer_stats, PERIODS
+from servicos.autenticacao import get_password_hash_pool_stats
+from servicos.tempo_real import chat_hub
+from servicos.mpesa import mpesa_client
+from servicos.pagamentos import payment_reconciler, callback_inbox
+from config import settings
+from utils.dependencias import get_current_admin, UserPrincipal
+from utils.paginacao import fetch_page, count_items, page_info, page_size
+from utils.respostas import FastJSONResponse
 from sqlalchemy import func
 
 router = APIRouter(prefix="/admin", tags=["Administração"])
@@ -28,42 +42,67 @@ class ReassignRequest(BaseModel):
 @router.get("/analytics")
 async def get_analytics(
     period: str = "month",
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Dashboard analytics"""
-    # Estatísticas gerais
-    total_users = db.query(User).count()
-    total_lawyers = db.query(Lawyer).filter(Lawyer.verification_status == "verified").count()
-    total_cases = db.query(Order).count()
-    active_cases = db.query(Order).filter(
-        Order.status.in_([OrderStatus.ASSIGNED.value, OrderStatus.IN_PROGRESS.value])
-    ).count()
-    completed_cases = db.query(Order).filter(Order.status == OrderStatus.COMPLETED.value).count()
-    
-    # Receita total
-    total_revenue = db.query(func.sum(Payment.amount)).filter(
-        Payment.status == "completed"
-    ).scalar() or 0.0
+    """
+    Dashboard analytics
+    
+    Servido pelos rollups (analytics_daily/analytics_snapshot), atualizados
+    a cada ANALYTICS_ROLLUP_INTERVAL_SECONDS por servicos/estatisticas.py.
+    period: day | week | month | year | all
+    """
+    try:
+        summary = await get_analytics_summary(db, period)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Período inválido. Use: {', '.join(PERIODS)}"
+        )
+    
+    snapshot = summary["snapshot"]
+    totals = summary["totals"]
+    
+    def cases_with_status(*statuses) -> int:
+        return int(sum(snapshot.get(f"cases_status:{s}", 0) for s in statuses))
     
     # Top advogados
-    top_lawyers = db.query(Lawyer).filter(
-        Lawyer.verification_status == "verified"
-    ).order_by(Lawyer.rating.desc()).limit(5).all()
+    result = await db.execute(
+        select(Lawyer).where(
+            Lawyer.verification_status == "verified"
+        ).order_by(Lawyer.rating.desc()).limit(5)
+    )
+    top_lawyers = result.scalars().all()
     
     return {
         "success": True,
         "analytics": {
-            "totalUsers": total_users,
-            "totalLawyers": total_lawyers,
-            "totalCases": total_cases,
-            "activeCases": active_cases,
-            "completedCases": completed_cases,
-            "totalRevenue": total_revenue,
-            "revenueThisMonth": total_revenue,  # TODO: Filtrar por mês
-            "newUsersThisMonth": 0,  # TODO: Implementar
-            "newLawyersThisMonth": 0,  # TODO: Implementar
-            "averageRating": 4.7,  # TODO: Calcular média global
+            "totalUsers": int(totals["new_users"]),
+            "totalLawyers": int(snapshot.get("lawyers_verified", 0)),
+            "totalCases": int(totals["cases_created"]),
+            "activeCases": cases_with_status(*OPEN_CASE_STATUSES),
+            "completedCases": cases_with_status(OrderStatus.COMPLETED.value),
+            "casesByStatus": {
+                metric.split(":", 1)[1]: int(value)
+                for metric, value in snapshot.items() if metric.startswith("cases_status:")
+            },
+            "totalRevenue": totals["revenue"],
+            "revenueThisMonth": summary["month"]["revenue"],
+            "newUsersThisMonth": int(summary["month"]["new_users"]),
+            "newLawyersThisMonth": int(summary["month"]["new_lawyers"]),
+            "averageRating": summary["averageRating"],
+            "period": {
+                "name": period,
+                "start": summary["periodStart"],
+                "newUsers": int(summary["period"]["new_users"]),
+                "newLawyers": int(summary["period"]["new_lawyers"]),
+                "cases": int(summary["period"]["cases_created"]),
+                "paymentsCompleted": int(summary["period"]["payments_completed"]),
+                "revenue": summary["period"]["revenue"],
+                "ratings": int(summary["period"]["ratings_count"]),
+                "averageRating": summary["periodAverageRating"]
+            },
+            "updatedAt": summary["updatedAt"],
             "topLawyers": [
                 {
                     "lawyer_id": str(l.lawyer_id),
@@ -76,71 +115,108 @@ async def get_analytics(
     }
 
 
-@router.get("/cases")
+@router.get("/cases", response_class=FastJSONResponse)
 async def list_all_cases(
-    page: int = 1,
+    cursor: Optional[str] = None,
     limit: int = 20,
+    page: Optional[int] = None,
+    total: str = "estimate",
     search: Optional[str] = None,
     status_filter: Optional[str] = None,
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Listar todos os casos (Admin)"""
-    query = db.query(Order)
+    """
+    Listar todos os casos (Admin)
+    
+    Uma única consulta com joins (tema, cliente e advogado) e só as colunas da
+    listagem. Paginação por cursor (created_at, id): o custo por página é
+    constante qualquer que seja a profundidade; o total é opcional
+    (total=none|estimate|exact).
     
-    # Filtros
-    if search:
-        query = query.filter(Order.human_id.ilike(f"%{search}%"))
+    search procura no ID legível, tema, cliente e advogado (índices
+    pg_trgm) e ordena por relevância (termos com menos de 3 caracteres:
+    mais recentes primeiro). Serializada com orjson (FastJSONResponse).
+    """
+    limit = page_size(limit)
+    keys = [(Order.created_at, True), (Order.id, True)]
+    columns = [
+        Order.id,
+        Order.human_id,
+        func.coalesce(Topic.name, order_topic_name()).label("topic_name"),
+        Order.status,
+        Order.created_at,
+        Order.price,
+        User.full_name.label("client_name"),
+        Lawyer.nome.label("lawyer_name")
+    ]
+    filters = []
+    term = normalize_search(search) if search else ""
+    ranked = ranked_search(term)
+    if term:
+        filters.append(Order.id.in_(case_search_ids(term)))
+    if ranked:
+        score = case_search_score(term)
+        keys.insert(0, (score, True))
+        columns.append(score.label("score"))
     
     if status_filter:
-        query = query.filter(Order.status == status_filter)
-    
-    # Paginação
-    total = query.count()
-    orders = query.order_by(Order.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
-    
-    # Enriquecer com dados de usuário e advogado
-    cases_data = []
-    for order in orders:
-        user = db.query(User).filter(User.id == order.user_id).first()
-        assignment = db.query(Assignment).filter(Assignment.order_id == order.id).first()
-        lawyer = None
-        if assignment:
-            lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == assignment.lawyer_id).first()
-        
-        cases_data.append({
-            "id": str(order.id),
-            "caseId": order.human_id,
-            "client": user.full_name if user else "N/A",
-            "lawyer": lawyer.nome if lawyer else "Não atribuído",
-            "topic": order.topic.get("name", "N/A"),
-            "status": order.status,
-            "createdDate": order.created_at.isoformat() if order.created_at else None,
-            "amount": order.pkg.get("price", 0)
-        })
+        filters.append(Order.status == status_filter)
     
-    return {
+    # Sem filtros o total estimado vem de pg_class.reltuples
+    count_query = select(Order.id).where(*filters)
+    total_items, estimated = await count_items(
+        db, count_query, total, table=None if filters else Order.__tablename__
+    )
+    
+    query = (
+        select(*columns)
+        .outerjoin(Topic, Topic.id == Order.topic_id)
+        .outerjoin(User, User.id == Order.user_id)
+        .outerjoin(Assignment, Assignment.order_id == Order.id)
+        .outerjoin(Lawyer, Lawyer.lawyer_id == Assignment.lawyer_id)
+        .where(*filters)
+    )
+    rows, next_cursor = await fetch_page(
+        db, query,
+        keys=keys,
+        cursor=cursor,
+        limit=limit,
+        cursor_values=lambda row: ([row.score] if ranked else []) + [row.created_at, row.id],
+        page=page
+    )
+    
+    cases_data = [
+        {
+            "id": row.id,
+            "caseId": row.human_id,
+            "client": row.client_name or "N/A",
+            "lawyer": row.lawyer_name or "Não atribuído",
+            "topic": row.topic_name or "N/A",
+            "status": row.status,
+            "createdDate": row.created_at,
+            "amount": row.price
+        }
+        for row in rows
+    ]
+    
+    return FastJSONResponse({
         "success": True,
         "data": cases_data,
-        "pagination": {
-            "currentPage": page,
-            "totalPages": (total + limit - 1) // limit,
-            "totalItems": total,
-            "itemsPerPage": limit
-        }
-    }
+        "pagination": page_info(limit, next_cursor, total_items, estimated, page=page)
+    })
 
 
 @router.patch("/cases/{order_id}/reassign")
 async def reassign_case(
     order_id: str,
     request: ReassignRequest,
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reatribuir caso a outro advogado (Admin)"""
     # Verificar se order existe
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -148,7 +224,7 @@ async def reassign_case(
         )
     
     # Verificar se novo advogado existe
-    new_lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == request.new_lawyer_id).first()
+    new_lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == request.new_lawyer_id))
     if not new_lawyer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,7 +232,10 @@ async def reassign_case(
         )
     
     # Buscar assignment existente
-    assignment = db.query(Assignment).filter(Assignment.order_id == order_id).first()
+    assignment = await db.scalar(select(Assignment).where(Assignment.order_id == order_id))
+    
+    previous_lawyer_id = assignment.lawyer_id if assignment else None
+    previous_assigned_at = assignment.assigned_at if assignment else None
     
     if assignment:
         # Atualizar assignment existente
@@ -170,7 +249,23 @@ async def reassign_case(
         )
         db.add(assignment)
     
-    db.commit()
+    # Transferir a consulta nos contadores diários dos advogados
+    price = order.price
+    if previous_lawyer_id:
+        await bump_lawyer_stats(
+            db, previous_lawyer_id,
+            day=previous_assigned_at.date() if previous_assigned_at else None,
+            consultations=-1, revenue=-price
+        )
+    await bump_lawyer_stats(db, request.new_lawyer_id, consultations=1, revenue=price)
+    
+    await db.commit()
+    
+    # Transferir a carga no motor de atribuição
+    if order.status in OPEN_CASE_STATUSES:
+        if previous_lawyer_id:
+            assignment_engine.release_assignment(previous_lawyer_id)
+        assignment_engine.record_assignment(request.new_lawyer_id)
     
     return {
         "success": True,
@@ -178,3 +273,40 @@ async def reassign_case(
         "orderId": order_id,
         "newLawyerId": request.new_lawyer_id
     }
+
+
+@router.get("/assignment-engine")
+async def get_assignment_engine(
+    specialty: Optional[str] = None,
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Estado do motor de atribuição e porque um advogado seria escolhido (Admin)"""
+    await assignment_engine.ensure_synced(db)
+    
+    return {
+        "success": True,
+        "stats": assignment_engine.stats(),
+        "preview": await assignment_engine.preview(db, specialty) if specialty else None
+    }
+
+
+@router.get("/system")
+async def get_system_stats(
+    current_admin: UserPrincipal = Depends(get_current_admin)
+):
+    """
+    Métricas internas do worker que atende o pedido (Admin)
+    
+    Pool de hashing de senhas, chat em tempo real, gateway M-Pesa
+    (circuito e token) e tarefas de fundo de pagamentos.
+    """
+    return {
+        "success": True,
+        "environment": settings.ENVIRONMENT,
+        "passwordHashing": get_password_hash_pool_stats(),
+        "chat": chat_hub.stats(),
+        "mpesa": mpesa_client.stats(),
+        "paymentReconciler": payment_reconciler.stats(),
+        "mpesaCallbacks": callback_inbox.stats()
+    }
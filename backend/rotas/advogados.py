@@ -7,18 +7,24 @@ GET /lawyers/{lawyerId}/stats
 GET /admin/lawyers (Admin)
 PATCH /admin/lawyers/{lawyerId}/verification (Admin)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+import uuid
 
-from database import get_db
+from database import get_async_db
 from modelos.advogados import Lawyer
-from modelos.consultas import Order, Assignment
-from modelos.avaliacoes import Rating
-from utils.dependencias import get_current_lawyer, get_current_admin
-from sqlalchemy import func
+from modelos.catalogo import Topic
+from servicos.atribuicao import assignment_engine
+from servicos.diretorio import get_cached_directory, cache_directory, invalidate_lawyer_directory
+from servicos.estatisticas import get_lawyer_period_stats, LAWYER_PERIODS, LAWYER_BUCKETS
+from utils.dependencias import get_current_lawyer, get_current_admin, invalidate_principal, LawyerPrincipal
+from utils.paginacao import encode_cursor, decode_cursor, keyset_after
+from utils.respostas import FastJSONResponse
+from config import settings
 
 router = APIRouter(prefix="/lawyers", tags=["Advogados"])
 
@@ -32,43 +38,112 @@ class VerificationRequest(BaseModel):
     notes: Optional[str] = None
 
 
-@router.get("")
+@router.get("", response_class=FastJSONResponse)
 async def list_lawyers(
     specialty: Optional[str] = None,
+    topic: Optional[str] = None,
     available: Optional[bool] = None,
     rating: Optional[float] = None,
-    db: Session = Depends(get_db)
+    view: str = "full",
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Listar advogados disponíveis"""
-    query = db.query(Lawyer).filter(
+    """
+    Listar advogados disponíveis
+    
+    Ordenado por rating (desc) com paginação por cursor; view="card"
+    retorna apenas os campos usados nas listagens. topic filtra pela
+    especialidade do tema no catálogo (join com topics). As páginas ficam
+    em cache já serializadas com orjson.
+    """
+    if view not in ("card", "full"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vista inválida. Use 'card' ou 'full'"
+        )
+    
+    limit = max(1, min(limit, 100))
+    cache_headers = {"Cache-Control": f"private, max-age={settings.LAWYER_DIRECTORY_CACHE_SECONDS}"}
+    
+    # Cache de respostas (invalidado por mudanças de online/verificação/rating)
+    cache_key = (specialty, topic, available, rating, view, cursor, limit)
+    cached = get_cached_directory(cache_key)
+    if cached:
+        return _directory_response(*cached, if_none_match, cache_headers)
+    
+    after = decode_cursor(cursor, 2, (float, uuid.UUID))
+    
+    columns = Lawyer.card_columns() if view == "card" else (Lawyer,)
+    query = select(*columns).where(
         Lawyer.is_active == True,
         Lawyer.verification_status == "verified"
     )
     
     if specialty:
-        query = query.filter(Lawyer.especialidade == specialty)
+        query = query.where(Lawyer.especialidade == specialty)
+    
+    if topic:
+        query = query.join(Topic, Topic.specialty == Lawyer.especialidade).where(Topic.id == topic)
     
     if available is not None:
-        query = query.filter(Lawyer.is_online == available)
+        query = query.where(Lawyer.is_online == available)
     
     if rating:
-        query = query.filter(Lawyer.rating >= rating)
+        query = query.where(Lawyer.rating >= rating)
     
-    lawyers = query.all()
+    # Keyset: (rating desc, lawyer_id asc); rating é NOT NULL (sem NULLs a saltar)
+    keys = [(Lawyer.rating, True), (Lawyer.lawyer_id, False)]
+    if after:
+        query = query.where(keyset_after(keys, after))
     
-    return {
+    query = query.order_by(Lawyer.rating.desc(), Lawyer.lawyer_id.asc()).limit(limit + 1)
+    
+    result = await db.execute(query)
+    rows = result.scalars().all() if view == "full" else result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    if view == "card":
+        data = [Lawyer.card_to_dict(row) for row in rows]
+    else:
+        data = [lawyer.to_dict() for lawyer in rows]
+    
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.rating, last.lawyer_id])
+    
+    body = {
         "success": True,
-        "data": [lawyer.to_dict() for lawyer in lawyers]
+        "data": data,
+        "pagination": {
+            "limit": limit,
+            "nextCursor": next_cursor,
+            "hasMore": has_more
+        }
     }
+    
+    etag, payload = cache_directory(cache_key, body)
+    return _directory_response(etag, payload, if_none_match, cache_headers)
+
+
+def _directory_response(etag: str, payload: bytes, if_none_match: Optional[str], cache_headers: dict) -> Response:
+    """Página do diretório já serializada (ou 304 se o ETag coincidir)"""
+    headers = {"ETag": etag, **cache_headers}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type=FastJSONResponse.media_type, headers=headers)
 
 
 @router.get("/{lawyer_id}")
 async def get_lawyer_profile(
     lawyer_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter perfil do advogado"""
-    lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == lawyer_id).first()
+    lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == lawyer_id))
     if not lawyer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,8 +157,8 @@ async def get_lawyer_profile(
 async def update_online_status(
     lawyer_id: str,
     request: OnlineStatusRequest,
-    current_lawyer: Lawyer = Depends(get_current_lawyer),
-    db: Session = Depends(get_db)
+    current_lawyer: LawyerPrincipal = Depends(get_current_lawyer),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualizar status online do advogado"""
     if str(current_lawyer.lawyer_id) != lawyer_id:
@@ -92,8 +167,12 @@ async def update_online_status(
             detail="Acesso negado"
         )
     
-    current_lawyer.is_online = request.isOnline
-    db.commit()
+    # current_lawyer é um snapshot do cache, não uma linha desta sessão
+    lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == current_lawyer.lawyer_id))
+    lawyer.is_online = request.isOnline
+    await invalidate_lawyer_directory(db)
+    await db.commit()
+    assignment_engine.set_online(lawyer.lawyer_id, request.isOnline)
     
     return {
         "success": True,
@@ -106,37 +185,62 @@ async def update_online_status(
 async def get_lawyer_stats(
     lawyer_id: str,
     period: str = "today",
-    current_lawyer: Lawyer = Depends(get_current_lawyer),
-    db: Session = Depends(get_db)
+    bucket: str = "day",
+    current_lawyer: LawyerPrincipal = Depends(get_current_lawyer),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Estatísticas do advogado"""
+    """
+    Estatísticas do advogado
+    
+    Servidas pelos contadores diários (lawyer_stats_daily) e pelos
+    agregados de avaliações do advogado.
+    period: today | week | month | year; bucket (série): day | week | month
+    """
     if str(current_lawyer.lawyer_id) != lawyer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso negado"
         )
     
-    # Buscar estatísticas
-    total_cases = db.query(Assignment).filter(
-        Assignment.lawyer_id == lawyer_id
-    ).count()
+    try:
+        stats = await get_lawyer_period_stats(db, lawyer_id, period, bucket)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Use period={'|'.join(LAWYER_PERIODS)} e bucket={'|'.join(LAWYER_BUCKETS)}"
+        )
     
-    avg_rating = db.query(func.avg(Rating.stars)).filter(
-        Rating.lawyer_id == lawyer_id
-    ).scalar() or 0.0
+    # Agregados de avaliações mantidos no advogado (O(1))
+    reviews = (await db.execute(
+        select(Lawyer.rating_sum, Lawyer.total_reviews, Lawyer.cases_completed)
+        .where(Lawyer.lawyer_id == lawyer_id)
+    )).one()
+    total_reviews = reviews.total_reviews or 0
+    avg_rating = reviews.rating_sum / total_reviews if total_reviews else 0.0
     
-    total_reviews = db.query(Rating).filter(
-        Rating.lawyer_id == lawyer_id
-    ).count()
+    period_totals = stats["period"]
+    period_ratings = period_totals["ratings_count"]
     
     return {
         "success": True,
         "stats": {
-            "dailyConsultations": 0,  # TODO: Implementar filtro por data
-            "dailyRevenue": 0,
-            "totalCasesCompleted": current_lawyer.cases_completed,
+            "dailyConsultations": int(period_totals["consultations"]),
+            "dailyRevenue": period_totals["revenue"],
+            "totalCases": int(stats["lifetime"]["consultations"]),
+            "totalRevenue": stats["lifetime"]["revenue"],
+            "totalCasesCompleted": reviews.cases_completed,
             "averageRating": round(avg_rating, 1),
-            "totalReviews": total_reviews
+            "totalReviews": total_reviews,
+            "period": {
+                "name": period,
+                "start": stats["periodStart"],
+                "consultations": int(period_totals["consultations"]),
+                "revenue": period_totals["revenue"],
+                "casesCompleted": int(period_totals["cases_completed"]),
+                "ratings": int(period_ratings),
+                "averageRating": round(period_totals["ratings_sum"] / period_ratings, 1) if period_ratings else 0.0
+            },
+            "series": stats["series"]
         }
     }
 
@@ -146,10 +250,10 @@ async def verify_lawyer(
     lawyer_id: str,
     request: VerificationRequest,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Aprovar/Rejeitar registro de advogado (Admin)"""
-    lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == lawyer_id).first()
+    lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == lawyer_id))
     if not lawyer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,7 +262,10 @@ async def verify_lawyer(
     
     lawyer.verification_status = request.status
     lawyer.verification_notes = request.notes
-    db.commit()
+    await invalidate_principal(db, lawyer.lawyer_id)
+    await invalidate_lawyer_directory(db)
+    await db.commit()
+    assignment_engine.invalidate()
     
     return {
         "success": True,
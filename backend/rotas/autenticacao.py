@@ -8,21 +8,31 @@ GET /auth/verify
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime, timedelta
 
-from database import get_db
+from database import get_async_db
 from modelos.usuarios import User, DocumentType, Gender
 from modelos.advogados import Lawyer
-from servicos.autenticacao import get_password_hash, verify_password, create_access_token, verify_token
-from servicos.upload import save_upload_file
-from utils.dependencias import get_current_user, security
-from utils.helpers import validate_mozambique_phone, format_mozambique_phone
+from servicos.autenticacao import get_password_hash_async, verify_password_async, create_access_token, verify_token
+from servicos.upload import UploadBatch
+from utils.dependencias import get_current_user, security, UserPrincipal
+from utils.helpers import validate_mozambique_phone, format_mozambique_phone, violated_constraint
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
+# Constraint única de lawyers -> mensagem do campo duplicado
+LAWYER_UNIQUE_MESSAGES = {
+    "ix_lawyers_professional_email": "Email já cadastrado",
+    "ix_lawyers_oam_number": "Número OAM já cadastrado",
+    "lawyers_document_number_key": "Documento já cadastrado",
+    "lawyers_professional_phone_key": "Telefone profissional já cadastrado"
+}
+
 
 # Schemas Pydantic
 class LoginRequest(BaseModel):
@@ -56,17 +66,17 @@ class UserRegisterRequest(BaseModel):
 @router.post("/login", response_model=LoginResponse)
 async def login(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Autentica usuário ou advogado e retorna token JWT
     """
     # Tentar encontrar como usuário
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     
     if user:
         # Verificar senha
-        if not verify_password(request.password, user.password_hash):
+        if not await verify_password_async(request.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email ou senha incorretos"
@@ -80,7 +90,7 @@ async def login(
         
         # Atualizar último login
         user.last_login = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         # Criar token
         token_data = {
@@ -96,11 +106,11 @@ async def login(
         }
     
     # Tentar encontrar como advogado
-    lawyer = db.query(Lawyer).filter(Lawyer.professional_email == request.email).first()
+    lawyer = await db.scalar(select(Lawyer).where(Lawyer.professional_email == request.email))
     
     if lawyer:
         # Verificar senha
-        if not verify_password(request.password, lawyer.password_hash):
+        if not await verify_password_async(request.password, lawyer.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email ou senha incorretos"
@@ -138,13 +148,13 @@ async def login(
 @router.post("/register/user")
 async def register_user(
     request: UserRegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Registra um novo usuário
     """
     # Verificar se email já existe
-    existing_user = db.query(User).filter(User.email == request.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == request.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -152,7 +162,7 @@ async def register_user(
         )
     
     # Verificar se documento já existe
-    existing_doc = db.query(User).filter(User.document_number == request.documentNumber).first()
+    existing_doc = await db.scalar(select(User).where(User.document_number == request.documentNumber))
     if existing_doc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -176,7 +186,7 @@ async def register_user(
         document_number=request.documentNumber,
         phone_number=format_mozambique_phone(request.phoneNumber),
         email=request.email,
-        password_hash=get_password_hash(request.password),
+        password_hash=await get_password_hash_async(request.password),
         address={
             "neighborhood": request.neighborhood,
             "city": request.city,
@@ -185,8 +195,8 @@ async def register_user(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Criar token
     token_data = {"sub": str(new_user.id), "role": "user"}
@@ -225,7 +235,7 @@ async def register_lawyer(
     oamCardFile: UploadFile = File(...),
     cvFile: UploadFile = File(...),
     additionalDocs: Optional[List[UploadFile]] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Registra um novo advogado (requer verificação posterior)
@@ -233,7 +243,7 @@ async def register_lawyer(
     import json
     
     # Verificar se email já existe
-    existing_lawyer = db.query(Lawyer).filter(Lawyer.professional_email == professionalEmail).first()
+    existing_lawyer = await db.scalar(select(Lawyer).where(Lawyer.professional_email == professionalEmail))
     if existing_lawyer:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -241,61 +251,65 @@ async def register_lawyer(
         )
     
     # Verificar OAM
-    existing_oam = db.query(Lawyer).filter(Lawyer.oam_number == oamNumber).first()
+    existing_oam = await db.scalar(select(Lawyer).where(Lawyer.oam_number == oamNumber))
     if existing_oam:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Número OAM já cadastrado"
         )
     
-    # Upload de arquivos
-    document_url = await save_upload_file(documentFile, "documents")
-    oam_card_url = await save_upload_file(oamCardFile, "oam_cards")
-    cv_url = await save_upload_file(cvFile, "cvs")
-    
-    additional_urls = []
-    if additionalDocs:
-        for doc in additionalDocs:
-            url = await save_upload_file(doc, "additional")
-            if url:
-                additional_urls.append(url)
-    
     # Parse specializations
     specs_list = json.loads(specializations)
     
-    # Criar advogado
-    new_lawyer = Lawyer(
-        nome=fullName,
-        birth_date=datetime.fromisoformat(birthDate),
-        nationality=nationality,
-        document_type=documentType,
-        document_number=documentNumber,
-        document_issue_date=datetime.fromisoformat(documentIssueDate),
-        document_expiry_date=datetime.fromisoformat(documentExpiryDate),
-        document_file_url=document_url,
-        oam_number=oamNumber,
-        oam_registration_year=oamRegistrationYear,
-        oam_card_file_url=oam_card_url,
-        especialidade=specs_list[0] if specs_list else "Geral",
-        specializations=specs_list,
-        cv_file_url=cv_url,
-        additional_docs_urls=additional_urls if additional_urls else None,
-        professional_email=professionalEmail,
-        professional_phone=format_mozambique_phone(professionalPhone),
-        phone_number=format_mozambique_phone(professionalPhone),
-        office_address=officeAddress,
-        city=city,
-        province=province,
-        password_hash=get_password_hash(password),
-        terms_accepted=termsAccepted,
-        legal_declaration=legalDeclaration,
-        verification_authorization=verificationAuthorization,
-        verification_status="pending_verification"
-    )
+    # Upload de arquivos em paralelo; as referências só ficam gravadas se o commit passar
+    async with UploadBatch(db) as uploads:
+        document_url, oam_card_url, cv_url, *additional_urls = await uploads.ingest(
+            [documentFile, oamCardFile, cvFile, *(additionalDocs or [])]
+        )
+        additional_urls = [url for url in additional_urls if url]
+        
+        # Criar advogado
+        new_lawyer = Lawyer(
+            nome=fullName,
+            birth_date=datetime.fromisoformat(birthDate),
+            nationality=nationality,
+            document_type=documentType,
+            document_number=documentNumber,
+            document_issue_date=datetime.fromisoformat(documentIssueDate),
+            document_expiry_date=datetime.fromisoformat(documentExpiryDate),
+            document_file_url=document_url,
+            oam_number=oamNumber,
+            oam_registration_year=oamRegistrationYear,
+            oam_card_file_url=oam_card_url,
+            especialidade=specs_list[0] if specs_list else "Geral",
+            specializations=specs_list,
+            cv_file_url=cv_url,
+            additional_docs_urls=additional_urls if additional_urls else None,
+            professional_email=professionalEmail,
+            professional_phone=format_mozambique_phone(professionalPhone),
+            phone_number=format_mozambique_phone(professionalPhone),
+            office_address=officeAddress,
+            city=city,
+            province=province,
+            password_hash=await get_password_hash_async(password),
+            terms_accepted=termsAccepted,
+            legal_declaration=legalDeclaration,
+            verification_authorization=verificationAuthorization,
+            verification_status="pending_verification"
+        )
+        
+        db.add(new_lawyer)
+        try:
+            await db.commit()
+        except IntegrityError as exc:
+            # Registo em paralelo com os mesmos dados únicos
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=LAWYER_UNIQUE_MESSAGES.get(violated_constraint(exc), "Advogado já cadastrado")
+            )
     
-    db.add(new_lawyer)
-    db.commit()
-    db.refresh(new_lawyer)
+    await db.refresh(new_lawyer)
     
     return {
         "success": True,
@@ -307,7 +321,7 @@ async def register_lawyer(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Logout (no servidor, apenas invalida token no cliente)
@@ -321,7 +335,7 @@ async def logout(
 @router.get("/verify")
 async def verify_token_endpoint(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Verifica se o token é válido
@@ -4,17 +4,21 @@ POST /consultations/{orderId}/rating
 GET /lawyers/{lawyerId}/ratings
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
-from database import get_db
+from database import get_async_db
 from modelos.avaliacoes import Rating
 from modelos.consultas import Order, OrderStatus
 from modelos.advogados import Lawyer
 from modelos.usuarios import User
-from utils.dependencias import get_current_user
-from sqlalchemy import func
+from servicos.atribuicao import assignment_engine, OPEN_CASE_STATUSES
+from servicos.diretorio import invalidate_lawyer_directory
+from servicos.avaliacoes import record_rating
+from utils.dependencias import get_current_user, UserPrincipal
+from utils.paginacao import fetch_page, page_info, page_size
 
 router = APIRouter(tags=["Avaliações"])
 
@@ -28,12 +32,18 @@ class CreateRatingRequest(BaseModel):
 async def create_rating(
     order_id: str,
     request: CreateRatingRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Criar avaliação"""
+    if not 1 <= request.stars <= 5:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A avaliação deve ter entre 1 e 5 estrelas"
+        )
+    
     # Verificar se order existe
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -48,7 +58,7 @@ async def create_rating(
         )
     
     # Verificar se já existe avaliação
-    existing_rating = db.query(Rating).filter(Rating.order_id == order_id).first()
+    existing_rating = await db.scalar(select(Rating).where(Rating.order_id == order_id))
     if existing_rating:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,7 +67,7 @@ async def create_rating(
     
     # Buscar advogado da consulta
     from modelos.consultas import Assignment
-    assignment = db.query(Assignment).filter(Assignment.order_id == order_id).first()
+    assignment = await db.scalar(select(Assignment).where(Assignment.order_id == order_id))
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,26 +86,20 @@ async def create_rating(
     db.add(rating)
     
     # Atualizar status do order
+    was_open = order.status in OPEN_CASE_STATUSES
     order.status = OrderStatus.COMPLETED.value
     
-    # Atualizar estatísticas do advogado
-    lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == assignment.lawyer_id).first()
-    if lawyer:
-        # Recalcular rating médio
-        avg_rating = db.query(func.avg(Rating.stars)).filter(
-            Rating.lawyer_id == assignment.lawyer_id
-        ).scalar() or 0.0
-        
-        total_reviews = db.query(Rating).filter(
-            Rating.lawyer_id == assignment.lawyer_id
-        ).count() + 1
-        
-        lawyer.rating = round(avg_rating, 1)
-        lawyer.total_reviews = total_reviews
-        lawyer.cases_completed += 1
+    # Atualizar agregados do advogado (mesma transação do INSERT)
+    new_rating = await record_rating(db, assignment.lawyer_id, request.stars)
+    if new_rating is not None:
+        await invalidate_lawyer_directory(db)
     
-    db.commit()
-    db.refresh(rating)
+    await db.commit()
+    await db.refresh(rating)
+    if was_open:
+        assignment_engine.release_assignment(assignment.lawyer_id)
+    if new_rating is not None:
+        assignment_engine.set_rating(assignment.lawyer_id, new_rating)
     
     return {
         "success": True,
@@ -107,37 +111,48 @@ async def create_rating(
 @router.get("/lawyers/{lawyer_id}/ratings")
 async def get_lawyer_ratings(
     lawyer_id: str,
-    page: int = 1,
+    cursor: Optional[str] = None,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    page: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Obter avaliações do advogado"""
-    # Buscar avaliações
-    query = db.query(Rating).filter(Rating.lawyer_id == lawyer_id)
-    total = query.count()
+    """
+    Obter avaliações do advogado
     
-    ratings = query.order_by(Rating.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+    Duas consultas: os agregados mantidos no advogado (total, média e
+    distribuição) e a página de avaliações com o nome do cliente (join),
+    paginada por cursor (created_at, id). O total é o contador mantido no
+    advogado, exato e sem COUNT.
+    """
+    limit = page_size(limit)
+    lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == lawyer_id))
+    if not lawyer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Advogado não encontrado"
+        )
     
-    # Calcular distribuição
-    distribution = {}
-    for i in range(1, 6):
-        count = db.query(Rating).filter(
-            Rating.lawyer_id == lawyer_id,
-            Rating.stars == i
-        ).count()
-        distribution[str(i)] = count
+    total = lawyer.total_reviews or 0
+    avg_rating = lawyer.rating_sum / total if total else 0.0
+    distribution = lawyer.rating_distribution()
     
-    # Calcular média
-    avg_rating = db.query(func.avg(Rating.stars)).filter(
-        Rating.lawyer_id == lawyer_id
-    ).scalar() or 0.0
+    # Página de avaliações com o nome do cliente
+    rows, next_cursor = await fetch_page(
+        db,
+        select(Rating, User.full_name)
+        .outerjoin(User, User.id == Rating.user_id)
+        .where(Rating.lawyer_id == lawyer_id),
+        keys=[(Rating.created_at, True), (Rating.id, True)],
+        cursor=cursor,
+        limit=limit,
+        cursor_values=lambda row: [row.Rating.created_at, row.Rating.id],
+        page=page
+    )
     
-    # Buscar informações dos clientes
     ratings_data = []
-    for rating in ratings:
-        user = db.query(User).filter(User.id == rating.user_id).first()
+    for rating, client_name in rows:
         rating_dict = rating.to_dict()
-        rating_dict["client"] = {"fullName": user.full_name} if user else None
+        rating_dict["client"] = {"fullName": client_name} if client_name else None
         ratings_data.append(rating_dict)
     
     return {
@@ -147,5 +162,6 @@ async def get_lawyer_ratings(
             "averageRating": round(avg_rating, 1),
             "totalReviews": total,
             "distribution": distribution
-        }
+        },
+        "pagination": page_info(limit, next_cursor, total, page=page)
     }
@@ -3,17 +3,38 @@ Rotas de Chat e Mensagens
 POST /consultations/{orderId}/messages
 POST /consultations/{orderId}/documents
 GET /consultations/{orderId}/messages
+GET /consultations/{orderId}/events (SSE)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
+import asyncio
+import uuid
 
-from database import get_db
+from database import get_async_db
 from modelos.mensagens import ChatMessage, Document
-from modelos.consultas import Order
-from servicos.upload import save_upload_file
+from modelos.consultas import Order, Assignment
+from modelos.usuarios import User
+from servicos.autenticacao import verify_token
+from servicos.tempo_real import chat_hub
+from servicos.upload import store_upload_file
 from utils.dependencias import get_current_user
+from utils.paginacao import encode_cursor, decode_cursor, keyset_after, cursor_datetime
+from utils.respostas import FastJSONResponse, dumps
+
+# Intervalo entre comentários keep-alive do SSE (segundos)
+SSE_KEEPALIVE_SECONDS = 15
+
+# Mensagens reenviadas ao retomar pelo Last-Event-ID (o resto via after)
+SSE_REPLAY_LIMIT = 200
+
+
+def _message_event_id(message: Dict) -> str:
+    """ID do evento SSE: o cursor (timestamp, id) da mensagem, como em after"""
+    return encode_cursor([cursor_datetime(message["timestamp"]), message["id"]])
 
 router = APIRouter(prefix="/consultations", tags=["Chat"])
 
@@ -29,11 +50,11 @@ async def send_message(
     order_id: str,
     request: SendMessageRequest,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enviar mensagem"""
     # Verificar se order existe
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,8 +74,11 @@ async def send_message(
     )
     
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.flush()
+    await chat_hub.publish(db, order_id, message.to_dict())
+    await db.commit()
+    chat_hub.flush_local(db)
+    await db.refresh(message)
     
     return {
         "success": True,
@@ -68,11 +92,11 @@ async def upload_document(
     sender_id: str,
     file: UploadFile = File(...),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enviar documento"""
     # Verificar se order existe
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -80,7 +104,7 @@ async def upload_document(
         )
     
     # Upload do arquivo
-    file_url = await save_upload_file(file, "chat_documents")
+    file_url = await store_upload_file(db, file)
     if not file_url:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -97,8 +121,8 @@ async def upload_document(
     )
     
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    await db.refresh(document)
     
     # Criar mensagem de documento
     sender = "user" if str(current_user.id) == sender_id else "lawyer"
@@ -111,8 +135,11 @@ async def upload_document(
     )
     
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.flush()
+    await chat_hub.publish(db, order_id, message.to_dict())
+    await db.commit()
+    chat_hub.flush_local(db)
+    await db.refresh(message)
     
     return {
         "success": True,
@@ -121,28 +148,186 @@ async def upload_document(
     }
 
 
-@router.get("/{order_id}/messages")
+@router.get("/{order_id}/messages", response_class=FastJSONResponse)
 async def get_messages(
     order_id: str,
     limit: int = 50,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Obter mensagens da consulta"""
+    """
+    Obter mensagens da consulta (ordem cronológica)
+    
+    Sem cursor retorna as mensagens mais recentes; before pagina para trás
+    no histórico e after retorna apenas as mensagens novas (sincronização).
+    Serializada com orjson (FastJSONResponse).
+    """
     # Verificar se order existe
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consulta não encontrada"
         )
     
-    # Buscar mensagens
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.order_id == order_id
-    ).order_by(ChatMessage.timestamp.asc()).limit(limit).all()
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use apenas before ou after"
+        )
     
-    return {
+    limit = max(1, min(limit, 200))
+    cursor_types = (cursor_datetime, uuid.UUID)
+    before_key = decode_cursor(before, 2, cursor_types)
+    after_key = decode_cursor(after, 2, cursor_types)
+    
+    # Buscar mensagens (keyset em (timestamp, id); after sobe, before desce)
+    descending = not after_key
+    keys = [(ChatMessage.timestamp, descending), (ChatMessage.id, descending)]
+    query = select(ChatMessage).where(ChatMessage.order_id == order_id)
+    
+    cursor_key = after_key or before_key
+    if cursor_key:
+        query = query.where(keyset_after(keys, cursor_key))
+    query = query.order_by(
+        *(expr.desc() if descending else expr.asc() for expr, _ in keys)
+    )
+    
+    result = await db.execute(query.limit(limit + 1))
+    messages = result.scalars().all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    
+    if not after_key:
+        messages.reverse()
+    
+    return FastJSONResponse({
         "success": True,
-        "messages": [msg.to_dict() for msg in messages]
-    }
+        "messages": [msg.to_dict() for msg in messages],
+        "pagination": {
+            "before": encode_cursor([messages[0].timestamp, messages[0].id]) if messages else before,
+            "after": encode_cursor([messages[-1].timestamp, messages[-1].id]) if messages else after,
+            "hasMore": has_more
+        }
+    })
+
+
+async def _authorize_stream(token: Optional[str], order_id: str, db: AsyncSession) -> None:
+    """
+    Verifica se o portador do token participa da consulta
+    
+    EventSource não envia cabeçalhos, por isso o token pode vir na query.
+    """
+    payload = verify_token(token) if token else None
+    if not payload or not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido ou expirado"
+        )
+    
+    order = await db.scalar(select(Order).where(Order.id == order_id))
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Consulta não encontrada"
+        )
+    
+    subject = payload["sub"]
+    if payload.get("role") == "lawyer":
+        assignment = await db.scalar(select(Assignment).where(Assignment.order_id == order_id))
+        allowed = assignment is not None and str(assignment.lawyer_id) == subject
+    elif str(order.user_id) == subject:
+        allowed = True
+    else:
+        user = await db.scalar(select(User).where(User.id == subject))
+        allowed = user is not None and user.is_admin
+    
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado"
+        )
+
+
+@router.get("/{order_id}/events")
+async def stream_messages(
+    order_id: str,
+    request: Request,
+    token: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Receber novas mensagens em tempo real (Server-Sent Events)
+    
+    O id de cada evento é o cursor da mensagem. Ao religar, o EventSource
+    envia o último em Last-Event-ID e as mensagens posteriores (até
+    SSE_REPLAY_LIMIT) são reenviadas antes das novas; o mesmo valor serve
+    de after em GET /messages para recuperar o resto.
+    """
+    if not token:
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            token = authorization[len("Bearer "):]
+    
+    await _authorize_stream(token, order_id, db)
+    
+    try:
+        resume_key = decode_cursor(
+            request.headers.get("Last-Event-ID"), 2, (cursor_datetime, uuid.UUID)
+        )
+    except HTTPException:
+        # ID de outro formato: retomar sem reenvio
+        resume_key = None
+    
+    # Inscrever antes de ler as mensagens perdidas para não haver intervalo
+    queue = chat_hub.subscribe(order_id)
+    missed = []
+    try:
+        if resume_key:
+            keys = [(ChatMessage.timestamp, False), (ChatMessage.id, False)]
+            result = await db.execute(
+                select(ChatMessage)
+                .where(ChatMessage.order_id == order_id, keyset_after(keys, resume_key))
+                .order_by(ChatMessage.timestamp, ChatMessage.id)
+                .limit(SSE_REPLAY_LIMIT)
+            )
+            missed = [msg.to_dict() for msg in result.scalars().all()]
+    except BaseException:
+        chat_hub.unsubscribe(order_id, queue)
+        raise
+    
+    # Libertar a ligação ao banco antes de manter o stream aberto
+    await db.close()
+    
+    async def event_stream():
+        replayed = {str(message["id"]) for message in missed}
+        try:
+            yield "retry: 3000\n\n"
+            for message in missed:
+                data = dumps(message).decode()
+                yield f"id: {_message_event_id(message)}\nevent: message\ndata: {data}\n\n"
+            
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if str(message["id"]) in replayed:
+                    replayed.discard(str(message["id"]))
+                    continue
+                data = dumps(message).decode()
+                yield f"id: {_message_event_id(message)}\nevent: message\ndata: {data}\n\n"
+        finally:
+            chat_hub.unsubscribe(order_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
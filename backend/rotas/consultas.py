@@ -7,17 +7,22 @@ PATCH /consultations/{orderId}/status
 POST /consultations/{orderId}/assign
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
-from database import get_db
+from database import get_async_db
 from modelos.consultas import Order, Assignment, Session as ConsultationSession, OrderStatus
-from modelos.usuarios import User
 from modelos.advogados import Lawyer
-from utils.dependencias import get_current_user, get_current_admin
-from utils.helpers import generate_human_id
+from modelos.catalogo import Topic, Package
+from utils.dependencias import get_current_user, get_current_admin, UserPrincipal
+from utils.paginacao import fetch_page, count_items, page_info, page_size
+from servicos.identificadores import allocate_order_human_id
+from servicos.atribuicao import assignment_engine, OPEN_CASE_STATUSES
+from servicos.estatisticas import bump_lawyer_stats
+from servicos.catalogo import resolve_order_catalog
 
 router = APIRouter(prefix="/consultations", tags=["Consultas"])
 
@@ -42,58 +47,82 @@ class AssignLawyerRequest(BaseModel):
 @router.post("")
 async def create_consultation(
     request: CreateConsultationRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Criar nova consulta com advogado e pagamento automático"""
+    # Tema (especialidade) e pacote (preço) vêm do catálogo
+    topic, package = await resolve_order_catalog(db, request.topic, request.pkg)
+    
     # Gerar ID legível
-    human_id = generate_human_id("FC")
+    human_id = await allocate_order_human_id()
     
     # Determinar advogado
     lawyer_id = request.selectedLawyerId
+    assignment_reason = None
     
     if not lawyer_id or lawyer_id == "auto":
-        # Auto-atribuir: buscar advogado disponível da especialidade
-        specialty = request.topic.get("name", "")
-        available_lawyer = db.query(Lawyer).filter(
-            Lawyer.especialidade == specialty,
-            Lawyer.is_active == True,
-            Lawyer.verification_status == "verified",
-            Lawyer.is_online == True
-        ).first()
-        
-        if not available_lawyer:
-            # Se não houver online, pegar qualquer um verificado
-            available_lawyer = db.query(Lawyer).filter(
-                Lawyer.especialidade == specialty,
-                Lawyer.is_active == True,
-                Lawyer.verification_status == "verified"
-            ).first()
+        # Auto-atribuir: advogado online com menor carga da especialidade
+        specialty = topic.specialty
+        choice = await assignment_engine.choose(db, specialty)
         
-        if not available_lawyer:
+        if not choice:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Nenhum advogado disponível para {specialty}"
             )
         
-        lawyer_id = str(available_lawyer.lawyer_id)
+        lawyer_id, assignment_reason = choice
+    else:
+        assignment_engine.record_assignment(lawyer_id)
     
-    # Verificar se advogado existe
-    lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == lawyer_id).first()
-    if not lawyer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Advogado não encontrado"
+    try:
+        # Verificar se advogado existe
+        lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == lawyer_id))
+        if not lawyer:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Advogado não encontrado"
+            )
+        
+        new_order, assignment = await _create_assigned_order(
+            db, request, topic, package, human_id, lawyer_id
         )
+    except Exception:
+        # Devolver a carga reservada no motor de atribuição
+        assignment_engine.release_assignment(lawyer_id)
+        raise
     
+    return {
+        "success": True,
+        "message": "Consulta criada e advogado atribuído com sucesso!",
+        "order": new_order.to_dict(),
+        "lawyer": lawyer.to_dict(),
+        "assignment": assignment.to_dict(),
+        "assignmentReason": assignment_reason
+    }
+
+
+async def _create_assigned_order(
+    db: AsyncSession,
+    request: CreateConsultationRequest,
+    topic: Topic,
+    package: Package,
+    human_id: str,
+    lawyer_id: str
+):
+    """Grava o pedido (com snapshot do tema e pacote) e a atribuição ao advogado"""
     # Criar order
     new_order = Order(
         human_id=human_id,
         order_id=human_id,
         user_id=request.user_id,
         client_phone_number=request.clientPhoneNumber,
-        topic=request.topic,
-        pkg=request.pkg,
+        topic_id=topic.id,
+        package_id=package.id,
+        price=package.price,
+        topic=topic.to_dict(),
+        pkg=package.to_dict(),
         consultation_type=request.consultationType,
         status=OrderStatus.ASSIGNED.value,  # Já atribuído
         payment_status="confirmed",  # Pagamento automático (temporário)
@@ -101,7 +130,7 @@ async def create_consultation(
     )
     
     db.add(new_order)
-    db.flush()  # Para obter o ID
+    await db.flush()  # Para obter o ID
     
     # Criar assignment
     assignment = Assignment(
@@ -110,27 +139,24 @@ async def create_consultation(
     )
     
     db.add(assignment)
-    db.commit()
-    db.refresh(new_order)
-    db.refresh(assignment)
+    await bump_lawyer_stats(
+        db, lawyer_id, consultations=1, revenue=package.price
+    )
+    await db.commit()
+    await db.refresh(new_order)
+    await db.refresh(assignment)
     
-    return {
-        "success": True,
-        "message": "Consulta criada e advogado atribuído com sucesso!",
-        "order": new_order.to_dict(),
-        "lawyer": lawyer.to_dict(),
-        "assignment": assignment.to_dict()
-    }
+    return new_order, assignment
 
 
 @router.get("/{order_id}")
 async def get_consultation(
     order_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter detalhes da consulta"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -147,10 +173,10 @@ async def get_consultation(
     result = order.to_dict()
     
     # Adicionar assignment se existir
-    assignment = db.query(Assignment).filter(Assignment.order_id == order_id).first()
+    assignment = await db.scalar(select(Assignment).where(Assignment.order_id == order_id))
     if assignment:
-        lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == assignment.lawyer_id).first()
-        session = db.query(ConsultationSession).filter(ConsultationSession.assignment_id == assignment.assignment_id).first()
+        lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == assignment.lawyer_id))
+        session = await db.scalar(select(ConsultationSession).where(ConsultationSession.assignment_id == assignment.assignment_id))
         
         result["assignment"] = {
             **assignment.to_dict(),
@@ -165,35 +191,44 @@ async def get_consultation(
 async def list_user_consultations(
     user_id: str,
     status_filter: Optional[str] = None,
-    page: int = 1,
+    cursor: Optional[str] = None,
     limit: int = 20,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    page: Optional[int] = None,
+    total: str = "estimate",
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Listar consultas do usuário"""
+    """
+    Listar consultas do usuário
+    
+    Mais recentes primeiro, com paginação por cursor (created_at, id).
+    """
     if str(current_user.id) != user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso negado"
         )
     
-    query = db.query(Order).filter(Order.user_id == user_id)
+    limit = page_size(limit)
+    query = select(Order).where(Order.user_id == user_id)
     
     if status_filter:
-        query = query.filter(Order.status == status_filter)
+        query = query.where(Order.status == status_filter)
     
-    total = query.count()
-    orders = query.order_by(Order.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+    total_items, estimated = await count_items(db, query, total)
+    rows, next_cursor = await fetch_page(
+        db, query,
+        keys=[(Order.created_at, True), (Order.id, True)],
+        cursor=cursor,
+        limit=limit,
+        cursor_values=lambda row: [row.Order.created_at, row.Order.id],
+        page=page
+    )
     
     return {
         "success": True,
-        "data": [order.to_dict() for order in orders],
-        "pagination": {
-            "currentPage": page,
-            "totalPages": (total + limit - 1) // limit,
-            "totalItems": total,
-            "itemsPerPage": limit
-        }
+        "data": [row.Order.to_dict() for row in rows],
+        "pagination": page_info(limit, next_cursor, total_items, estimated, page=page)
     }
 
 
@@ -201,20 +236,32 @@ async def list_user_consultations(
 async def update_consultation_status(
     order_id: str,
     request: UpdateStatusRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualizar status da consulta"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consulta não encontrada"
         )
     
+    previous_status = order.status
     order.status = request.status
     order.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    
+    # Atualizar carga do advogado no motor de atribuição
+    was_open = previous_status in OPEN_CASE_STATUSES
+    is_open = request.status in OPEN_CASE_STATUSES
+    if was_open != is_open:
+        assignment = await db.scalar(select(Assignment).where(Assignment.order_id == order_id))
+        if assignment:
+            if is_open:
+                assignment_engine.record_assignment(assignment.lawyer_id)
+            else:
+                assignment_engine.release_assignment(assignment.lawyer_id)
     
     return {
         "success": True,
@@ -228,11 +275,11 @@ async def update_consultation_status(
 async def assign_lawyer(
     order_id: str,
     request: AssignLawyerRequest,
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atribuir advogado a uma consulta (Admin)"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -240,7 +287,7 @@ async def assign_lawyer(
         )
     
     # Verificar se advogado existe
-    lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == request.lawyer_id).first()
+    lawyer = await db.scalar(select(Lawyer).where(Lawyer.lawyer_id == request.lawyer_id))
     if not lawyer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -258,8 +305,12 @@ async def assign_lawyer(
     # Atualizar status do order
     order.status = OrderStatus.ASSIGNED.value
     
-    db.commit()
-    db.refresh(assignment)
+    await bump_lawyer_stats(
+        db, request.lawyer_id, consultations=1, revenue=order.price
+    )
+    await db.commit()
+    await db.refresh(assignment)
+    assignment_engine.record_assignment(request.lawyer_id)
     
     return {
         "success": True,
@@ -5,19 +5,31 @@ GET /payments/mpesa/{transactionId}/status
 POST /payments/mpesa/callback
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from database import get_db
-from modelos.pagamentos import Payment
+from database import get_async_db
+from modelos.pagamentos import Payment, MpesaCallback
 from modelos.consultas import Order, OrderStatus, PaymentStatus
-from servicos.mpesa import initiate_mpesa_payment, verify_mpesa_payment, process_mpesa_callback
+from config import settings
+from servicos.mpesa import initiate_mpesa_payment
+from servicos.pagamentos import callback_inbox, callback_inbox_key, callback_column
 from utils.dependencias import get_current_user
 
 router = APIRouter(prefix="/payments", tags=["Pagamentos"])
 
 
+# Status gravado em payments -> status devolvido ao cliente
+PAYMENT_STATUS_RESPONSE = {
+    "pending": "pending",
+    "completed": "confirmed",
+    "failed": "failed"
+}
+
+
 class InitiatePaymentRequest(BaseModel):
     orderId: str
     phoneNumber: str
@@ -29,11 +41,11 @@ class InitiatePaymentRequest(BaseModel):
 async def initiate_payment(
     request: InitiatePaymentRequest,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Iniciar pagamento M-Pesa"""
     # Verificar se order existe
-    order = db.query(Order).filter(Order.id == request.orderId).first()
+    order = await db.scalar(select(Order).where(Order.id == request.orderId))
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,7 +73,11 @@ async def initiate_payment(
         client_phone=request.phoneNumber,
         amount=request.amount,
         method="mpesa",
-        status="pending"
+        status="pending",
+        # Primeira verificação pelo reconciliador, se o callback não chegar
+        next_check_at=datetime.utcnow() + timedelta(
+            seconds=settings.PAYMENT_RECONCILE_INITIAL_DELAY_SECONDS
+        )
     )
     
     db.add(payment)
@@ -71,7 +87,7 @@ async def initiate_payment(
     order.payment_method = "mpesa"
     order.payment_status = PaymentStatus.PENDING.value
     
-    db.commit()
+    await db.commit()
     
     return {
         "success": True,
@@ -85,80 +101,71 @@ async def initiate_payment(
 async def check_payment_status(
     transaction_id: str,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Verificar status do pagamento"""
-    payment = db.query(Payment).filter(Payment.transaction_id == transaction_id).first()
+    """
+    Verificar status do pagamento
+    
+    Responde apenas com o estado gravado; a confirmação vem do callback
+    ou do reconciliador em segundo plano (servicos/pagamentos.py).
+    """
+    payment = await db.scalar(select(Payment).where(Payment.transaction_id == transaction_id))
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pagamento não encontrado"
         )
     
-    # Se já confirmado, retornar status
-    if payment.status == "completed":
-        return {
-            "success": True,
-            "transactionId": transaction_id,
-            "status": "confirmed",
-            "amount": payment.amount,
-            "phoneNumber": payment.client_phone,
-            "confirmedAt": payment.confirmed_at.isoformat() if payment.confirmed_at else None
-        }
-    
-    # Verificar com M-Pesa
-    result = await verify_mpesa_payment(transaction_id)
-    
-    if result.get("status") == "confirmed":
-        # Atualizar pagamento
-        payment.status = "completed"
-        payment.confirmed_at = datetime.utcnow()
-        
-        # Atualizar order
-        order = db.query(Order).filter(Order.id == payment.order_id).first()
-        if order:
-            order.payment_status = PaymentStatus.CONFIRMED.value
-            order.status = OrderStatus.PENDING_ASSIGNMENT.value
-        
-        db.commit()
-    
     return {
         "success": True,
         "transactionId": transaction_id,
-        "status": result.get("status", "pending"),
+        "status": PAYMENT_STATUS_RESPONSE.get(payment.status, "pending"),
         "amount": payment.amount,
         "phoneNumber": payment.client_phone,
-        "confirmedAt": payment.confirmed_at.isoformat() if payment.confirmed_at else None
+        "confirmedAt": payment.confirmed_at.isoformat() if payment.confirmed_at else None,
+        "nextCheckAt": payment.next_check_at.isoformat() if payment.next_check_at else None
     }
 
 
 @router.post("/mpesa/callback")
 async def mpesa_callback(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Webhook de confirmação M-Pesa (chamado pela Vodacom)"""
-    callback_data = await request.json()
+    """
+    Webhook de confirmação M-Pesa (chamado pela Vodacom)
     
-    # Processar callback
-    result = process_mpesa_callback(callback_data)
+    Apenas grava o callback na caixa de entrada (um INSERT, ignorado se
+    a Vodacom reenviar o mesmo callback) e responde sempre com o ack do
+    gateway, mesmo sem output_TransactionID (guardado sob uma chave
+    derivada); a validação e a atualização do pagamento e da consulta
+    são feitas pelo CallbackInboxWorker.
+    """
+    try:
+        callback_data = await request.json()
+    except ValueError:
+        callback_data = None
+    if not isinstance(callback_data, dict):
+        body = await request.body()
+        callback_data = {"raw": body.decode("utf-8", "replace")}
     
-    if result["success"]:
-        # Atualizar pagamento
-        payment = db.query(Payment).filter(
-            Payment.transaction_id == result["transactionId"]
-        ).first()
-        
-        if payment:
-            payment.status = "completed"
-            payment.confirmed_at = datetime.utcnow()
-            
-            # Atualizar order
-            order = db.query(Order).filter(Order.id == payment.order_id).first()
-            if order:
-                order.payment_status = PaymentStatus.CONFIRMED.value
-                order.status = OrderStatus.PENDING_ASSIGNMENT.value
-            
-            db.commit()
+    await db.execute(
+        pg_insert(MpesaCallback).values(
+            transaction_id=callback_inbox_key(callback_data),
+            third_party_reference=callback_column(
+                callback_data.get("output_ThirdPartyReference"), MpesaCallback.third_party_reference
+            ),
+            response_code=callback_column(callback_data.get("output_ResponseCode"), MpesaCallback.response_code),
+            payload=callback_data
+        ).on_conflict_do_nothing(index_elements=["transaction_id"])
+    )
+    await db.commit()
+    callback_inbox.notify()
     
-    return {"success": True}
+    return {
+        "success": True,
+        "output_ResponseCode": "0",
+        "output_ResponseDesc": "Successfully Accepted Result",
+        "output_OriginalConversationID": callback_data.get("output_ConversationID"),
+        "output_ThirdPartyConversationID": callback_data.get("output_ThirdPartyReference")
+    }
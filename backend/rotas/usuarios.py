@@ -6,14 +6,17 @@ GET /users (Admin)
 PATCH /users/{userId}/status (Admin)
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 
-from database import get_db
+from database import get_async_db
 from modelos.usuarios import User
-from utils.dependencias import get_current_user, get_current_admin
+from servicos.pesquisa import normalize_search, ranked_search, user_search_filter, user_search_score
+from utils.dependencias import get_current_user, get_current_admin, invalidate_principal, UserPrincipal
+from utils.paginacao import fetch_page, count_items, page_info, page_size
 
 router = APIRouter(prefix="/users", tags=["Usuários"])
 
@@ -32,8 +35,8 @@ class UpdateStatusRequest(BaseModel):
 @router.get("/{user_id}")
 async def get_user_profile(
     user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter perfil do usuário"""
     # Verificar se é o próprio usuário ou admin
@@ -43,7 +46,7 @@ async def get_user_profile(
             detail="Acesso negado"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,8 +60,8 @@ async def get_user_profile(
 async def update_user_profile(
     user_id: str,
     request: UpdateUserRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualizar perfil do usuário"""
     if str(current_user.id) != user_id:
@@ -67,7 +70,7 @@ async def update_user_profile(
             detail="Acesso negado"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,8 +92,9 @@ async def update_user_profile(
         user.address = address
     
     user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    await invalidate_principal(db, user.id)
+    await db.commit()
+    await db.refresh(user)
     
     return {
         "success": True,
@@ -101,41 +105,62 @@ async def update_user_profile(
 
 @router.get("")
 async def list_users(
-    page: int = 1,
+    cursor: Optional[str] = None,
     limit: int = 20,
+    page: Optional[int] = None,
+    total: str = "estimate",
     search: Optional[str] = None,
     status_filter: Optional[str] = None,
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Listar todos os usuários (Admin apenas)"""
-    query = db.query(User)
+    """
+    Listar todos os usuários (Admin apenas)
+    
+    Mais recentes primeiro, com paginação por cursor (created_at, id).
+    search procura no nome e email (índices pg_trgm) e ordena por relevância;
+    termos com menos de 3 caracteres ordenam pelos mais recentes.
+    """
+    limit = page_size(limit)
+    keys = [(User.created_at, True), (User.id, True)]
+    query = select(User)
+    filtered = False
     
     # Filtros
-    if search:
-        query = query.filter(
-            (User.full_name.ilike(f"%{search}%")) |
-            (User.email.ilike(f"%{search}%"))
-        )
+    term = normalize_search(search) if search else ""
+    ranked = ranked_search(term)
+    if term:
+        query = query.where(user_search_filter(term))
+        filtered = True
+    if ranked:
+        score = user_search_score(term)
+        query = query.add_columns(score.label("score"))
+        keys.insert(0, (score, True))
     
     if status_filter == "active":
-        query = query.filter(User.is_active == True)
+        query = query.where(User.is_active == True)
+        filtered = True
     elif status_filter == "inactive":
-        query = query.filter(User.is_active == False)
+        query = query.where(User.is_active == False)
+        filtered = True
     
     # Paginação
-    total = query.count()
-    users = query.offset((page - 1) * limit).limit(limit).all()
+    total_items, estimated = await count_items(
+        db, query, total, table=None if filtered else User.__tablename__
+    )
+    rows, next_cursor = await fetch_page(
+        db, query,
+        keys=keys,
+        cursor=cursor,
+        limit=limit,
+        cursor_values=lambda row: ([row.score] if ranked else []) + [row.User.created_at, row.User.id],
+        page=page
+    )
     
     return {
         "success": True,
-        "data": [user.to_dict() for user in users],
-        "pagination": {
-            "currentPage": page,
-            "totalPages": (total + limit - 1) // limit,
-            "totalItems": total,
-            "itemsPerPage": limit
-        }
+        "data": [row.User.to_dict() for row in rows],
+        "pagination": page_info(limit, next_cursor, total_items, estimated, page=page)
     }
 
 
@@ -143,11 +168,11 @@ async def list_users(
 async def update_user_status(
     user_id: str,
     request: UpdateStatusRequest,
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: UserPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Ativar/Desativar usuário (Admin apenas)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -155,7 +180,8 @@ async def update_user_status(
         )
     
     user.is_active = request.status == "active"
-    db.commit()
+    await invalidate_principal(db, user.id)
+    await db.commit()
     
     return {
         "success": True,
@@ -4,13 +4,21 @@ Serviços - Fala Comigo Advogado
 from .autenticacao import *
 from .mpesa import *
 from .upload import *
+from .identificadores import allocate_order_human_id
 
 __all__ = [
     "get_password_hash",
     "verify_password",
+    "get_password_hash_async",
+    "verify_password_async",
+    "get_password_hash_pool_stats",
     "create_access_token",
     "verify_token",
     "initiate_mpesa_payment",
     "verify_mpesa_payment",
-    "save_upload_file"
+    "save_upload_file",
+    "store_upload_file",
+    "UploadBatch",
+    "delete_file",
+    "allocate_order_human_id"
 ]
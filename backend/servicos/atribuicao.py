@@ -0,0 +1,279 @@
+"""
+Serviço de Atribuição Automática de Advogados
+
+Mantém em memória, por worker, a carga (casos abertos), estado online e
+rating de cada advogado verificado, indexados por especialidade num heap.
+A escolha é O(log n): o topo do heap da especialidade é o advogado online
+com menos casos abertos, desempatado pela especialidade principal e rating.
+
+O estado é sincronizado com assignments/orders no arranque e sempre que
+fica mais antigo que ASSIGNMENT_SYNC_SECONDS (converge entre workers).
+"""
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from modelos.advogados import Lawyer, VerificationStatus
+from modelos.consultas import Order, Assignment, OrderStatus
+
+# Status de pedido que contam como carga do advogado
+OPEN_CASE_STATUSES = (OrderStatus.ASSIGNED.value, OrderStatus.IN_PROGRESS.value)
+
+
+class LawyerLoad:
+    """Estado de um advogado no motor de atribuição"""
+
+    __slots__ = ("lawyer_id", "especialidade", "specializations", "rating",
+                 "is_online", "open_cases", "version")
+
+    def __init__(self, lawyer_id: str, especialidade: str, specializations: List[str],
+                 rating: float, is_online: bool, open_cases: int = 0):
+        self.lawyer_id = lawyer_id
+        self.especialidade = especialidade
+        self.specializations = specializations
+        self.rating = rating
+        self.is_online = is_online
+        self.open_cases = open_cases
+        self.version = 0
+
+    def specialties(self) -> set:
+        """Todas as especialidades em que o advogado pode ser escolhido"""
+        return {self.especialidade, *(self.specializations or [])}
+
+    def sort_key(self, specialty: str) -> Tuple:
+        """Chave de ordenação: online, menor carga, especialidade principal, rating"""
+        return (
+            not self.is_online,
+            self.open_cases,
+            self.especialidade != specialty,
+            -(self.rating or 0.0),
+            self.lawyer_id
+        )
+
+    def to_dict(self) -> Dict:
+        """Converte para dicionário"""
+        return {
+            "lawyer_id": self.lawyer_id,
+            "especialidade": self.especialidade,
+            "specializations": self.specializations,
+            "rating": self.rating,
+            "isOnline": self.is_online,
+            "openCases": self.open_cases
+        }
+
+
+class AssignmentEngine:
+    """
+    Motor de atribuição por menor carga
+
+    Cada especialidade tem um heap com entradas (chave, versão, lawyer_id);
+    alterações de estado incrementam a versão e inserem uma nova entrada,
+    as antigas são descartadas ao chegar ao topo (remoção preguiçosa).
+    """
+
+    def __init__(self, sync_seconds: float):
+        self.sync_seconds = sync_seconds
+        self._lawyers: Dict[str, LawyerLoad] = {}
+        self._heaps: Dict[str, list] = {}
+        self._candidates: Dict[str, int] = {}
+        self._synced_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    # Sincronização
+
+    def invalidate(self):
+        """Força uma nova sincronização na próxima escolha"""
+        self._synced_at = 0.0
+
+    async def ensure_synced(self, db: AsyncSession):
+        """Sincroniza com o banco se o estado estiver desatualizado"""
+        if time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        async with self._lock:
+            if time.monotonic() - self._synced_at < self.sync_seconds:
+                return
+            await self._sync(db)
+
+    async def _sync(self, db: AsyncSession):
+        """Recarrega advogados verificados e a contagem de casos abertos"""
+        result = await db.execute(
+            select(
+                Lawyer.lawyer_id,
+                Lawyer.especialidade,
+                Lawyer.specializations,
+                Lawyer.rating,
+                Lawyer.is_online
+            ).where(
+                Lawyer.is_active == True,
+                Lawyer.verification_status == VerificationStatus.VERIFIED.value
+            )
+        )
+        lawyer_rows = result.all()
+
+        result = await db.execute(
+            select(Assignment.lawyer_id, func.count(Assignment.assignment_id))
+            .join(Order, Order.id == Assignment.order_id)
+            .where(Order.status.in_(OPEN_CASE_STATUSES))
+            .group_by(Assignment.lawyer_id)
+        )
+        open_cases = {str(lawyer_id): count for lawyer_id, count in result.all()}
+
+        lawyers = {}
+        for row in lawyer_rows:
+            lawyer_id = str(row.lawyer_id)
+            lawyers[lawyer_id] = LawyerLoad(
+                lawyer_id=lawyer_id,
+                especialidade=row.especialidade,
+                specializations=list(row.specializations or []),
+                rating=row.rating or 0.0,
+                is_online=bool(row.is_online),
+                open_cases=open_cases.get(lawyer_id, 0)
+            )
+
+        heaps: Dict[str, list] = {}
+        for state in lawyers.values():
+            for specialty in state.specialties():
+                heaps.setdefault(specialty, []).append(
+                    (state.sort_key(specialty), state.version, state.lawyer_id)
+                )
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        self._lawyers = lawyers
+        self._heaps = heaps
+        self._candidates = {specialty: len(heap) for specialty, heap in heaps.items()}
+        self._synced_at = time.monotonic()
+
+    # Atualizações incrementais
+
+    def _reindex(self, state: LawyerLoad):
+        """Publica o novo estado do advogado nos heaps das suas especialidades"""
+        state.version += 1
+        for specialty in state.specialties():
+            heap = self._heaps.setdefault(specialty, [])
+            heapq.heappush(heap, (state.sort_key(specialty), state.version, state.lawyer_id))
+            # Compactar quando as entradas obsoletas dominam o heap
+            if len(heap) > 4 * len(self._lawyers) + 16:
+                self._rebuild(specialty)
+
+    def _rebuild(self, specialty: str):
+        """Reconstrói o heap de uma especialidade só com entradas válidas"""
+        heap = [
+            (state.sort_key(specialty), state.version, state.lawyer_id)
+            for state in self._lawyers.values()
+            if specialty in state.specialties()
+        ]
+        heapq.heapify(heap)
+        self._heaps[specialty] = heap
+
+    def record_assignment(self, lawyer_id) -> None:
+        """Conta um novo caso aberto para o advogado"""
+        state = self._lawyers.get(str(lawyer_id))
+        if state:
+            state.open_cases += 1
+            self._reindex(state)
+
+    def release_assignment(self, lawyer_id) -> None:
+        """Desconta um caso que foi concluído, cancelado ou reatribuído"""
+        state = self._lawyers.get(str(lawyer_id))
+        if state and state.open_cases > 0:
+            state.open_cases -= 1
+            self._reindex(state)
+
+    def set_online(self, lawyer_id, is_online: bool) -> None:
+        """Atualiza o estado online do advogado"""
+        state = self._lawyers.get(str(lawyer_id))
+        if state and state.is_online != is_online:
+            state.is_online = is_online
+            self._reindex(state)
+
+    def set_rating(self, lawyer_id, rating: float) -> None:
+        """Atualiza o rating do advogado"""
+        state = self._lawyers.get(str(lawyer_id))
+        if state and state.rating != rating:
+            state.rating = rating
+            self._reindex(state)
+
+    # Escolha
+
+    def _peek(self, specialty: str) -> Optional[LawyerLoad]:
+        """Retorna o melhor advogado da especialidade, descartando entradas obsoletas"""
+        heap = self._heaps.get(specialty)
+        while heap:
+            _, version, lawyer_id = heap[0]
+            state = self._lawyers.get(lawyer_id)
+            if state is not None and state.version == version:
+                return state
+            heapq.heappop(heap)
+        return None
+
+    def _explain(self, state: LawyerLoad, specialty: str) -> Dict:
+        """Descreve porque o advogado foi escolhido"""
+        reasons = ["online" if state.is_online else "nenhum advogado online na especialidade"]
+        reasons.append(f"menor carga ({state.open_cases} casos abertos)")
+        if state.especialidade == specialty:
+            reasons.append("especialidade principal")
+        else:
+            reasons.append("especialização secundária")
+        reasons.append(f"rating {state.rating:.1f}")
+
+        return {
+            "specialty": specialty,
+            "lawyer": state.to_dict(),
+            "candidates": self._candidates.get(specialty, 0),
+            "reasons": reasons
+        }
+
+    async def choose(self, db: AsyncSession, specialty: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Escolhe e reserva um advogado para a especialidade
+
+        A carga é incrementada de imediato para que pedidos concorrentes
+        não escolham o mesmo advogado; chamar release_assignment se o
+        pedido não for gravado.
+
+        Returns:
+            (lawyer_id, explicação) ou None se não houver candidatos
+        """
+        await self.ensure_synced(db)
+
+        state = self._peek(specialty)
+        if state is None:
+            return None
+
+        explanation = self._explain(state, specialty)
+        self.record_assignment(state.lawyer_id)
+        return state.lawyer_id, explanation
+
+    async def preview(self, db: AsyncSession, specialty: str, limit: int = 5) -> Dict:
+        """
+        Mostra a ordem atual de candidatos de uma especialidade (sem reservar)
+        """
+        await self.ensure_synced(db)
+
+        candidates = [
+            state for state in self._lawyers.values() if specialty in state.specialties()
+        ]
+        ranked = heapq.nsmallest(limit, candidates, key=lambda s: s.sort_key(specialty))
+
+        return {
+            "specialty": specialty,
+            "next": self._explain(ranked[0], specialty) if ranked else None,
+            "ranking": [state.to_dict() for state in ranked]
+        }
+
+    def stats(self) -> Dict:
+        """Métricas do motor"""
+        return {
+            "lawyers": len(self._lawyers),
+            "specialties": len(self._heaps),
+            "openCases": sum(s.open_cases for s in self._lawyers.values()),
+            "syncedSecondsAgo": round(time.monotonic() - self._synced_at, 1) if self._synced_at else None
+        }
+
+
+# Instância global do motor
+assignment_engine = AssignmentEngine(sync_seconds=settings.ASSIGNMENT_SYNC_SECONDS)
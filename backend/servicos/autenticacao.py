@@ -3,13 +3,22 @@ Serviço de Autenticação - JWT e Hashing de Senhas
 """
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional
 from config import settings
+import asyncio
+import threading
 
 # Contexto para hashing de senhas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pool dedicado ao bcrypt (criado sob demanda)
+_hash_executor: Optional[Executor] = None
+_hash_lock = threading.Lock()
+_hash_in_flight = 0
+_hash_completed = 0
+
 
 def get_password_hash(password: str) -> str:
     """
@@ -25,6 +34,84 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _get_hash_executor() -> Executor:
+    """
+    Retorna o pool de hashing, limitado a PASSWORD_HASH_WORKERS execuções simultâneas
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_lock:
+            if _hash_executor is None:
+                if settings.PASSWORD_HASH_EXECUTOR == "process":
+                    _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+                else:
+                    _hash_executor = ThreadPoolExecutor(
+                        max_workers=settings.PASSWORD_HASH_WORKERS,
+                        thread_name_prefix="bcrypt"
+                    )
+    return _hash_executor
+
+
+async def _run_in_hash_pool(func: Callable, *args):
+    """
+    Executa uma função de hashing no pool sem bloquear o event loop
+    """
+    global _hash_in_flight, _hash_completed
+    
+    with _hash_lock:
+        _hash_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        with _hash_lock:
+            _hash_in_flight -= 1
+            _hash_completed += 1
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Gera hash da senha no pool de hashing (não bloqueia o event loop)
+    """
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica a senha no pool de hashing (não bloqueia o event loop)
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+def get_password_hash_pool_stats() -> Dict:
+    """
+    Métricas do pool de hashing (profundidade da fila e execuções ativas)
+    
+    O executor atende por ordem de chegada com no máximo PASSWORD_HASH_WORKERS
+    tarefas simultâneas; o excedente fica em fila.
+    """
+    workers = settings.PASSWORD_HASH_WORKERS
+    with _hash_lock:
+        return {
+            "executor": settings.PASSWORD_HASH_EXECUTOR,
+            "maxWorkers": workers,
+            "running": min(_hash_in_flight, workers),
+            "queueDepth": max(0, _hash_in_flight - workers),
+            "completed": _hash_completed
+        }
+
+
+def shutdown_password_hash_pool():
+    """
+    Encerra o pool de hashing (shutdown da aplicação)
+    """
+    global _hash_executor
+    with _hash_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False)
+            _hash_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Cria um token JWT
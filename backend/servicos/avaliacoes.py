@@ -0,0 +1,51 @@
+"""
+Serviço de Avaliações - agregados incrementais por advogado
+
+O rating, total_reviews, rating_sum e o histograma (rating_N_count) do
+advogado são atualizados com um único UPDATE na transação que insere a
+avaliação, sem voltar a percorrer a tabela ratings. Os contadores do dia
+(lawyer_stats_daily) são incrementados na mesma transação.
+
+Os agregados dos advogados existentes são preenchidos pela migração 0009.
+"""
+from typing import Optional
+from sqlalchemy import update, func, cast, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+from modelos.advogados import Lawyer
+from servicos.estatisticas import bump_lawyer_stats
+
+
+async def record_rating(db: AsyncSession, lawyer_id, stars: int) -> Optional[float]:
+    """
+    Soma uma avaliação aos agregados do advogado (na transação de db)
+
+    Os valores do SET usam a linha anterior, por isso o novo rating
+    já inclui a avaliação que está a ser inserida.
+
+    Returns:
+        Novo rating médio (None se o advogado não existir)
+    """
+    count_column = Lawyer.rating_count_column(stars)
+    new_total = func.coalesce(Lawyer.total_reviews, 0) + 1
+    new_sum = Lawyer.rating_sum + stars
+
+    result = await db.execute(
+        update(Lawyer)
+        .where(Lawyer.lawyer_id == lawyer_id)
+        .values({
+            Lawyer.total_reviews: new_total,
+            Lawyer.rating_sum: new_sum,
+            count_column: count_column + 1,
+            Lawyer.rating: func.round(cast(new_sum, Numeric) / new_total, 1),
+            Lawyer.cases_completed: func.coalesce(Lawyer.cases_completed, 0) + 1
+        })
+        .returning(Lawyer.rating)
+        .execution_options(synchronize_session=False)
+    )
+    new_rating = result.scalar_one_or_none()
+    if new_rating is not None:
+        await bump_lawyer_stats(
+            db, lawyer_id, cases_completed=1, ratings_count=1, ratings_sum=stars
+        )
+    return new_rating
+
@@ -0,0 +1,45 @@
+"""
+Serviço de Catálogo - temas e pacotes dos pedidos
+
+O cliente envia o tema e o pacote escolhidos (objetos do frontend); só o
+id é usado. Preço e especialidade vêm sempre do catálogo.
+"""
+from typing import Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from modelos.catalogo import Topic, Package
+
+
+def _catalog_id(value: dict, label: str) -> str:
+    """Extrai o id de um objeto do frontend"""
+    catalog_id = value.get("id") if isinstance(value, dict) else None
+    if not catalog_id or not isinstance(catalog_id, str):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{label} sem id"
+        )
+    return catalog_id
+
+
+async def resolve_order_catalog(db: AsyncSession, topic: dict, pkg: dict) -> Tuple[Topic, Package]:
+    """
+    Resolve o tema e o pacote de um novo pedido no catálogo
+
+    Raises:
+        HTTPException: Se o tema ou o pacote não existir ou estiver inativo
+    """
+    topic_row = await db.get(Topic, _catalog_id(topic, "Tema"))
+    if not topic_row or not topic_row.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tema inválido"
+        )
+
+    package_row = await db.get(Package, _catalog_id(pkg, "Pacote"))
+    if not package_row or not package_row.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pacote inválido"
+        )
+
+    return topic_row, package_row
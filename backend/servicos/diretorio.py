@@ -0,0 +1,73 @@
+"""
+Serviço do Diretório de Advogados - cache de respostas com ETag
+
+As páginas ficam em cache já serializadas (orjson): um hit devolve os
+bytes sem voltar a codificar o corpo. Cada worker tem o seu cache; a
+invalidação chega aos outros workers por NOTIFY (chat_hub).
+"""
+import hashlib
+from typing import Dict, Hashable, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from servicos.tempo_real import chat_hub
+from utils.cache import TTLCache
+from utils.respostas import dumps
+
+# Respostas de GET /lawyers por combinação de filtros/cursor/vista
+lawyer_directory_cache = TTLCache(
+    max_size=settings.LAWYER_DIRECTORY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.LAWYER_DIRECTORY_CACHE_SECONDS
+)
+
+# Canal NOTIFY da invalidação do diretório
+DIRECTORY_CHANNEL = "lawyer_directory"
+
+
+def compute_etag(payload: bytes) -> str:
+    """
+    Calcula um ETag fraco a partir do corpo serializado da resposta
+    """
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+
+def get_cached_directory(key: Hashable) -> Optional[Tuple[str, bytes]]:
+    """
+    Retorna (etag, corpo JSON) em cache para a chave da consulta
+    """
+    return lawyer_directory_cache.get(key)
+
+
+def cache_directory(key: Hashable, body: Dict) -> Tuple[str, bytes]:
+    """
+    Serializa e guarda uma página do diretório
+
+    Returns:
+        (etag, corpo JSON)
+    """
+    payload = dumps(body)
+    etag = compute_etag(payload)
+    lawyer_directory_cache.set(key, (etag, payload))
+    return etag, payload
+
+
+def _clear_directory(payload: str = "") -> None:
+    """Descarta todas as páginas em cache deste worker"""
+    lawyer_directory_cache.clear()
+
+
+# Cada worker limpa o cache ao receber o NOTIFY (após o commit) e depois
+# de uma queda da ligação LISTEN
+chat_hub.add_handler(DIRECTORY_CHANNEL, _clear_directory, reset=_clear_directory)
+
+
+async def invalidate_lawyer_directory(db: AsyncSession) -> None:
+    """
+    Descarta as páginas em cache em todos os workers (online, verificação,
+    rating)
+    
+    Chamar antes do db.commit(): o NOTIFY segue na mesma transação e cada
+    worker (incluindo este) limpa o cache depois do commit. Sem LISTEN
+    ativo só o cache local é limpo e os outros workers dependem do TTL.
+    """
+    _clear_directory()
+    await chat_hub.notify(db, DIRECTORY_CHANNEL, "")
@@ -0,0 +1,347 @@
+"""
+Serviço de Estatísticas - rollups diários do dashboard administrativo
+
+Um job periódico recalcula os últimos ANALYTICS_ROLLUP_LOOKBACK_DAYS dias
+em analytics_daily (consultas agrupadas limitadas por data) e regrava as
+métricas de estado em analytics_snapshot. GET /admin/analytics lê apenas
+estas tabelas, por isso o custo não cresce com o histórico.
+
+Só um worker executa o job de cada vez (pg_try_advisory_xact_lock).
+
+Os contadores por advogado (lawyer_stats_daily) são incrementados nas
+próprias rotas com bump_lawyer_stats e lidos por get_lawyer_period_stats;
+o histórico anterior foi preenchido pela migração 0010.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select, func, text, delete, cast, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal
+from modelos.usuarios import User
+from modelos.advogados import Lawyer
+from modelos.consultas import Order
+from modelos.pagamentos import Payment
+from modelos.avaliacoes import Rating
+from modelos.estatisticas import AnalyticsDaily, AnalyticsSnapshot, LawyerStatsDaily
+
+# Chave do advisory lock do job de rollup
+ROLLUP_LOCK_KEY = 7316001
+
+# Colunas somáveis de analytics_daily
+DAILY_METRICS = (
+    "new_users", "new_lawyers", "cases_created",
+    "payments_completed", "revenue", "ratings_count", "ratings_sum"
+)
+
+# Períodos aceites por GET /admin/analytics
+PERIODS = ("day", "week", "month", "year", "all")
+
+# Contadores de lawyer_stats_daily
+LAWYER_METRICS = ("consultations", "revenue", "cases_completed", "ratings_count", "ratings_sum")
+
+# Períodos e agrupamentos aceites por GET /lawyers/{id}/stats
+LAWYER_PERIODS = ("today", "week", "month", "year")
+LAWYER_BUCKETS = ("day", "week", "month")
+
+
+def period_start(period: str, today: Optional[date] = None) -> Optional[date]:
+    """
+    Primeiro dia do período (None para "all")
+
+    Raises:
+        ValueError: Se o período for desconhecido
+    """
+    today = today or datetime.utcnow().date()
+    if period == "day":
+        return today
+    if period == "week":
+        return today - timedelta(days=today.weekday())
+    if period == "month":
+        return today.replace(day=1)
+    if period == "year":
+        return today.replace(month=1, day=1)
+    if period == "all":
+        return None
+    raise ValueError(f"Período inválido: {period}")
+
+
+async def _count_by_day(db: AsyncSession, column, since: Optional[date], *filters, value=None) -> Dict:
+    """Agrupa por dia de column (count ou soma de value)"""
+    day = func.date(column).label("day")
+    query = select(day, value if value is not None else func.count()).where(*filters)
+    if since is not None:
+        query = query.where(column >= since)
+    result = await db.execute(query.group_by(day))
+    return {row[0]: row[1] for row in result.all()}
+
+
+async def _rebuild_daily(db: AsyncSession, since: Optional[date]) -> None:
+    """Recalcula analytics_daily a partir de since (tudo se None)"""
+    metrics = {
+        "new_users": await _count_by_day(db, User.created_at, since),
+        "new_lawyers": await _count_by_day(db, Lawyer.created_at, since),
+        "cases_created": await _count_by_day(db, Order.created_at, since),
+        "payments_completed": await _count_by_day(
+            db, Payment.confirmed_at, since, Payment.status == "completed"
+        ),
+        "revenue": await _count_by_day(
+            db, Payment.confirmed_at, since, Payment.status == "completed",
+            value=func.sum(Payment.amount)
+        ),
+        "ratings_count": await _count_by_day(db, Rating.created_at, since),
+        "ratings_sum": await _count_by_day(
+            db, Rating.created_at, since, value=func.sum(Rating.stars)
+        )
+    }
+
+    if since is None:
+        await db.execute(delete(AnalyticsDaily))
+        days = set()
+        for values in metrics.values():
+            days.update(values)
+    else:
+        # Todos os dias da janela, para zerar dias cujos registros desapareceram
+        today = datetime.utcnow().date()
+        days = {since + timedelta(days=i) for i in range((today - since).days + 1)}
+
+    if not days:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "day": day,
+            **{name: metrics[name].get(day) or 0 for name in DAILY_METRICS},
+            "updated_at": now
+        }
+        for day in sorted(days)
+    ]
+    insert = pg_insert(AnalyticsDaily).values(rows)
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=["day"],
+            set_={name: insert.excluded[name] for name in (*DAILY_METRICS, "updated_at")}
+        )
+    )
+
+
+async def _rebuild_snapshot(db: AsyncSession) -> None:
+    """Regrava métricas de estado e totais acumulados"""
+    values = {}
+
+    result = await db.execute(select(Order.status, func.count()).group_by(Order.status))
+    for order_status, count in result.all():
+        values[f"cases_status:{order_status}"] = count
+
+    values["lawyers_verified"] = await db.scalar(
+        select(func.count(Lawyer.lawyer_id)).where(Lawyer.verification_status == "verified")
+    )
+
+    totals = (await db.execute(
+        select(*(func.coalesce(func.sum(getattr(AnalyticsDaily, name)), 0) for name in DAILY_METRICS))
+    )).one()
+    for name, total in zip(DAILY_METRICS, totals):
+        values[f"total:{name}"] = total
+
+    # Status que deixaram de existir ficam a zero
+    await db.execute(
+        delete(AnalyticsSnapshot).where(AnalyticsSnapshot.metric.like("cases_status:%"))
+    )
+
+    now = datetime.utcnow()
+    insert = pg_insert(AnalyticsSnapshot).values([
+        {"metric": metric, "value": float(value or 0), "updated_at": now}
+        for metric, value in values.items()
+    ])
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=["metric"],
+            set_={"value": insert.excluded.value, "updated_at": insert.excluded.updated_at}
+        )
+    )
+
+
+async def refresh_analytics_rollups(full: bool = False) -> bool:
+    """
+    Atualiza os rollups (recalcula tudo se full ou se a tabela estiver vazia)
+
+    Returns:
+        False se outro worker já estiver a executar o job
+    """
+    async with AsyncSessionLocal() as db:
+        locked = await db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}
+        )
+        if not locked:
+            return False
+
+        since = None
+        if not full and await db.scalar(select(AnalyticsDaily.day).limit(1)) is not None:
+            since = datetime.utcnow().date() - timedelta(days=settings.ANALYTICS_ROLLUP_LOOKBACK_DAYS)
+
+        await _rebuild_daily(db, since)
+        await _rebuild_snapshot(db)
+        await db.commit()
+    return True
+
+
+async def analytics_rollup_loop():
+    """Executa refresh_analytics_rollups periodicamente (tarefa de fundo)"""
+    while True:
+        try:
+            await refresh_analytics_rollups()
+        except Exception as e:
+            print(f"Erro ao atualizar rollups de analytics: {e}")
+        await asyncio.sleep(settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS)
+
+
+async def get_analytics_summary(db: AsyncSession, period: str) -> Dict:
+    """
+    Lê os rollups: estado atual, totais e somas do período e do mês
+
+    Duas consultas de custo fixo (snapshot + soma filtrada por dia).
+
+    Raises:
+        ValueError: Se o período for desconhecido
+    """
+    today = datetime.utcnow().date()
+    start = period_start(period, today)
+    month_start = period_start("month", today)
+
+    result = await db.execute(
+        select(AnalyticsSnapshot.metric, AnalyticsSnapshot.value, AnalyticsSnapshot.updated_at)
+    )
+    rows = result.all()
+    snapshot = {row.metric: row.value for row in rows}
+    updated_at = max((row.updated_at for row in rows if row.updated_at), default=None)
+    totals = {name: snapshot.get(f"total:{name}", 0) for name in DAILY_METRICS}
+
+    def window(day_from: date):
+        return [
+            func.coalesce(func.sum(getattr(AnalyticsDaily, name)).filter(AnalyticsDaily.day >= day_from), 0)
+            for name in DAILY_METRICS
+        ]
+
+    # No máximo um ano de linhas (o período "all" vem dos totais acumulados)
+    windows = [month_start] if start is None else [start, month_start]
+    sums = (await db.execute(
+        select(*(column for day_from in windows for column in window(day_from)))
+        .where(AnalyticsDaily.day >= min(windows))
+    )).one()
+    chunks = [
+        dict(zip(DAILY_METRICS, sums[i * len(DAILY_METRICS):(i + 1) * len(DAILY_METRICS)]))
+        for i in range(len(windows))
+    ]
+    period_sums = totals if start is None else chunks[0]
+    month_sums = chunks[-1]
+
+    def average(values: Dict) -> float:
+        return round(values["ratings_sum"] / values["ratings_count"], 2) if values["ratings_count"] else 0.0
+
+    return {
+        "snapshot": snapshot,
+        "totals": totals,
+        "period": period_sums,
+        "month": month_sums,
+        "periodStart": start.isoformat() if start else None,
+        "averageRating": average(totals),
+        "periodAverageRating": average(period_sums),
+        "updatedAt": updated_at.isoformat() if updated_at else None
+    }
+
+
+# Contadores por advogado
+
+async def bump_lawyer_stats(
+    db: AsyncSession,
+    lawyer_id,
+    day: Optional[date] = None,
+    **increments
+) -> None:
+    """
+    Incrementa os contadores do dia do advogado (na transação de db)
+
+    Exemplo: await bump_lawyer_stats(db, lawyer_id, consultations=1, revenue=1500)
+    """
+    increments = {name: value for name, value in increments.items() if value}
+    if not increments:
+        return
+    insert = pg_insert(LawyerStatsDaily).values(
+        lawyer_id=lawyer_id,
+        day=day or datetime.utcnow().date(),
+        **increments
+    )
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=["lawyer_id", "day"],
+            set_={
+                name: getattr(LawyerStatsDaily, name) + insert.excluded[name]
+                for name in increments
+            }
+        )
+    )
+
+
+async def get_lawyer_period_stats(
+    db: AsyncSession,
+    lawyer_id,
+    period: str,
+    bucket: str = "day"
+) -> Dict:
+    """
+    Soma os contadores do advogado no período e por bucket
+
+    Duas consultas sobre a chave (lawyer_id, day): totais (período e
+    acumulado) e a série agrupada com date_trunc.
+
+    Raises:
+        ValueError: Se o período ou o bucket forem desconhecidos
+    """
+    if period not in LAWYER_PERIODS or bucket not in LAWYER_BUCKETS:
+        raise ValueError(f"Período/bucket inválido: {period}/{bucket}")
+    start = period_start("day" if period == "today" else period)
+
+    in_period = LawyerStatsDaily.day >= start
+    columns = [getattr(LawyerStatsDaily, name) for name in LAWYER_METRICS]
+    row = (await db.execute(
+        select(
+            *(func.coalesce(func.sum(column).filter(in_period), 0) for column in columns),
+            *(func.coalesce(func.sum(column), 0) for column in columns)
+        ).where(LawyerStatsDaily.lawyer_id == lawyer_id)
+    )).one()
+    period_totals = dict(zip(LAWYER_METRICS, row[:len(LAWYER_METRICS)]))
+    lifetime = dict(zip(LAWYER_METRICS, row[len(LAWYER_METRICS):]))
+
+    # DATE -> timestamp sem fuso: date_trunc não depende do TimeZone da sessão
+    bucket_start = func.date_trunc(bucket, cast(LawyerStatsDaily.day, DateTime)).label("bucket")
+    result = await db.execute(
+        select(
+            bucket_start,
+            func.sum(LawyerStatsDaily.consultations),
+            func.sum(LawyerStatsDaily.revenue),
+            func.sum(LawyerStatsDaily.ratings_count)
+        )
+        .where(LawyerStatsDaily.lawyer_id == lawyer_id, in_period)
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+    series: List[Dict] = [
+        {
+            "start": bucket_day.date().isoformat(),
+            "consultations": int(consultations or 0),
+            "revenue": revenue or 0.0,
+            "ratings": int(ratings or 0)
+        }
+        for bucket_day, consultations, revenue, ratings in result.all()
+    ]
+
+    return {
+        "periodStart": start.isoformat(),
+        "period": period_totals,
+        "lifetime": lifetime,
+        "series": series
+    }
+
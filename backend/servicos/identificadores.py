@@ -0,0 +1,77 @@
+"""
+Serviço de Identificadores Legíveis (human_id dos pedidos)
+
+Os IDs vêm de uma sequência PostgreSQL com INCREMENT BY = HUMAN_ID_BLOCK_SIZE:
+cada worker reserva um bloco inteiro com um único nextval() e distribui os
+valores localmente, sem round-trip por ID. O contador é codificado em
+Crockford base32 (ex: FC-A0001Z).
+"""
+import asyncio
+from typing import Optional
+from sqlalchemy import Sequence
+from database import Base, async_engine
+from utils.helpers import encode_crockford_base32
+
+# Tamanho do bloco reservado por nextval() (igual ao INCREMENT BY da sequência)
+HUMAN_ID_BLOCK_SIZE = 1000
+
+# Largura mínima do código (32^6 ≈ 1 bilião de IDs)
+HUMAN_ID_WIDTH = 6
+
+# Começa em "A00000": IDs antigos (FC-HHMMSS) são só dígitos, por isso
+# códigos iniciados por letra nunca colidem com eles
+HUMAN_ID_START = 10 * 32 ** (HUMAN_ID_WIDTH - 1)
+
+human_id_sequence = Sequence(
+    "order_human_id_seq",
+    start=HUMAN_ID_START,
+    increment=HUMAN_ID_BLOCK_SIZE,
+    metadata=Base.metadata
+)
+
+
+class HumanIdAllocator:
+    """
+    Alocador de IDs legíveis com pré-reserva de blocos por processo
+    """
+
+    def __init__(self, prefix: str = "FC", sequence: Sequence = human_id_sequence,
+                 block_size: int = HUMAN_ID_BLOCK_SIZE):
+        self.prefix = prefix
+        self.sequence = sequence
+        self.block_size = block_size
+        self._next: Optional[int] = None
+        self._end: int = 0
+        self._lock = asyncio.Lock()
+
+    async def _reserve_block(self):
+        """Reserva o próximo bloco de valores na sequência"""
+        async with async_engine.connect() as conn:
+            block_start = await conn.scalar(self.sequence.next_value())
+        self._next = block_start
+        self._end = block_start + self.block_size
+
+    async def next_value(self) -> int:
+        """Retorna o próximo valor numérico livre"""
+        async with self._lock:
+            if self._next is None or self._next >= self._end:
+                await self._reserve_block()
+            value = self._next
+            self._next += 1
+            return value
+
+    async def next_id(self) -> str:
+        """Retorna o próximo ID no formato PREFIX-XXXXXX"""
+        value = await self.next_value()
+        return f"{self.prefix}-{encode_crockford_base32(value, HUMAN_ID_WIDTH)}"
+
+
+# Alocador dos pedidos/consultas
+order_id_allocator = HumanIdAllocator(prefix="FC")
+
+
+async def allocate_order_human_id() -> str:
+    """
+    Gera um human_id único para um novo pedido (ex: FC-A0001Z)
+    """
+    return await order_id_allocator.next_id()
@@ -1,25 +1,248 @@
 """
 Serviço de Integração M-Pesa (Vodacom Moçambique)
+
+Todas as chamadas usam um único httpx.AsyncClient por worker (pool de
+ligações com keep-alive) protegido por um circuit breaker: quando o
+gateway falha repetidamente os pagamentos falham de imediato em vez de
+esperarem pelo timeout.
+
+O bearer token (API Key cifrada com a Public Key RSA da Vodacom) é gerado
+uma vez e reutilizado pelo MpesaTokenManager até perto de expirar.
 """
+import asyncio
 import httpx
 import base64
+import time
 from typing import Dict, Optional
 from config import settings
 from datetime import datetime
+from utils.circuito import CircuitBreaker
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.serialization import load_der_public_key, load_pem_public_key
 import uuid
 
 
+# Endpoints da API usados (cada um com o seu timeout)
+C2B_PAYMENT_PATH = "/ipg/v1x/c2bPayment/singleStage/"
+QUERY_STATUS_PATH = "/ipg/v1x/queryTransactionStatus/"
+
+
+class MpesaUnavailableError(Exception):
+    """Gateway M-Pesa indisponível (circuito aberto)"""
+
+
+def _encrypt_api_key(api_key: str, public_key: str) -> str:
+    """
+    Cifra a API Key com a Public Key da Vodacom (RSA PKCS#1 v1.5)
+    
+    A Public Key pode vir em base64 (DER, como no portal M-Pesa) ou PEM.
+    """
+    key_data = public_key.strip()
+    if key_data.startswith("-----BEGIN"):
+        key = load_pem_public_key(key_data.encode())
+    else:
+        key = load_der_public_key(base64.b64decode(key_data))
+    encrypted = key.encrypt(api_key.encode(), padding.PKCS1v15())
+    return base64.b64encode(encrypted).decode()
+
+
+class MpesaTokenManager:
+    """
+    Cache do bearer token M-Pesa com renovação antecipada
+    
+    O token é válido durante ttl_seconds; nos últimos refresh_margin
+    segundos continua a ser servido enquanto uma renovação corre em
+    segundo plano. A geração (RSA, fora do event loop) é single-flight:
+    pedidos concorrentes esperam pela mesma cifragem.
+    """
+    
+    def __init__(self, api_key: str, public_key: str, ttl_seconds: float, refresh_margin: float):
+        self.api_key = api_key
+        self.public_key = public_key
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.generated = 0
+    
+    async def get_token(self) -> str:
+        """Retorna o token em cache, gerando-o se necessário"""
+        remaining = self._expires_at - time.monotonic()
+        if self._token and remaining > self.refresh_margin:
+            return self._token
+        if self._token and remaining > 0:
+            # Ainda válido: renovar em segundo plano
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh())
+            return self._token
+        return await self._refresh()
+    
+    async def _refresh(self) -> str:
+        """Gera um novo token (uma geração de cada vez)"""
+        async with self._lock:
+            # Outro pedido pode ter renovado enquanto se esperava pelo lock
+            if self._token and self._expires_at - time.monotonic() > self.refresh_margin:
+                return self._token
+            
+            if self.public_key:
+                loop = asyncio.get_running_loop()
+                token = await loop.run_in_executor(
+                    None, _encrypt_api_key, self.api_key, self.public_key
+                )
+            else:
+                # Sem Public Key (desenvolvimento): usar a API Key diretamente
+                token = self.api_key
+            
+            self._token = token
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            self.generated += 1
+            return token
+    
+    def invalidate(self) -> None:
+        """Descarta o token (ex: gateway respondeu 401)"""
+        self._token = None
+        self._expires_at = 0.0
+    
+    def stats(self) -> Dict:
+        """Métricas do token"""
+        remaining = self._expires_at - time.monotonic()
+        return {
+            "cached": self._token is not None and remaining > 0,
+            "expiresInSeconds": round(max(0.0, remaining), 1),
+            "generated": self.generated
+        }
+
+
+# Instância global do gestor de tokens
+mpesa_token_manager = MpesaTokenManager(
+    api_key=settings.MPESA_API_KEY,
+    public_key=settings.MPESA_PUBLIC_KEY,
+    ttl_seconds=settings.MPESA_TOKEN_TTL_SECONDS,
+    refresh_margin=settings.MPESA_TOKEN_REFRESH_MARGIN_SECONDS
+)
+
+
+class MpesaClient:
+    """
+    Cliente HTTP partilhado para a API M-Pesa
+    
+    O httpx.AsyncClient é criado na primeira chamada e reutilizado até
+    close() (shutdown da aplicação). Respostas 5xx, timeouts e erros de
+    ligação contam como falhas do circuit breaker; 4xx não.
+    """
+    
+    def __init__(self, base_url: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url
+        self.transport = transport
+        self.timeouts = {
+            C2B_PAYMENT_PATH: httpx.Timeout(
+                settings.MPESA_PAYMENT_TIMEOUT, connect=settings.MPESA_CONNECT_TIMEOUT
+            ),
+            QUERY_STATUS_PATH: httpx.Timeout(
+                settings.MPESA_QUERY_TIMEOUT, connect=settings.MPESA_CONNECT_TIMEOUT
+            )
+        }
+        self.breaker = CircuitBreaker(
+            "mpesa",
+            failure_threshold=settings.MPESA_BREAKER_FAILURES,
+            reset_seconds=settings.MPESA_BREAKER_RESET_SECONDS
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cria o cliente partilhado na primeira utilização"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=settings.MPESA_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.MPESA_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.MPESA_KEEPALIVE_SECONDS
+                ),
+                timeout=httpx.Timeout(
+                    settings.MPESA_QUERY_TIMEOUT, connect=settings.MPESA_CONNECT_TIMEOUT
+                )
+            )
+        return self._client
+    
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Faz uma chamada ao gateway através do circuit breaker
+        
+        Raises:
+            MpesaUnavailableError: Se o circuito estiver aberto
+            httpx.HTTPError: Erros de ligação/timeout (já contabilizados)
+        """
+        if not self.breaker.allow():
+            raise MpesaUnavailableError(
+                f"M-Pesa indisponível, tente novamente em {self.breaker.retry_after():.0f}s"
+            )
+        
+        kwargs.setdefault("timeout", self.timeouts.get(path, httpx.USE_CLIENT_DEFAULT))
+        try:
+            response = await self._get_client().request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        except BaseException:
+            # Cancelada (ex: cliente desligou) ou erro local: sem veredito
+            self.breaker.release()
+            raise
+        
+        if response.status_code >= 500:
+            self.breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.breaker.record_success()
+        if response.status_code == 401:
+            # Token rejeitado: gerar outro na próxima chamada
+            mpesa_token_manager.invalidate()
+        return response
+    
+    async def close(self):
+        """Fecha as ligações do pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def stats(self) -> Dict:
+        """Estado do gateway para o health check"""
+        return {
+            "baseUrl": self.base_url,
+            "fakeGateway": self.transport is not None,
+            "circuit": self.breaker.stats(),
+            "token": mpesa_token_manager.stats()
+        }
+
+
+def _build_client() -> MpesaClient:
+    """Cria o cliente global (com o gateway simulado se configurado)"""
+    if settings.MPESA_FAKE_GATEWAY:
+        from servicos.mpesa_simulador import fake_mpesa_gateway
+        return MpesaClient(settings.MPESA_BASE_URL, transport=fake_mpesa_gateway.transport())
+    return MpesaClient(settings.MPESA_BASE_URL)
+
+
+# Instância global do cliente
+mpesa_client = _build_client()
+
+
+def _use_simulation() -> bool:
+    """Respostas simuladas sem HTTP em desenvolvimento (exceto com gateway simulado)"""
+    return settings.ENVIRONMENT == "development" and not settings.MPESA_FAKE_GATEWAY
+
+
 async def generate_bearer_token() -> str:
     """
-    Gera token de autenticação para API M-Pesa
+    Retorna o header Authorization para a API M-Pesa
     
-    NOTA: Em produção, implementar geração real do token
-    usando API Key e Public Key da Vodacom
+    O token vem do cache do MpesaTokenManager; a cifragem RSA só
+    acontece quando o token expira.
     """
-    # TODO: Implementar geração real do token
-    # Por enquanto, retorna um token mock
-    api_key = settings.MPESA_API_KEY
-    return f"Bearer {api_key}"
+    token = await mpesa_token_manager.get_token()
+    return f"Bearer {token}"
 
 
 async def initiate_mpesa_payment(
@@ -52,7 +275,7 @@ async def initiate_mpesa_payment(
     transaction_id = f"VM{datetime.now().strftime('%Y%m%d%H%M%S')}{uuid.uuid4().hex[:6].upper()}"
     
     # Em ambiente de desenvolvimento/sandbox, simular sucesso
-    if settings.ENVIRONMENT == "development":
+    if _use_simulation():
         return {
             "success": True,
             "transactionId": transaction_id,
@@ -77,29 +300,34 @@ async def initiate_mpesa_payment(
             "input_ServiceProviderCode": settings.MPESA_SERVICE_PROVIDER_CODE
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.MPESA_BASE_URL}/ipg/v1x/c2bPayment/singleStage/",
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
-            
-            if response.status_code == 201:
-                data = response.json()
-                return {
-                    "success": True,
-                    "transactionId": transaction_id,
-                    "message": "Pedido enviado para o telemóvel.",
-                    "status": "pending",
-                    "mpesaResponse": data
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"Erro ao processar pagamento: {response.text}"
-                }
-                
+        response = await mpesa_client.request(
+            "POST",
+            C2B_PAYMENT_PATH,
+            headers=headers,
+            json=payload
+        )
+        
+        if response.status_code == 201:
+            data = response.json()
+            return {
+                "success": True,
+                "transactionId": transaction_id,
+                "message": "Pedido enviado para o telemóvel.",
+                "status": "pending",
+                "mpesaResponse": data
+            }
+        else:
+            return {
+                "success": False,
+                "message": f"Erro ao processar pagamento: {response.text}"
+            }
+    
+    except MpesaUnavailableError as e:
+        return {
+            "success": False,
+            "message": str(e),
+            "retryable": True
+        }
     except Exception as e:
         return {
             "success": False,
@@ -118,7 +346,7 @@ async def verify_mpesa_payment(transaction_id: str) -> Dict:
         Dict com status do pagamento
     """
     # Em desenvolvimento, simular confirmação após delay
-    if settings.ENVIRONMENT == "development":
+    if _use_simulation():
         return {
             "success": True,
             "transactionId": transaction_id,
@@ -135,28 +363,33 @@ async def verify_mpesa_payment(transaction_id: str) -> Dict:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.MPESA_BASE_URL}/ipg/v1x/queryTransactionStatus/",
-                headers=headers,
-                params={"input_QueryReference": transaction_id},
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "success": True,
-                    "transactionId": transaction_id,
-                    "status": data.get("output_ResponseCode") == "INS-0" and "confirmed" or "pending",
-                    "mpesaResponse": data
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"Erro ao verificar pagamento: {response.text}"
-                }
-                
+        response = await mpesa_client.request(
+            "GET",
+            QUERY_STATUS_PATH,
+            headers=headers,
+            params={"input_QueryReference": transaction_id}
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            return {
+                "success": True,
+                "transactionId": transaction_id,
+                "status": data.get("output_ResponseCode") == "INS-0" and "confirmed" or "pending",
+                "mpesaResponse": data
+            }
+        else:
+            return {
+                "success": False,
+                "message": f"Erro ao verificar pagamento: {response.text}"
+            }
+    
+    except MpesaUnavailableError as e:
+        return {
+            "success": False,
+            "message": str(e),
+            "retryable": True
+        }
     except Exception as e:
         return {
             "success": False,
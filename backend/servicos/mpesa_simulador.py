@@ -0,0 +1,127 @@
+"""
+Gateway M-Pesa simulado (em memória)
+
+Responde aos endpoints usados por servicos/mpesa.py através de um
+httpx.MockTransport, sem rede. Ativado com MPESA_FAKE_GATEWAY=true para
+desenvolvimento e testes; permite simular latência e falhas do gateway
+para exercitar timeouts e o circuit breaker. A latência respeita o
+timeout de leitura do pedido (o MockTransport não aplica timeouts).
+
+servicos/mpesa.py importa este módulo ao criar o cliente global, por isso
+os caminhos da API só são importados dentro de handle().
+
+Exemplo:
+    gateway = FakeMpesaGateway()
+    client = MpesaClient("https://mpesa.local", transport=gateway.transport())
+    gateway.fail_next(5)  # próximas 5 chamadas respondem 503
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+import httpx
+
+
+class FakeMpesaGateway:
+    """Gateway simulado com transações em memória"""
+
+    def __init__(self, latency_seconds: float = 0.0, confirm_payments: bool = True):
+        self.latency_seconds = latency_seconds
+        self.confirm_payments = confirm_payments
+        self.transactions: Dict[str, Dict] = {}
+        self.requests = 0
+        self._failures_left = 0
+        self._failure_status = 503
+
+    # Controlo da simulação
+
+    def fail_next(self, count: int, status_code: int = 503) -> None:
+        """As próximas count chamadas respondem com status_code"""
+        self._failures_left = count
+        self._failure_status = status_code
+
+    def set_status(self, reference: str, confirmed: bool) -> None:
+        """Força o estado de uma transação (pela ThirdPartyReference)"""
+        if reference in self.transactions:
+            self.transactions[reference]["confirmed"] = confirmed
+
+    def reset(self) -> None:
+        """Limpa transações e falhas pendentes"""
+        self.transactions.clear()
+        self.requests = 0
+        self._failures_left = 0
+
+    def transport(self) -> httpx.MockTransport:
+        """Transporte httpx a passar ao MpesaClient"""
+        return httpx.MockTransport(self.handle)
+
+    # Endpoints
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Despacha o pedido para o endpoint simulado"""
+        from servicos.mpesa import C2B_PAYMENT_PATH, QUERY_STATUS_PATH
+
+        self.requests += 1
+        if self.latency_seconds:
+            read_timeout = request.extensions.get("timeout", {}).get("read")
+            if read_timeout is not None and self.latency_seconds > read_timeout:
+                await asyncio.sleep(read_timeout)
+                raise httpx.ReadTimeout("Timeout simulado do gateway", request=request)
+            await asyncio.sleep(self.latency_seconds)
+
+        if self._failures_left > 0:
+            self._failures_left -= 1
+            return httpx.Response(self._failure_status, json={"output_ResponseCode": "INS-1"})
+
+        if request.method == "POST" and request.url.path == C2B_PAYMENT_PATH:
+            return self._c2b_payment(json.loads(request.content or b"{}"))
+        if request.method == "GET" and request.url.path == QUERY_STATUS_PATH:
+            return self._query_status(request.url.params.get("input_QueryReference"))
+
+        return httpx.Response(404, json={"output_ResponseCode": "INS-404"})
+
+    def _c2b_payment(self, payload: Dict) -> httpx.Response:
+        reference = payload.get("input_ThirdPartyReference")
+        if not reference or not payload.get("input_CustomerMSISDN"):
+            return httpx.Response(400, json={
+                "output_ResponseCode": "INS-20",
+                "output_ResponseDesc": "Not All Parameters Provided"
+            })
+
+        transaction_id = uuid.uuid4().hex[:10].upper()
+        self.transactions[reference] = {
+            "transactionId": transaction_id,
+            "amount": payload.get("input_Amount"),
+            "msisdn": payload.get("input_CustomerMSISDN"),
+            "confirmed": self.confirm_payments,
+            "createdAt": datetime.utcnow().isoformat()
+        }
+        return httpx.Response(201, json={
+            "output_ResponseCode": "INS-0",
+            "output_ResponseDesc": "Request processed successfully",
+            "output_TransactionID": transaction_id,
+            "output_ConversationID": uuid.uuid4().hex,
+            "output_ThirdPartyReference": reference
+        })
+
+    def _query_status(self, reference: Optional[str]) -> httpx.Response:
+        transaction = self.transactions.get(reference or "")
+        if transaction is None:
+            return httpx.Response(200, json={
+                "output_ResponseCode": "INS-2051",
+                "output_ResponseDesc": "Transaction not found",
+                "output_ResponseTransactionStatus": "Not Found"
+            })
+
+        confirmed = transaction["confirmed"]
+        return httpx.Response(200, json={
+            "output_ResponseCode": "INS-0" if confirmed else "INS-1",
+            "output_ResponseDesc": "Request processed successfully",
+            "output_ResponseTransactionStatus": "Completed" if confirmed else "Pending",
+            "output_ThirdPartyReference": reference
+        })
+
+
+# Instância usada quando MPESA_FAKE_GATEWAY=true
+fake_mpesa_gateway = FakeMpesaGateway()
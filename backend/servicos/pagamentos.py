@@ -0,0 +1,376 @@
+"""
+Serviço de Pagamentos - transições de estado e reconciliação com o M-Pesa
+
+Os pagamentos pendentes são confirmados pelo callback da Vodacom ou, se
+este não chegar, pelo reconciliador em segundo plano: cada worker reclama
+um lote de pagamentos vencidos (FOR UPDATE SKIP LOCKED), consulta o
+gateway em paralelo e grava os resultados em bloco. Pagamentos ainda
+pendentes voltam a ser verificados com backoff exponencial e jitter; só
+expiram depois de o gateway responder (nunca por estar inacessível ou com
+o circuito aberto).
+
+Os callbacks são gravados pela rota numa caixa de entrada (mpesa_callbacks)
+e aplicados pelo CallbackInboxWorker, uma única vez cada. A rota aceita
+qualquer callback (a Vodacom reenvia até receber o ack); a validação é
+feita pelo worker.
+"""
+import asyncio
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal
+from modelos.pagamentos import Payment, MpesaCallback
+from modelos.consultas import Order, OrderStatus, PaymentStatus
+from servicos.mpesa import verify_mpesa_payment, process_mpesa_callback
+
+
+async def confirm_payments(db: AsyncSession, payment_ids: Sequence, now: datetime = None) -> int:
+    """
+    Marca pagamentos pendentes como concluídos e confirma as consultas
+
+    Pagamentos já concluídos são ignorados, por isso é seguro chamar
+    mais de uma vez para o mesmo pagamento (na transação de db).
+
+    Returns:
+        Número de pagamentos confirmados
+    """
+    if not payment_ids:
+        return 0
+    now = now or datetime.utcnow()
+
+    result = await db.execute(
+        update(Payment)
+        .where(Payment.id.in_(payment_ids), Payment.status != "completed")
+        .values(status="completed", confirmed_at=now, next_check_at=None)
+        .returning(Payment.order_id)
+    )
+    order_ids = list({order_id for order_id in result.scalars().all()})
+    if not order_ids:
+        return 0
+
+    await db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids))
+        .values(payment_status=PaymentStatus.CONFIRMED.value, updated_at=now)
+    )
+    # Só avança consultas que ainda aguardavam pagamento
+    await db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status == OrderStatus.PENDING_PAYMENT.value)
+        .values(status=OrderStatus.PENDING_ASSIGNMENT.value)
+    )
+    return len(order_ids)
+
+
+async def fail_payments(db: AsyncSession, payment_ids: Sequence, now: datetime = None) -> int:
+    """
+    Marca pagamentos pendentes como falhados (na transação de db)
+
+    Returns:
+        Número de pagamentos alterados
+    """
+    if not payment_ids:
+        return 0
+    now = now or datetime.utcnow()
+
+    result = await db.execute(
+        update(Payment)
+        .where(Payment.id.in_(payment_ids), Payment.status == "pending")
+        .values(status="failed", next_check_at=None)
+        .returning(Payment.order_id)
+    )
+    order_ids = list(set(result.scalars().all()))
+    if order_ids:
+        await db.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids), Order.payment_status == PaymentStatus.PENDING.value)
+            .values(payment_status=PaymentStatus.FAILED.value, updated_at=now)
+        )
+    return len(order_ids)
+
+
+def _sha256_key(value: str) -> str:
+    return "sha256:" + hashlib.sha256(value.encode()).hexdigest()
+
+
+def callback_inbox_key(callback_data: Dict) -> str:
+    """
+    Chave de deduplicação de um callback na caixa de entrada
+
+    output_TransactionID quando existe; sem ele, o ID da conversa, a nossa
+    referência ou, em último caso, o hash do corpo (reenvios iguais
+    continuam a dar a mesma chave). Chaves maiores que a coluna são
+    substituídas pelo seu hash, que continua único por valor.
+    """
+    key = None
+    transaction_id = callback_data.get("output_TransactionID")
+    if transaction_id:
+        key = str(transaction_id)
+    else:
+        for prefix, field in (("conv", "output_ConversationID"), ("ref", "output_ThirdPartyReference")):
+            if callback_data.get(field):
+                key = f"{prefix}:{callback_data[field]}"
+                break
+    if key is None:
+        return _sha256_key(json.dumps(callback_data, sort_keys=True, separators=(",", ":"), default=str))
+    return key if len(key) <= MpesaCallback.transaction_id.type.length else _sha256_key(key)
+
+
+def callback_column(value, column) -> Optional[str]:
+    """Valor do callback como texto truncado ao tamanho da coluna String"""
+    if value is None or value == "":
+        return None
+    return str(value)[:column.type.length]
+
+
+def _invalid_callback_reason(callback: MpesaCallback) -> Optional[str]:
+    """Motivo para descartar um callback sem o aplicar (None se válido)"""
+    payload = callback.payload if isinstance(callback.payload, dict) else {}
+    if not payload.get("output_ResponseCode"):
+        return "Callback sem output_ResponseCode"
+    if not (callback.third_party_reference or payload.get("output_TransactionID")):
+        return "Callback sem referência do pagamento"
+    return None
+
+
+def reconcile_backoff(attempts: int) -> timedelta:
+    """
+    Atraso até à próxima verificação (exponencial com jitter, limitado)
+    """
+    base = settings.PAYMENT_RECONCILE_INITIAL_DELAY_SECONDS * (2 ** min(attempts, 16))
+    delay = min(base, settings.PAYMENT_RECONCILE_MAX_BACKOFF_SECONDS)
+    # Jitter para não sincronizar as verificações de pagamentos criados juntos
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class PaymentReconciler:
+    """
+    Reconciliador de pagamentos pendentes (uma instância por worker)
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.checked = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.last_run_at = None
+
+    async def _claim(self, now: datetime) -> List:
+        """
+        Reclama um lote de pagamentos vencidos
+
+        O next_check_at é adiado (lease) na mesma transação, por isso
+        outros workers não verificam os mesmos pagamentos em paralelo.
+        """
+        lease = now + timedelta(seconds=settings.PAYMENT_RECONCILE_MAX_BACKOFF_SECONDS)
+        async with AsyncSessionLocal() as db:
+            due = (
+                select(Payment.id)
+                .where(
+                    Payment.status == "pending",
+                    Payment.method == "mpesa",
+                    or_(Payment.next_check_at == None, Payment.next_check_at <= now)
+                )
+                .order_by(Payment.next_check_at.asc().nulls_first())
+                .limit(settings.PAYMENT_RECONCILE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                update(Payment)
+                .where(Payment.id.in_(due))
+                .values(next_check_at=lease)
+                .returning(Payment.id, Payment.transaction_id, Payment.created_at, Payment.check_attempts)
+            )
+            rows = result.all()
+            await db.commit()
+        return rows
+
+    async def run_once(self) -> Dict:
+        """
+        Verifica um lote de pagamentos e grava os resultados
+
+        Returns:
+            Contagens do lote (checked, confirmed, failed)
+        """
+        now = datetime.utcnow()
+        rows = await self._claim(now)
+        self.runs += 1
+        self.last_run_at = now
+        if not rows:
+            return {"checked": 0, "confirmed": 0, "failed": 0}
+
+        semaphore = asyncio.Semaphore(settings.PAYMENT_RECONCILE_CONCURRENCY)
+
+        async def check(transaction_id: str) -> Dict:
+            async with semaphore:
+                return await verify_mpesa_payment(transaction_id)
+
+        results = await asyncio.gather(*(check(row.transaction_id) for row in rows))
+
+        expire_before = now - timedelta(seconds=settings.PAYMENT_RECONCILE_EXPIRE_SECONDS)
+        confirmed, expired, retry = [], [], []
+        for row, result in zip(rows, results):
+            # success: o gateway respondeu à consulta (resposta definitiva)
+            answered = result.get("success") is True
+            if answered and result.get("status") == "confirmed":
+                confirmed.append(row.id)
+            elif answered and row.created_at < expire_before:
+                expired.append(row.id)
+            else:
+                attempts = (row.check_attempts or 0) + 1
+                retry.append({
+                    "id": row.id,
+                    "check_attempts": attempts,
+                    "next_check_at": now + reconcile_backoff(attempts)
+                })
+
+        async with AsyncSessionLocal() as db:
+            confirmed_count = await confirm_payments(db, confirmed, now)
+            failed_count = await fail_payments(db, expired, now)
+            if retry:
+                # UPDATE em bloco por chave primária
+                await db.execute(update(Payment), retry)
+            await db.commit()
+
+        self.checked += len(rows)
+        self.confirmed += confirmed_count
+        self.failed += failed_count
+        return {"checked": len(rows), "confirmed": confirmed_count, "failed": failed_count}
+
+    async def run_forever(self):
+        """Executa run_once periodicamente (tarefa de fundo)"""
+        while True:
+            try:
+                summary = await self.run_once()
+                # Lote cheio: continuar de imediato
+                if summary["checked"] >= settings.PAYMENT_RECONCILE_BATCH_SIZE:
+                    continue
+            except Exception as e:
+                print(f"Erro na reconciliação de pagamentos: {e}")
+            await asyncio.sleep(settings.PAYMENT_RECONCILE_INTERVAL_SECONDS)
+
+    def stats(self) -> Dict:
+        """Métricas do reconciliador"""
+        return {
+            "runs": self.runs,
+            "checked": self.checked,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "lastRunAt": self.last_run_at.isoformat() if self.last_run_at else None
+        }
+
+
+class CallbackInboxWorker:
+    """
+    Aplica os callbacks M-Pesa gravados em mpesa_callbacks
+
+    Cada lote é reclamado com FOR UPDATE SKIP LOCKED e a transição de
+    estado e o processed_at são gravados na mesma transação, por isso
+    cada callback é aplicado exatamente uma vez mesmo com vários workers.
+    """
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self.processed = 0
+        self.unmatched = 0
+        self.invalid = 0
+
+    def notify(self) -> None:
+        """Acorda o worker deste processo (chamado pela rota após o commit)"""
+        self._wakeup.set()
+
+    async def run_once(self) -> int:
+        """
+        Processa um lote de callbacks pendentes
+
+        Returns:
+            Número de callbacks reclamados
+        """
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(MpesaCallback)
+                .where(MpesaCallback.processed_at == None)
+                .order_by(MpesaCallback.received_at)
+                .limit(settings.MPESA_CALLBACK_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            callbacks = result.scalars().all()
+            if not callbacks:
+                return 0
+
+            # Pagamentos referidos pelo lote (pela nossa referência ou pelo ID M-Pesa)
+            references = set()
+            for callback in callbacks:
+                references.update(filter(None, (callback.third_party_reference, callback.transaction_id)))
+            result = await db.execute(
+                select(Payment.transaction_id, Payment.id)
+                .where(Payment.transaction_id.in_(references))
+            )
+            payments = dict(result.all())
+
+            confirmed, failed = [], []
+            for callback in callbacks:
+                callback.attempts += 1
+                invalid = _invalid_callback_reason(callback)
+                if invalid:
+                    # Nunca aplicar: um callback sem código marcaria o pagamento como falhado
+                    callback.last_error = invalid
+                    callback.processed_at = now
+                    self.invalid += 1
+                    continue
+                payment_id = payments.get(callback.third_party_reference) or payments.get(callback.transaction_id)
+                if payment_id is None:
+                    # Callback antes do commit do pagamento: tentar mais tarde
+                    if callback.attempts < settings.MPESA_CALLBACK_MAX_ATTEMPTS:
+                        continue
+                    callback.last_error = "Pagamento não encontrado"
+                    self.unmatched += 1
+                elif process_mpesa_callback(callback.payload)["success"]:
+                    confirmed.append(payment_id)
+                else:
+                    failed.append(payment_id)
+                callback.processed_at = now
+
+            await confirm_payments(db, confirmed, now)
+            await fail_payments(db, failed, now)
+            await db.commit()
+
+        self.processed += len(confirmed) + len(failed)
+        return len(callbacks)
+
+    async def run_forever(self):
+        """Processa callbacks à medida que chegam (tarefa de fundo)"""
+        while True:
+            self._wakeup.clear()
+            try:
+                if await self.run_once() >= settings.MPESA_CALLBACK_BATCH_SIZE:
+                    continue
+            except Exception as e:
+                print(f"Erro ao processar callbacks M-Pesa: {e}")
+            try:
+                # Polling cobre callbacks recebidos por outros workers
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.MPESA_CALLBACK_POLL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict:
+        """Métricas do worker"""
+        return {
+            "processed": self.processed,
+            "unmatched": self.unmatched,
+            "invalid": self.invalid
+        }
+
+
+# Instâncias globais
+payment_reconciler = PaymentReconciler()
+callback_inbox = CallbackInboxWorker()
@@ -0,0 +1,95 @@
+"""
+Serviço de Pesquisa - pesquisa administrativa com pg_trgm
+
+As colunas pesquisadas têm índices GIN com gin_trgm_ops, usados tanto
+por ILIKE '%termo%' como por similarity(). A pesquisa de casos junta os
+IDs encontrados em cada tabela (UNION de ramos indexados) e ordena pela
+maior similaridade entre ID legível, tema, cliente e advogado.
+
+Termos com menos de SEARCH_MIN_LENGTH caracteres não têm trigramas: são
+pesquisados com o mesmo ILIKE, sem ordenação por relevância (mais
+recentes primeiro).
+"""
+from sqlalchemy import select, union, func, or_, literal_column, String
+from sqlalchemy.sql.elements import ColumnElement
+from modelos.usuarios import User
+from modelos.advogados import Lawyer
+from modelos.consultas import Order, Assignment
+
+# Trigramas precisam de pelo menos 3 caracteres para usar o índice
+SEARCH_MIN_LENGTH = 3
+
+
+def normalize_search(search: str) -> str:
+    """Limpa o termo de pesquisa (espaços repetidos e nas pontas)"""
+    return " ".join(search.split())
+
+
+def ranked_search(term: str) -> bool:
+    """True se o termo tem trigramas (índices e ordenação por relevância)"""
+    return len(term) >= SEARCH_MIN_LENGTH
+
+
+def _contains(term: str) -> str:
+    """Padrão ILIKE '%termo%' com curingas escapados"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def order_topic_name() -> ColumnElement:
+    """
+    Expressão topic->>'name' (coberta por ix_orders_topic_name_trgm)
+
+    A chave vai literal no SQL: como parâmetro, os planos genéricos dos
+    prepared statements do asyncpg não reconhecem a expressão do índice.
+    """
+    return Order.topic.op("->>", return_type=String)(literal_column("'name'"))
+
+
+# Utilizadores
+
+def user_search_filter(term: str) -> ColumnElement:
+    """Filtro de utilizadores por nome ou email"""
+    pattern = _contains(term)
+    return or_(User.full_name.ilike(pattern), User.email.ilike(pattern))
+
+
+def user_search_score(term: str) -> ColumnElement:
+    """Relevância de um utilizador para o termo (0 a 1)"""
+    return func.greatest(
+        func.similarity(User.full_name, term),
+        func.similarity(User.email, term)
+    )
+
+
+# Casos
+
+def case_search_ids(term: str):
+    """
+    IDs de pedidos cujo ID legível, tema, cliente ou advogado contêm o termo
+
+    Cada ramo do UNION usa o índice trigram da sua tabela.
+    """
+    pattern = _contains(term)
+    return union(
+        select(Order.id).where(Order.human_id.ilike(pattern)),
+        select(Order.id).where(order_topic_name().ilike(pattern)),
+        select(Order.id)
+        .join(User, User.id == Order.user_id)
+        .where(User.full_name.ilike(pattern)),
+        select(Assignment.order_id)
+        .join(Lawyer, Lawyer.lawyer_id == Assignment.lawyer_id)
+        .where(Lawyer.nome.ilike(pattern))
+    )
+
+
+def case_search_score(term: str) -> ColumnElement:
+    """
+    Relevância de um caso (usar numa consulta com join de User e Lawyer)
+    """
+    return func.greatest(
+        func.similarity(Order.human_id, term),
+        func.coalesce(func.similarity(order_topic_name(), term), 0),
+        func.coalesce(func.similarity(User.full_name, term), 0),
+        func.coalesce(func.similarity(Lawyer.nome, term), 0)
+    )
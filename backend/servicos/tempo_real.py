@@ -0,0 +1,281 @@
+"""
+Serviço de Tempo Real - distribuição de mensagens de chat por consulta
+
+As mensagens são publicadas com pg_notify dentro da transação que as grava,
+por isso só são entregues depois do commit. Cada worker do uvicorn mantém uma
+ligação dedicada em LISTEN e reencaminha as notificações para os clientes
+SSE locais inscritos no order_id. Sem LISTEN ativo (ex: falha na ligação),
+a entrega é feita apenas aos clientes do próprio worker.
+
+A ligação é vigiada (listener de terminação do asyncpg e um ping a cada
+REALTIME_HEALTHCHECK_SECONDS) e reaberta quando cai; enquanto está em baixo
+a entrega é local. Os clientes SSE recuperam as mensagens perdidas pelo
+Last-Event-ID.
+
+A mesma ligação LISTEN serve outros canais registados com add_handler (ex:
+invalidação do cache de principais entre workers).
+"""
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional, Set
+from sqlalchemy import text, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import async_engine, AsyncSessionLocal
+from utils.respostas import dumps
+
+# Canal PostgreSQL das mensagens de chat
+CHAT_CHANNEL = "chat_messages"
+
+# Limite de payload do NOTIFY é 8000 bytes; acima disto envia-se só o ID
+MAX_NOTIFY_PAYLOAD = 7000
+
+# Mensagens pendentes por cliente antes de descartar as mais antigas
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ChatHub:
+    """
+    Hub pub/sub local com ponte LISTEN/NOTIFY entre workers
+    """
+
+    def __init__(self, channel: str = CHAT_CHANNEL):
+        self.channel = channel
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listen_conn = None
+        self._raw_conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._resets: List[Callable[[], None]] = []
+        self._watchdog: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    @property
+    def listening(self) -> bool:
+        """True se a ligação LISTEN estiver ativa"""
+        return self._raw_conn is not None and not self._raw_conn.is_closed()
+
+    # Ciclo de vida
+
+    async def start(self):
+        """Abre a ligação dedicada e começa a vigiá-la"""
+        self._loop = asyncio.get_running_loop()
+        if not await self._connect():
+            print("⚠️  Chat em tempo real sem LISTEN/NOTIFY: nova tentativa em segundo plano")
+        if self._watchdog is None:
+            self._watchdog = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Remove a inscrição e fecha a ligação"""
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        if self.listening:
+            try:
+                await self._raw_conn.remove_listener(self.channel, self._on_notify)
+                for channel in self._handlers:
+                    await self._raw_conn.remove_listener(channel, self._on_handler_notify)
+            except Exception:
+                pass
+        await self._close_connection()
+
+    async def _connect(self) -> bool:
+        """Abre a ligação dedicada e inscreve-se nos canais"""
+        try:
+            self._listen_conn = await async_engine.connect()
+            raw = await self._listen_conn.get_raw_connection()
+            self._raw_conn = raw.driver_connection
+            self._raw_conn.add_termination_listener(self._on_terminated)
+            await self._raw_conn.add_listener(self.channel, self._on_notify)
+            for channel in self._handlers:
+                await self._raw_conn.add_listener(channel, self._on_handler_notify)
+            return True
+        except Exception as e:
+            print(f"⚠️  LISTEN/NOTIFY indisponível: {e}")
+            await self._close_connection()
+            return False
+
+    async def _close_connection(self):
+        self._raw_conn = None
+        if self._listen_conn is not None:
+            try:
+                # Ligação possivelmente morta: não devolver ao pool
+                await self._listen_conn.invalidate()
+                await self._listen_conn.close()
+            except Exception:
+                pass
+            self._listen_conn = None
+
+    def _on_terminated(self, connection):
+        """Callback do asyncpg quando a ligação LISTEN fecha"""
+        if connection is self._raw_conn:
+            self._raw_conn = None
+
+    async def _healthy(self) -> bool:
+        """Ping à ligação LISTEN"""
+        if not self.listening:
+            return False
+        try:
+            await asyncio.wait_for(
+                self._raw_conn.fetchval("SELECT 1"),
+                timeout=settings.REALTIME_HEALTHCHECK_SECONDS
+            )
+            return True
+        except Exception:
+            return False
+
+    async def _watch(self):
+        """
+        Religa a ligação LISTEN quando cai (tarefa de fundo)
+
+        Os NOTIFY enviados enquanto a ligação esteve em baixo perderam-se:
+        depois de religar, os caches registados com add_handler são limpos.
+        """
+        while True:
+            await asyncio.sleep(settings.REALTIME_HEALTHCHECK_SECONDS)
+            if await self._healthy():
+                continue
+            await self._close_connection()
+            if await self._connect():
+                self.reconnects += 1
+                for reset in self._resets:
+                    reset()
+                print("🔁 Ligação LISTEN/NOTIFY restabelecida")
+
+    # Canais adicionais
+
+    def add_handler(
+        self,
+        channel: str,
+        handler: Callable[[str], None],
+        reset: Optional[Callable[[], None]] = None
+    ):
+        """
+        Regista um canal extra na ligação LISTEN
+
+        Registar antes de start(); o handler recebe o payload (str) de cada
+        NOTIFY, incluindo os enviados pelo próprio worker. reset é chamado
+        depois de religar (pode ter perdido notificações).
+        """
+        self._handlers[channel] = handler
+        if reset is not None:
+            self._resets.append(reset)
+
+    async def notify(self, db: AsyncSession, channel: str, payload: str) -> bool:
+        """
+        Envia um NOTIFY na transação atual (entregue após o commit)
+
+        Returns:
+            False se não houver LISTEN ativo (os outros workers não recebem)
+        """
+        if not self.listening:
+            return False
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": channel, "payload": payload}
+        )
+        return True
+
+    def _on_handler_notify(self, connection, pid, channel, payload):
+        """Callback do asyncpg para os canais registados com add_handler"""
+        handler = self._handlers.get(channel)
+        if handler is not None:
+            handler(payload)
+
+    # Inscrições
+
+    def subscribe(self, order_id: str) -> asyncio.Queue:
+        """Cria a fila de um cliente para as mensagens da consulta"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(str(order_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, order_id: str, queue: asyncio.Queue):
+        """Remove a fila de um cliente"""
+        queues = self._subscribers.get(str(order_id))
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[str(order_id)]
+
+    def subscriber_count(self) -> int:
+        """Número de clientes ligados neste worker"""
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    # Publicação
+
+    async def publish(self, db: AsyncSession, order_id: str, message: Dict):
+        """
+        Publica uma mensagem na transação atual (entregue após o commit)
+
+        Chamar depois de db.flush() e antes de db.commit().
+        """
+        if not self.listening:
+            # Sem ponte entre workers: entregar localmente após o commit
+            db.sync_session.info.setdefault("chat_pending", []).append((str(order_id), message))
+            return
+
+        payload = dumps({"order_id": str(order_id), "message": message})
+        if len(payload) > MAX_NOTIFY_PAYLOAD:
+            payload = dumps({"order_id": str(order_id), "message_id": message["id"]})
+
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": payload.decode()}
+        )
+
+    def flush_local(self, db: AsyncSession):
+        """
+        Entrega as mensagens pendentes quando não há LISTEN (chamar após commit)
+        """
+        for order_id, message in db.sync_session.info.pop("chat_pending", []):
+            self._deliver(order_id, message)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        """Callback do asyncpg para cada NOTIFY recebido"""
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+
+        order_id = data.get("order_id")
+        if order_id not in self._subscribers:
+            return
+
+        if "message" in data:
+            self._deliver(order_id, data["message"])
+        elif "message_id" in data:
+            self._loop.create_task(self._deliver_by_id(order_id, data["message_id"]))
+
+    async def _deliver_by_id(self, order_id: str, message_id: str):
+        """Carrega do banco uma mensagem cujo payload não coube no NOTIFY"""
+        from modelos.mensagens import ChatMessage
+
+        async with AsyncSessionLocal() as db:
+            message = await db.scalar(select(ChatMessage).where(ChatMessage.id == message_id))
+        if message:
+            self._deliver(order_id, message.to_dict())
+
+    def _deliver(self, order_id: str, message: Dict):
+        """Coloca a mensagem na fila de cada cliente local"""
+        for queue in list(self._subscribers.get(str(order_id), ())):
+            if queue.full():
+                # Cliente lento: descartar a mais antiga
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(message)
+
+    def stats(self) -> Dict:
+        """Métricas do hub"""
+        return {
+            "listening": self.listening,
+            "reconnects": self.reconnects,
+            "orders": len(self._subscribers),
+            "subscribers": self.subscriber_count()
+        }
+
+
+# Instância global do hub
+chat_hub = ChatHub()
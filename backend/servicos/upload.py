@@ -2,13 +2,122 @@
 Serviço de Upload de Arquivos
 """
 import os
+import errno
+import shutil
 import uuid
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
 from fastapi import UploadFile
-from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from config import settings
+from database import AsyncSessionLocal
+from modelos.arquivos import StoredFile
 import aiofiles
 
 
+# Tamanho de cada bloco lido do upload (64 KB)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Pasta de ficheiros temporários: fora de UPLOAD_DIR (servido em /uploads)
+# para que uploads incompletos ou inválidos nunca sejam públicos. No mesmo
+# volume o temporário é renomeado; noutro (ex: UPLOAD_DIR num volume
+# montado) é copiado para junto do destino e renomeado lá (_move_file)
+UPLOAD_TMP_DIR = settings.UPLOAD_TMP_DIR
+
+# Subpasta do armazenamento endereçado por conteúdo (SHA-256)
+CAS_SUBFOLDER = "cas"
+
+
+def _validate_extension(filename: str) -> str:
+    """
+    Valida a extensão do arquivo e retorna-a em minúsculas
+    """
+    file_ext = filename.split(".")[-1].lower()
+    if file_ext not in settings.ALLOWED_EXTENSIONS:
+        raise ValueError(f"Extensão {file_ext} não permitida")
+    return file_ext
+
+
+async def stream_to_temp_file(file: UploadFile) -> Tuple[str, str, int]:
+    """
+    Copia o upload em blocos para um arquivo temporário
+    
+    Aborta assim que MAX_UPLOAD_SIZE é excedido e calcula o SHA-256
+    durante a cópia; a memória usada é limitada a um bloco.
+    
+    Args:
+        file: Arquivo do FastAPI
+    
+    Returns:
+        (caminho temporário, sha256 em hex, tamanho em bytes)
+    
+    Raises:
+        ValueError: Se o arquivo exceder o tamanho máximo
+    """
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_TMP_DIR, f"{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    
+    try:
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise ValueError(f"Arquivo muito grande. Máximo: {settings.MAX_UPLOAD_SIZE} bytes")
+                
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    
+    return tmp_path, digest.hexdigest(), size
+
+
+def _move_file(src: str, dst: str) -> None:
+    """
+    Move src para dst de forma atómica
+
+    Entre volumes diferentes (EXDEV) copia para um temporário no diretório
+    de dst, faz fsync e renomeia-o: dst nunca fica com conteúdo parcial.
+    """
+    try:
+        os.replace(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    
+    part_path = f"{dst}.{uuid.uuid4().hex}.part"
+    try:
+        with open(src, "rb") as source, open(part_path, "wb") as target:
+            shutil.copyfileobj(source, target, UPLOAD_CHUNK_SIZE)
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(part_path, dst)
+    except BaseException:
+        _remove_quietly(part_path)
+        raise
+    os.remove(src)
+
+
+def _remove_quietly(path: str) -> None:
+    """Remove um arquivo ignorando erros"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
 async def save_upload_file(
     file: UploadFile,
     subfolder: str = ""
@@ -16,6 +125,9 @@ async def save_upload_file(
     """
     Salva arquivo enviado e retorna a URL
     
+    O conteúdo é copiado em blocos para um temporário e movido
+    atomicamente para o destino final.
+    
     Args:
         file: Arquivo do FastAPI
         subfolder: Subpasta dentro de uploads/ (ex: "documents", "avatars")
@@ -25,9 +137,7 @@ async def save_upload_file(
     """
     try:
         # Validar extensão
-        file_ext = file.filename.split(".")[-1].lower()
-        if file_ext not in settings.ALLOWED_EXTENSIONS:
-            raise ValueError(f"Extensão {file_ext} não permitida")
+        file_ext = _validate_extension(file.filename)
         
         # Gerar nome único
         unique_filename = f"{uuid.uuid4().hex}.{file_ext}"
@@ -38,15 +148,12 @@ async def save_upload_file(
         
         file_path = os.path.join(upload_path, unique_filename)
         
-        # Salvar arquivo
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            
-            # Validar tamanho
-            if len(content) > settings.MAX_UPLOAD_SIZE:
-                raise ValueError(f"Arquivo muito grande. Máximo: {settings.MAX_UPLOAD_SIZE} bytes")
-            
-            await f.write(content)
+        # Copiar em blocos (valida tamanho durante a leitura)
+        tmp_path, _, _ = await stream_to_temp_file(file)
+        try:
+            await asyncio.to_thread(_move_file, tmp_path, file_path)
+        finally:
+            _remove_quietly(tmp_path)
         
         # Retornar URL relativa
         relative_path = os.path.join(subfolder, unique_filename).replace("\\", "/")
@@ -57,16 +164,210 @@ async def save_upload_file(
         return None
 
 
-def delete_file(file_url: str) -> bool:
+def _cas_relative_path(sha256: str, file_ext: str) -> str:
+    """Caminho relativo a UPLOAD_DIR de um conteúdo no armazenamento"""
+    return f"{CAS_SUBFOLDER}/{sha256[:2]}/{sha256}.{file_ext}"
+
+
+async def _register_content(
+    db: AsyncSession,
+    sha256: str,
+    file_ext: str,
+    size: int
+) -> str:
+    """
+    Cria ou incrementa o StoredFile do conteúdo (na transação de db)
+    
+    Returns:
+        URL do arquivo
+    """
+    file_url = f"/uploads/{_cas_relative_path(sha256, file_ext)}"
+    await db.execute(
+        pg_insert(StoredFile).values(
+            sha256=sha256,
+            extension=file_ext,
+            size=size,
+            url=file_url,
+            ref_count=1
+        ).on_conflict_do_update(
+            constraint="uq_stored_files_content",
+            set_={
+                "ref_count": StoredFile.ref_count + 1,
+                "updated_at": datetime.utcnow()
+            }
+        )
+    )
+    return file_url
+
+
+async def _place_content(tmp_path: str, sha256: str, file_ext: str) -> None:
+    """Move o temporário para o caminho definitivo do conteúdo"""
+    full_path = os.path.join(settings.UPLOAD_DIR, _cas_relative_path(sha256, file_ext))
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    # Sempre substituir: o conteúdo é idêntico e garante que o arquivo existe
+    await asyncio.to_thread(_move_file, tmp_path, full_path)
+
+
+async def _register_and_place(
+    db: AsyncSession,
+    tmp_path: str,
+    sha256: str,
+    file_ext: str,
+    size: int
+) -> str:
     """
-    Deleta um arquivo do sistema
+    Registra a referência e coloca o arquivo, antes do commit do chamador
+    
+    A referência é registrada primeiro: se o GC estiver a remover o mesmo
+    conteúdo, o upsert espera pelo lock. Corre num savepoint para que uma
+    falha ao colocar o arquivo desfaça o incremento do ref_count; assim
+    nenhum registro gravado aponta para um arquivo que não existe. Se a
+    transação do chamador for revertida depois, o arquivo fica órfão e é
+    removido pelo collect_upload_garbage.
+    
+    Returns:
+        URL do arquivo
+    """
+    async with db.begin_nested():
+        file_url = await _register_content(db, sha256, file_ext, size)
+        await _place_content(tmp_path, sha256, file_ext)
+    return file_url
+
+
+async def store_upload_file(
+    db: AsyncSession,
+    file: UploadFile
+) -> Optional[str]:
+    """
+    Salva o arquivo no armazenamento endereçado por conteúdo e retorna a URL
+    
+    Conteúdos iguais partilham o mesmo arquivo em uploads/cas/; cada
+    chamada incrementa o ref_count na transação de db, por isso a
+    referência só fica válida quando o chamador fizer commit.
+    
+    Args:
+        db: Sessão da rota (a mesma que grava o registro que usa a URL)
+        file: Arquivo do FastAPI
+    
+    Returns:
+        URL do arquivo salvo ou None em caso de erro
+    """
+    tmp_path = None
+    try:
+        file_ext = _validate_extension(file.filename)
+        tmp_path, sha256, size = await stream_to_temp_file(file)
+        
+        return await _register_and_place(db, tmp_path, sha256, file_ext, size)
+        
+    except Exception as e:
+        print(f"Erro ao salvar arquivo: {e}")
+        return None
+    finally:
+        if tmp_path:
+            _remove_quietly(tmp_path)
+
+
+class UploadBatch:
+    """
+    Ingestão concorrente dos arquivos de um pedido
+    
+    Os arquivos são copiados em paralelo (até max_concurrency de cada vez)
+    para temporários; as referências são registradas e os arquivos
+    colocados em uploads/cas/ em sequência na sessão (AsyncSession não
+    aceita operações concorrentes), antes do commit do chamador. Se o
+    bloco terminar com erro os temporários ainda por colocar são
+    removidos; os arquivos já colocados ficam sem registro e são apagados
+    pelo collect_upload_garbage.
+    
+    Uso:
+        async with UploadBatch(db) as batch:
+            urls = await batch.ingest([file_a, file_b])
+            ...
+            await db.commit()
+    """
+    
+    def __init__(self, db: AsyncSession, max_concurrency: Optional[int] = None):
+        self.db = db
+        self.max_concurrency = max_concurrency or settings.UPLOAD_CONCURRENCY
+        self._staged = []  # temporários ainda não colocados
+    
+    async def __aenter__(self) -> "UploadBatch":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self.rollback()
+        return False
+    
+    async def ingest(self, files: List[Optional[UploadFile]]) -> List[Optional[str]]:
+        """
+        Copia os arquivos em paralelo, registra as referências e coloca
+        os arquivos no armazenamento
+        
+        Raises:
+            OSError: Se um arquivo não puder ser colocado (o ref_count
+                desse arquivo não é incrementado)
+        
+        Returns:
+            URL de cada arquivo, na mesma ordem (None se ausente ou inválido)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def stage(file: Optional[UploadFile]):
+            if file is None:
+                return None
+            try:
+                file_ext = _validate_extension(file.filename)
+                async with semaphore:
+                    tmp_path, sha256, size = await stream_to_temp_file(file)
+            except Exception as e:
+                print(f"Erro ao salvar arquivo: {e}")
+                return None
+            self._staged.append(tmp_path)
+            return tmp_path, sha256, file_ext, size
+        
+        results = await asyncio.gather(*(stage(file) for file in files))
+        
+        urls = []
+        for result in results:
+            if result is None:
+                urls.append(None)
+                continue
+            urls.append(await _register_and_place(self.db, *result))
+            self._staged.remove(result[0])
+        return urls
+    
+    def rollback(self) -> None:
+        """Descarta os temporários ainda não colocados"""
+        staged, self._staged = self._staged, []
+        for tmp_path in staged:
+            _remove_quietly(tmp_path)
+
+
+async def delete_file(file_url: str, db: Optional[AsyncSession] = None) -> bool:
+    """
+    Remove uma referência a um arquivo
+    
+    Para arquivos do armazenamento por conteúdo apenas decrementa o
+    ref_count (na transação de db); o arquivo é apagado pelo
+    collect_upload_garbage quando deixa de ter referências.
     
     Args:
         file_url: URL do arquivo (ex: /uploads/documents/abc123.pdf)
+        db: Sessão do banco (obrigatória para arquivos em /uploads/cas/)
     
     Returns:
         True se deletado com sucesso, False caso contrário
     """
+    if file_url.startswith(f"/uploads/{CAS_SUBFOLDER}/"):
+        if db is None:
+            raise ValueError("delete_file requer sessão para arquivos endereçados por conteúdo")
+        result = await db.execute(
+            update(StoredFile)
+            .where(StoredFile.url == file_url, StoredFile.ref_count > 0)
+            .values(ref_count=StoredFile.ref_count - 1, updated_at=datetime.utcnow())
+        )
+        return result.rowcount > 0
+    
     try:
         # Extrair caminho do arquivo
         file_path = file_url.replace("/uploads/", "")
@@ -80,3 +381,72 @@ def delete_file(file_url: str) -> bool:
     except Exception as e:
         print(f"Erro ao deletar arquivo: {e}")
         return False
+
+
+async def collect_upload_garbage(batch_size: int = 500) -> int:
+    """
+    Apaga arquivos sem referências há mais de UPLOAD_GC_GRACE_SECONDS
+    
+    Inclui arquivos órfãos em uploads/cas/ sem registro (ex: transação
+    da rota revertida depois do upload).
+    
+    Returns:
+        Número de arquivos removidos
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.UPLOAD_GC_GRACE_SECONDS)
+    removed = 0
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(StoredFile)
+            .where(StoredFile.ref_count <= 0, StoredFile.updated_at < cutoff)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        for stored in result.scalars().all():
+            _remove_quietly(_url_to_path(stored.url))
+            await db.delete(stored)
+            removed += 1
+        await db.commit()
+    
+    # Arquivos sem registro
+    cas_root = os.path.join(settings.UPLOAD_DIR, CAS_SUBFOLDER)
+    candidates = {}
+    for directory, _, filenames in os.walk(cas_root):
+        for filename in filenames:
+            full_path = os.path.join(directory, filename)
+            if datetime.utcfromtimestamp(os.path.getmtime(full_path)) < cutoff:
+                relative = os.path.relpath(full_path, settings.UPLOAD_DIR).replace("\\", "/")
+                candidates[f"/uploads/{relative}"] = full_path
+    
+    if candidates:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(StoredFile.url).where(StoredFile.url.in_(list(candidates)))
+            )
+            for url in result.scalars().all():
+                candidates.pop(url, None)
+        for full_path in candidates.values():
+            _remove_quietly(full_path)
+            removed += 1
+    
+    return removed
+
+
+async def upload_gc_loop():
+    """
+    Executa collect_upload_garbage periodicamente (tarefa de fundo)
+    """
+    while True:
+        await asyncio.sleep(settings.UPLOAD_GC_INTERVAL_SECONDS)
+        try:
+            removed = await collect_upload_garbage()
+            if removed:
+                print(f"🧹 {removed} arquivos sem referência removidos")
+        except Exception as e:
+            print(f"Erro na limpeza de uploads: {e}")
+
+
+def _url_to_path(file_url: str) -> str:
+    """Converte URL /uploads/... no caminho em disco"""
+    return os.path.join(settings.UPLOAD_DIR, file_url.replace("/uploads/", "", 1))
@@ -0,0 +1,26 @@
+"""
+Configuração dos testes do backend
+
+Os testes que precisam de PostgreSQL usam TEST_DATABASE_URL (banco já
+migrado com "alembic upgrade head") e são ignorados quando não definida.
+Os dados criados por cada teste são desfeitos com rollback.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Antes de importar config/database: o engine é criado na importação
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql://localhost/fala_comigo_test"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+def requires_database():
+    """Ignora o teste sem TEST_DATABASE_URL"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL não definida")
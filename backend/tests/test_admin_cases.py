@@ -0,0 +1,161 @@
+"""
+GET /admin/cases - número de consultas SQL por página
+
+A listagem deve fazer sempre o mesmo número de consultas, qualquer que seja
+o tamanho da página (sem N+1 por caso).
+"""
+import asyncio
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_engine
+from modelos.advogados import Lawyer
+from modelos.consultas import Order, Assignment
+from modelos.usuarios import User, DocumentType
+from rotas.admin import list_all_cases
+from utils.dependencias import UserPrincipal
+
+CASES = 5
+
+ADMIN = UserPrincipal(id=uuid.uuid4(), full_name="Admin", is_admin=True, is_active=True)
+
+
+@contextmanager
+def count_queries():
+    """Conta as instruções enviadas ao banco (before_cursor_execute)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_cases(db: AsyncSession):
+    """Cria CASES pedidos, cada um com cliente e advogado próprios"""
+    now = datetime.utcnow()
+    for i in range(CASES):
+        suffix = uuid.uuid4().hex[:10]
+        user = User(
+            full_name=f"Cliente Teste {i}",
+            birth_date=datetime(1990, 1, 1),
+            nationality="Moçambicana",
+            document_type=DocumentType.BI,
+            document_number=f"BI{suffix}",
+            phone_number=f"84{suffix[:7]}",
+            email=f"cliente{suffix}@teste.co.mz",
+            password_hash="x"
+        )
+        lawyer = Lawyer(
+            nome=f"Advogado Teste {i}",
+            birth_date=datetime(1980, 1, 1),
+            nationality="Moçambicana",
+            document_type="BI",
+            document_number=f"ADV{suffix}",
+            document_issue_date=datetime(2020, 1, 1),
+            document_expiry_date=datetime(2030, 1, 1),
+            oam_number=f"OAM{suffix}",
+            oam_registration_year=2010,
+            especialidade="Direito da Família",
+            specializations=["Direito da Família"],
+            professional_email=f"advogado{suffix}@teste.co.mz",
+            professional_phone=f"82{suffix[:7]}",
+            office_address="Av. Julius Nyerere",
+            city="Maputo",
+            province="Maputo",
+            password_hash="x"
+        )
+        db.add_all([user, lawyer])
+        order = Order(
+            human_id=f"FC-{suffix}",
+            order_id=f"FC-{suffix}",
+            user=user,
+            client_phone_number=user.phone_number,
+            topic={"id": "familia", "name": "Família"},
+            pkg={"id": "consulta-30", "price": 500},
+            price=500,
+            consultation_type="digital",
+            created_at=now - timedelta(minutes=i)
+        )
+        db.add(order)
+        db.add(Assignment(order=order, lawyer=lawyer))
+
+
+async def statements_per_page(**params):
+    """Executa a rota com limit=1 e limit=CASES; devolve o nº de consultas de cada"""
+    counts = {}
+    try:
+        async with async_engine.connect() as connection:
+            transaction = await connection.begin()
+            db = AsyncSession(bind=connection, expire_on_commit=False)
+            seed_cases(db)
+            await db.flush()
+
+            for limit in (1, CASES):
+                with count_queries() as statements:
+                    response = await list_all_cases(
+                        cursor=None, limit=limit, total="none",
+                        current_admin=ADMIN, db=db, **params
+                    )
+                body = orjson.loads(response.body)
+                assert len(body["data"]) == limit
+                counts[limit] = len(statements)
+
+            await transaction.rollback()
+    finally:
+        # Cada teste corre no seu próprio event loop (asyncio.run)
+        await async_engine.dispose()
+    return counts
+
+
+@pytest.mark.parametrize("params", [
+    {"search": None, "status_filter": None},
+    {"search": "Cliente Teste", "status_filter": None},
+    # Termo curto (sem trigramas): ILIKE sem ordenação por relevância
+    {"search": "Te", "status_filter": None},
+    {"search": None, "status_filter": "pending_payment"},
+])
+def test_list_all_cases_query_count_independent_of_limit(requires_database, params):
+    counts = asyncio.run(statements_per_page(**params))
+    assert counts[1] == counts[CASES]
+
+
+async def second_page_by_cursor_and_by_page():
+    """Segunda página de 2 casos: pelo cursor e pelo parâmetro page obsoleto"""
+    try:
+        async with async_engine.connect() as connection:
+            transaction = await connection.begin()
+            db = AsyncSession(bind=connection, expire_on_commit=False)
+            seed_cases(db)
+            await db.flush()
+
+            params = dict(limit=2, total="exact", search="Cliente Teste", status_filter=None,
+                          current_admin=ADMIN, db=db)
+            first = orjson.loads((await list_all_cases(cursor=None, page=None, **params)).body)
+            by_cursor = orjson.loads((await list_all_cases(
+                cursor=first["pagination"]["nextCursor"], page=None, **params
+            )).body)
+            by_page = orjson.loads((await list_all_cases(cursor=None, page=2, **params)).body)
+
+            await transaction.rollback()
+    finally:
+        await async_engine.dispose()
+    return by_cursor, by_page
+
+
+def test_deprecated_page_parameter_matches_cursor_page(requires_database):
+    by_cursor, by_page = asyncio.run(second_page_by_cursor_and_by_page())
+    assert [c["id"] for c in by_page["data"]] == [c["id"] for c in by_cursor["data"]]
+    assert by_page["pagination"]["currentPage"] == 2
+    assert by_page["pagination"]["totalPages"] == 3
+    assert "currentPage" not in by_cursor["pagination"]
@@ -0,0 +1,40 @@
+"""
+Migrações Alembic - coerência com os modelos
+
+Uma alteração de esquema sem revisão só aparece em bases existentes. A
+base de testes é migrada com "alembic upgrade head", portanto qualquer
+diferença para Base.metadata indica uma revisão em falta.
+"""
+import os
+import warnings
+
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+
+from config import settings
+from database import Base
+import modelos  # noqa: F401 - regista as tabelas em Base.metadata
+import modelos.estatisticas  # noqa: F401
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_revisions_form_a_single_chain():
+    script = ScriptDirectory.from_config(Config(os.path.join(BACKEND_DIR, "alembic.ini")))
+    assert len(script.get_heads()) == 1
+    assert len(script.get_bases()) == 1
+
+
+def test_migrated_schema_matches_models(requires_database):
+    engine = create_engine(settings.DATABASE_URL)
+    try:
+        with engine.connect() as connection, warnings.catch_warnings():
+            # Índices com operator class (gin_trgm_ops) não são comparáveis
+            warnings.simplefilter("ignore", UserWarning)
+            diffs = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    finally:
+        engine.dispose()
+    assert diffs == []
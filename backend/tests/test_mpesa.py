@@ -0,0 +1,185 @@
+"""
+Cliente M-Pesa contra o gateway simulado (FakeMpesaGateway)
+
+Renovação do bearer token, timeouts e circuit breaker, sem rede.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from config import settings
+from servicos.mpesa import (
+    MpesaClient,
+    MpesaTokenManager,
+    MpesaUnavailableError,
+    QUERY_STATUS_PATH,
+    mpesa_token_manager,
+)
+from servicos.mpesa_simulador import FakeMpesaGateway
+
+BASE_URL = "https://mpesa.local"
+
+
+def make_client(gateway: FakeMpesaGateway) -> MpesaClient:
+    return MpesaClient(BASE_URL, transport=gateway.transport())
+
+
+async def query(client: MpesaClient, reference: str = "VM1") -> httpx.Response:
+    return await client.request("GET", QUERY_STATUS_PATH, params={"input_QueryReference": reference})
+
+
+# Token
+
+def test_token_is_cached_and_generated_once_under_concurrency():
+    async def scenario():
+        manager = MpesaTokenManager("api-key", "", ttl_seconds=60, refresh_margin=10)
+        tokens = await asyncio.gather(*(manager.get_token() for _ in range(10)))
+        return manager, tokens
+
+    manager, tokens = asyncio.run(scenario())
+    assert set(tokens) == {"api-key"}
+    assert manager.generated == 1
+
+
+def test_token_refreshes_in_background_inside_margin():
+    async def scenario():
+        manager = MpesaTokenManager("api-key", "", ttl_seconds=0.3, refresh_margin=0.2)
+        await manager.get_token()
+        await asyncio.sleep(0.15)
+        # Dentro da margem: devolve o token atual e renova em segundo plano
+        token = await manager.get_token()
+        served_generation = manager.generated
+        await manager._refresh_task
+        return manager, token, served_generation
+
+    manager, token, served_generation = asyncio.run(scenario())
+    assert token == "api-key"
+    assert served_generation == 1
+    assert manager.generated == 2
+    assert manager.stats()["cached"]
+
+
+def test_token_regenerated_after_expiry():
+    async def scenario():
+        manager = MpesaTokenManager("api-key", "", ttl_seconds=0.05, refresh_margin=0.01)
+        await manager.get_token()
+        await asyncio.sleep(0.1)
+        await manager.get_token()
+        return manager
+
+    assert asyncio.run(scenario()).generated == 2
+
+
+def test_401_invalidates_shared_token():
+    gateway = FakeMpesaGateway()
+
+    async def scenario():
+        await mpesa_token_manager.get_token()
+        client = make_client(gateway)
+        gateway.fail_next(1, status_code=401)
+        response = await query(client)
+        await client.close()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 401
+    assert not mpesa_token_manager.stats()["cached"]
+
+
+# Timeout
+
+def test_slow_gateway_times_out_and_counts_as_failure():
+    gateway = FakeMpesaGateway(latency_seconds=0.5)
+
+    async def scenario():
+        client = make_client(gateway)
+        client.timeouts[QUERY_STATUS_PATH] = httpx.Timeout(0.05)
+        try:
+            with pytest.raises(httpx.ReadTimeout):
+                await query(client)
+        finally:
+            await client.close()
+        return client
+
+    client = asyncio.run(scenario())
+    circuit = client.breaker.stats()
+    assert circuit["consecutiveFailures"] == 1
+    assert circuit["lastError"].startswith("ReadTimeout")
+
+
+# Circuit breaker
+
+def test_circuit_opens_after_consecutive_failures():
+    gateway = FakeMpesaGateway()
+    failures = settings.MPESA_BREAKER_FAILURES
+
+    async def scenario():
+        client = make_client(gateway)
+        gateway.fail_next(failures)
+        try:
+            for _ in range(failures):
+                assert (await query(client)).status_code == 503
+            # Circuito aberto: falha de imediato, sem chegar ao gateway
+            with pytest.raises(MpesaUnavailableError):
+                await query(client)
+        finally:
+            await client.close()
+        return client
+
+    client = asyncio.run(scenario())
+    assert gateway.requests == failures
+    assert client.breaker.state == "open"
+    assert client.breaker.rejected == 1
+
+
+def test_circuit_closes_after_successful_trial():
+    gateway = FakeMpesaGateway()
+
+    async def scenario():
+        client = make_client(gateway)
+        client.breaker.reset_seconds = 0.05
+        gateway.fail_next(client.breaker.failure_threshold)
+        try:
+            for _ in range(client.breaker.failure_threshold):
+                await query(client)
+            assert client.breaker.state == "open"
+            await asyncio.sleep(0.06)
+            # Chamada de teste (half_open) com sucesso fecha o circuito
+            response = await query(client)
+        finally:
+            await client.close()
+        return client, response
+
+    client, response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert client.breaker.state == "closed"
+
+
+def test_cancelled_half_open_trial_allows_next_trial():
+    gateway = FakeMpesaGateway()
+
+    async def scenario():
+        client = make_client(gateway)
+        client.breaker.reset_seconds = 0.05
+        gateway.fail_next(client.breaker.failure_threshold)
+        try:
+            for _ in range(client.breaker.failure_threshold):
+                await query(client)
+            await asyncio.sleep(0.06)
+            # Chamada de teste cancelada a meio (ex: cliente desligou)
+            gateway.latency_seconds = 1.0
+            trial = asyncio.create_task(query(client))
+            await asyncio.sleep(0.02)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            gateway.latency_seconds = 0.0
+            response = await query(client)
+        finally:
+            await client.close()
+        return client, response
+
+    client, response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert client.breaker.state == "closed"
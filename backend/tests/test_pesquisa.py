@@ -0,0 +1,41 @@
+"""
+Pesquisa administrativa - uso dos índices pg_trgm
+
+O asyncpg usa prepared statements; com plan_cache_mode=force_generic_plan
+o plano é o genérico, em que os parâmetros não são conhecidos. A
+expressão de ix_orders_topic_name_trgm só é reconhecida se a chave
+'name' estiver literal no SQL.
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from database import async_engine
+from modelos.consultas import Order
+from servicos.pesquisa import order_topic_name, _contains
+
+
+async def generic_plan(statement) -> str:
+    """EXPLAIN do plano genérico da instrução preparada (como no asyncpg)"""
+    try:
+        async with async_engine.connect() as connection:
+            raw = (await connection.get_raw_connection()).driver_connection
+            compiled = statement.compile(dialect=connection.dialect)
+            params = [compiled.params[name] for name in compiled.positiontup]
+            # EXECUTE não aceita parâmetros: valores citados pelo servidor
+            literals = [await raw.fetchval("SELECT quote_literal($1::text)", str(p)) for p in params]
+
+            await raw.execute("SET enable_seqscan = off")
+            await raw.execute("SET plan_cache_mode = force_generic_plan")
+            await raw.execute(f"PREPARE search_plan AS {compiled}")
+            rows = await raw.fetch(f"EXPLAIN EXECUTE search_plan({', '.join(literals)})")
+            await raw.execute("DEALLOCATE search_plan; RESET enable_seqscan; RESET plan_cache_mode")
+    finally:
+        await async_engine.dispose()
+    return "\n".join(row[0] for row in rows)
+
+
+def test_topic_search_uses_trigram_index_with_generic_plan(requires_database):
+    statement = select(Order.id).where(order_topic_name().ilike(_contains("Família")))
+    plan = asyncio.run(generic_plan(statement))
+    assert "ix_orders_topic_name_trgm" in plan
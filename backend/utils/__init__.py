@@ -1,13 +1,15 @@
 """
 Utilitários e Dependencies
 """
-from .dependencias import get_current_user, get_current_admin, get_current_lawyer
-from .helpers import generate_human_id, validate_mozambique_phone
+from .dependencias import get_current_user, get_current_admin, get_current_lawyer, invalidate_principal
+from .helpers import generate_human_id, encode_crockford_base32, validate_mozambique_phone
 
 __all__ = [
     "get_current_user",
     "get_current_admin",
     "get_current_lawyer",
+    "invalidate_principal",
     "generate_human_id",
+    "encode_crockford_base32",
     "validate_mozambique_phone"
 ]
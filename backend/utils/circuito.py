@@ -0,0 +1,95 @@
+"""
+Circuit breaker para chamadas a serviços externos
+"""
+import time
+from typing import Dict, Optional
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples (closed -> open -> half_open)
+
+    Depois de failure_threshold falhas seguidas o circuito abre e as
+    chamadas falham de imediato durante reset_seconds; a seguir é
+    permitida uma chamada de teste (half_open) que fecha o circuito se
+    tiver sucesso ou o volta a abrir se falhar.
+
+    Local a cada worker do uvicorn e usado apenas no event loop.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Estado atual (passa a half_open quando o tempo de espera expira)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """True se a chamada pode seguir para o serviço"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Regista uma chamada bem-sucedida"""
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        Liberta a chamada autorizada por allow() sem resultado
+
+        Para chamadas canceladas ou interrompidas por erros que não são do
+        serviço: em half_open a chamada de teste seguinte fica autorizada.
+        """
+        self._trial_in_flight = False
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        """Regista uma falha (timeout, erro de ligação ou 5xx)"""
+        self._failures += 1
+        self._last_error = error
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """Segundos até à próxima chamada de teste (0 se fechado)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def stats(self) -> Dict:
+        """Métricas do circuito"""
+        state = self.state
+        return {
+            "name": self.name,
+            "state": state,
+            "healthy": state == self.CLOSED,
+            "consecutiveFailures": self._failures,
+            "retryAfterSeconds": round(self.retry_after(), 1),
+            "rejected": self.rejected,
+            "lastError": self._last_error
+        }
@@ -3,24 +3,113 @@ Dependencies para FastAPI - Autenticação e Autorização
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from modelos.usuarios import User
 from modelos.advogados import Lawyer
 from servicos.autenticacao import verify_token
-from typing import Optional
+from servicos.tempo_real import chat_hub
+from utils.cache import TTLCache
+from config import settings
+from typing import NamedTuple, Optional
+import uuid
 
 # Security scheme
 security = HTTPBearer()
 
+# Cache de principais autenticados, chave (sub, role) do token
+PRINCIPAL_ROLES = ("user", "admin", "lawyer")
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+# Canal NOTIFY para invalidar o cache em todos os workers
+PRINCIPAL_CHANNEL = "principal_invalidation"
+
+
+class UserPrincipal(NamedTuple):
+    """Snapshot imutável do usuário autenticado (só o que as rotas usam)"""
+    id: uuid.UUID
+    full_name: str
+    is_admin: bool
+    is_active: bool
+
+
+class LawyerPrincipal(NamedTuple):
+    """Snapshot imutável do advogado autenticado"""
+    lawyer_id: uuid.UUID
+    is_active: bool
+    verification_status: str
+
+
+def _user_principal(user: User) -> UserPrincipal:
+    return UserPrincipal(
+        id=user.id,
+        full_name=user.full_name,
+        is_admin=bool(user.is_admin),
+        is_active=bool(user.is_active)
+    )
+
+
+def _lawyer_principal(lawyer: Lawyer) -> LawyerPrincipal:
+    return LawyerPrincipal(
+        lawyer_id=lawyer.lawyer_id,
+        is_active=bool(lawyer.is_active),
+        verification_status=lawyer.verification_status
+    )
+
+
+def _evict_principal(subject: str) -> None:
+    """Remove do cache local todas as entradas de um sujeito"""
+    for role in PRINCIPAL_ROLES:
+        principal_cache.delete((subject, role))
+
+
+# Cada worker apaga a entrada ao receber o NOTIFY (após o commit); depois
+# de uma queda da ligação LISTEN o cache local é descartado
+chat_hub.add_handler(PRINCIPAL_CHANNEL, _evict_principal, reset=principal_cache.clear)
+
+
+async def invalidate_principal(db: AsyncSession, subject_id) -> None:
+    """
+    Invalida o principal em cache em todos os workers
+    
+    Chamar antes do db.commit() sempre que is_active, is_admin, full_name ou
+    verification_status mudarem: o NOTIFY segue na mesma transação e cada
+    worker (incluindo este) apaga a entrada depois do commit. Sem LISTEN
+    ativo só o cache local é limpo e os outros workers dependem do TTL.
+    """
+    subject = str(subject_id)
+    _evict_principal(subject)
+    await chat_hub.notify(db, PRINCIPAL_CHANNEL, subject)
+
+
+async def _load_principal(db: AsyncSession, model, key_column, subject: str, role: str, snapshot):
+    """
+    Busca o principal no cache ou no banco (e guarda o snapshot)
+    """
+    cache_key = (subject, role)
+    principal = principal_cache.get(cache_key)
+    if principal is None:
+        row = await db.scalar(select(model).where(key_column == subject))
+        if row is not None:
+            principal = snapshot(row)
+            principal_cache.set(cache_key, principal)
+    return principal
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
     """
     Dependency para obter usuário atual a partir do token JWT
     
+    Devolve um snapshot (não uma instância ORM); para alterar o usuário,
+    carregar a linha na sessão da rota.
+    
     Raises:
         HTTPException: Se token inválido ou usuário não encontrado
     """
@@ -44,8 +133,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Buscar usuário no banco
-    user = db.query(User).filter(User.id == user_id).first()
+    # Buscar usuário (cache ou banco)
+    user = await _load_principal(
+        db, User, User.id, user_id, payload.get("role", "user"), _user_principal
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,8 +153,8 @@ async def get_current_user(
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Dependency para verificar se usuário é admin
     
@@ -81,11 +172,13 @@ async def get_current_admin(
 
 async def get_current_lawyer(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Lawyer:
+    db: AsyncSession = Depends(get_async_db)
+) -> LawyerPrincipal:
     """
     Dependency para obter advogado atual a partir do token JWT
     
+    Devolve um snapshot (não uma instância ORM).
+    
     Raises:
         HTTPException: Se token inválido ou advogado não encontrado
     """
@@ -111,8 +204,8 @@ async def get_current_lawyer(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Buscar advogado no banco
-    lawyer = db.query(Lawyer).filter(Lawyer.lawyer_id == lawyer_id).first()
+    # Buscar advogado (cache ou banco)
+    lawyer = await _load_principal(db, Lawyer, Lawyer.lawyer_id, lawyer_id, role, _lawyer_principal)
     if not lawyer:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -136,8 +229,8 @@ async def get_current_lawyer(
 
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[UserPrincipal]:
     """
     Dependency para obter usuário opcional (não obrigatório)
     Útil para endpoints que funcionam com ou sem autenticação
@@ -5,11 +5,39 @@ import re
 from datetime import datetime
 from typing import Optional
 
+# Alfabeto Crockford base32 (sem I, L, O, U para evitar confusão na leitura)
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def encode_crockford_base32(value: int, width: int = 0) -> str:
+    """
+    Codifica um inteiro não negativo em Crockford base32
+    
+    Args:
+        value: Número a codificar
+        width: Largura mínima (preenchida com zeros à esquerda)
+    
+    Returns:
+        Código base32 em maiúsculas (ex: 1000 -> "Z8")
+    """
+    if value < 0:
+        raise ValueError("Valor deve ser não negativo")
+    
+    digits = []
+    while value:
+        value, remainder = divmod(value, 32)
+        digits.append(CROCKFORD_ALPHABET[remainder])
+    
+    return "".join(reversed(digits)).rjust(width, "0") or "0"
+
 
 def generate_human_id(prefix: str = "FC") -> str:
     """
     Gera ID legível para humanos (ex: FC-123456)
     
+    NOTA: Baseado no relógio, pode repetir. Para pedidos usar
+    servicos.identificadores.allocate_order_human_id
+    
     Args:
         prefix: Prefixo do ID (default: "FC")
     
@@ -106,3 +134,25 @@ def calculate_age(birth_date: datetime) -> int:
         age -= 1
     
     return age
+
+
+def violated_constraint(exc: Exception) -> Optional[str]:
+    """
+    Nome da constraint violada num IntegrityError do SQLAlchemy
+    
+    Args:
+        exc: IntegrityError (driver asyncpg ou psycopg2)
+    
+    Returns:
+        Nome da constraint ou None se o driver não o indicar
+    """
+    orig = getattr(exc, "orig", exc)
+    # asyncpg: erro original em __cause__; psycopg2: em diag
+    for error in (getattr(orig, "__cause__", None), orig):
+        name = getattr(error, "constraint_name", None)
+        if name:
+            return name
+        diag = getattr(error, "diag", None)
+        if diag is not None and getattr(diag, "constraint_name", None):
+            return diag.constraint_name
+    return None
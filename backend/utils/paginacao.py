@@ -0,0 +1,314 @@
+"""
+Paginação por cursor (keyset)
+
+As listagens ordenam por uma chave única (ex: created_at desc, id desc) e
+o cursor guarda os valores da última linha devolvida; a página seguinte é
+um "WHERE chave < cursor" servido pelo índice, com custo constante
+qualquer que seja a profundidade.
+
+O total é opcional (parâmetro total):
+    none      sem contagem
+    estimate  pg_class.reltuples sem filtros; com filtros, contagem em cache
+    exact     COUNT(*) da consulta filtrada
+
+O antigo parâmetro page (OFFSET) continua aceite nesta versão, obsoleto:
+sem cursor salta (page - 1) * limit linhas e a resposta volta a trazer
+currentPage/totalPages. Será removido na próxima versão.
+"""
+import base64
+import json
+import math
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import select, func, text, tuple_, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+from config import settings
+from utils.cache import TTLCache
+
+# Modos aceites pelo parâmetro total
+TOTAL_MODES = ("none", "estimate", "exact")
+
+MAX_PAGE_SIZE = 100
+
+# Contagens filtradas recentes (chave: SQL + parâmetros)
+_count_cache = TTLCache(
+    max_size=settings.PAGINATION_COUNT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PAGINATION_COUNT_CACHE_SECONDS
+)
+
+
+def _encode_value(value: Any) -> Any:
+    """Converte valores da chave para tipos JSON"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Reverte _encode_value"""
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica os valores da chave de ordenação num cursor opaco
+
+    Args:
+        values: Valores da última linha da página (ex: [rating, lawyer_id])
+
+    Returns:
+        Cursor em base64 url-safe
+    """
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str],
+    size: int,
+    types: Optional[Sequence[Callable[[Any], Any]]] = None
+) -> Optional[List[Any]]:
+    """
+    Decodifica um cursor criado por encode_cursor
+
+    Args:
+        cursor: Cursor recebido do cliente (ou None)
+        size: Número de valores esperados
+        types: Conversores por posição (ex: (float, uuid.UUID)); um valor
+            que não converte torna o cursor inválido
+
+    Raises:
+        HTTPException: Se o cursor for inválido
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+
+    if isinstance(values, list) and len(values) == size:
+        try:
+            values = [_decode_value(v) for v in values]
+            if types:
+                values = [convert(v) for convert, v in zip(types, values)]
+            return values
+        except (ValueError, TypeError, AttributeError):
+            pass
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cursor inválido"
+    )
+
+
+def cursor_datetime(value: Any) -> datetime:
+    """Conversor de decode_cursor para chaves datetime"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+# Chave de ordenação: (expressão, descendente)
+SortKey = Tuple[ColumnElement, bool]
+
+
+def _key_type(expr: ColumnElement) -> Callable[[Any], Any]:
+    """Conversor de decode_cursor segundo o tipo da coluna da chave"""
+    try:
+        python_type = expr.type.python_type
+    except NotImplementedError:
+        return lambda value: value
+    if python_type is uuid.UUID:
+        return uuid.UUID
+    if python_type is datetime:
+        return cursor_datetime
+    if python_type is float:
+        return float
+    return lambda value: value
+
+
+def page_size(limit: int) -> int:
+    """Limita o tamanho da página a [1, MAX_PAGE_SIZE]"""
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def legacy_offset(page: Optional[int], limit: int) -> int:
+    """
+    OFFSET equivalente ao parâmetro page obsoleto
+
+    Raises:
+        HTTPException: Se page for menor que 1
+    """
+    if page is None:
+        return 0
+    if page < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="page deve ser maior ou igual a 1"
+        )
+    return (page - 1) * limit
+
+
+def keyset_after(keys: Sequence[SortKey], values: List[Any]) -> ColumnElement:
+    """
+    Condição "linha depois do cursor" para a chave de ordenação
+
+    Com todas as colunas no mesmo sentido usa comparação de tuplos, que o
+    Postgres resolve com um único range scan no índice composto.
+    """
+    directions = {desc for _, desc in keys}
+    if len(directions) == 1:
+        row = tuple_(*(expr for expr, _ in keys))
+        after = tuple_(*values)
+        return row < after if directions.pop() else row > after
+
+    clauses = []
+    for i, (expr, desc) in enumerate(keys):
+        equal = [k == v for (k, _), v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equal, expr < values[i] if desc else expr > values[i]))
+    return or_(*clauses)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[SortKey],
+    cursor: Optional[str],
+    limit: int,
+    cursor_values: Callable[[Any], List[Any]],
+    page: Optional[int] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Executa uma página keyset da consulta
+
+    Args:
+        query: Consulta com filtros e joins, sem ORDER BY/LIMIT
+        keys: Chave de ordenação única (terminar na chave primária)
+        cursor: Cursor da página anterior (ou None)
+        cursor_values: Extrai da linha os valores de keys
+        page: Parâmetro page obsoleto; só usado sem cursor (OFFSET)
+
+    Returns:
+        (linhas da página, cursor da próxima página ou None)
+    """
+    after = decode_cursor(cursor, len(keys), [_key_type(expr) for expr, _ in keys])
+    if after:
+        query = query.where(keyset_after(keys, after))
+    else:
+        query = query.offset(legacy_offset(page, limit))
+
+    query = query.order_by(
+        *(expr.desc() if desc else expr.asc() for expr, desc in keys)
+    ).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(cursor_values(rows[-1]))
+
+
+def _validate_total_mode(mode: str) -> None:
+    if mode not in TOTAL_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"total inválido. Use {', '.join(TOTAL_MODES)}"
+        )
+
+
+async def estimate_rows(db: AsyncSession, table: str) -> Optional[int]:
+    """
+    Número aproximado de linhas da tabela (estatísticas do planner)
+
+    Returns:
+        None se a tabela ainda não foi analisada (reltuples = -1)
+    """
+    estimate = await db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+async def count_items(
+    db: AsyncSession,
+    query: Select,
+    mode: str,
+    table: Optional[str] = None
+) -> Tuple[Optional[int], bool]:
+    """
+    Total de itens da listagem segundo o modo pedido
+
+    Args:
+        query: Consulta filtrada (a mesma passada a fetch_page)
+        mode: none | estimate | exact
+        table: Tabela base quando a consulta não tem filtros; permite
+            usar pg_class.reltuples no modo estimate
+
+    Returns:
+        (total ou None, True se o total for aproximado)
+    """
+    _validate_total_mode(mode)
+    if mode == "none":
+        return None, False
+
+    if mode == "estimate" and table:
+        estimate = await estimate_rows(db, table)
+        if estimate is not None:
+            return estimate, True
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    if mode == "exact":
+        return await db.scalar(count_query), False
+
+    # Contagem filtrada em cache: pode estar atrasada até ao TTL
+    compiled = count_query.compile()
+    cache_key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+    total = _count_cache.get(cache_key)
+    if total is None:
+        total = await db.scalar(count_query)
+        _count_cache.set(cache_key, total)
+    return total, True
+
+
+def page_info(
+    limit: int,
+    next_cursor: Optional[str],
+    total: Optional[int] = None,
+    estimated: bool = False,
+    page: Optional[int] = None
+) -> dict:
+    """
+    Bloco "pagination" das respostas com cursor
+
+    Com o parâmetro page obsoleto acrescenta também os campos antigos
+    (currentPage, totalPages, itemsPerPage).
+    """
+    info = {
+        "limit": limit,
+        "nextCursor": next_cursor,
+        "hasMore": next_cursor is not None,
+        "totalItems": total,
+        "totalIsEstimate": estimated
+    }
+    if page is not None:
+        info.update({
+            "currentPage": page,
+            "totalPages": math.ceil(total / limit) if total is not None else None,
+            "itemsPerPage": limit
+        })
+    return info
@@ -0,0 +1,36 @@
+"""
+Respostas JSON rápidas (orjson)
+
+Rotas com listas grandes devolvem FastJSONResponse diretamente: o FastAPI
+não passa o corpo pelo jsonable_encoder e o orjson serializa UUID e
+datetime nativamente (mesmo formato de str() e isoformat()), por isso os
+dicionários podem levar os valores das colunas sem conversão.
+"""
+from typing import Any
+import uuid
+import orjson
+from fastapi.responses import JSONResponse
+
+# Chaves não-string (ex: distribuição de estrelas) convertidas como no json
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Tipos que o orjson não serializa sozinho"""
+    # asyncpg devolve pgproto.UUID (subclasse de uuid.UUID) nas colunas
+    # selecionadas diretamente; o orjson só aceita uuid.UUID exato
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa para JSON (bytes UTF-8)"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializada com orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
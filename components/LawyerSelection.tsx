@@ -8,9 +8,12 @@ interface Props {
     onSelectLawyer: (lawyer: Lawyer) => void;
     onSelectAuto: () => void;
     topicName: string;
+    hasMore?: boolean;
+    loadingMore?: boolean;
+    onLoadMore?: () => void;
 }
 
-export default function LawyerSelection({ lawyers, loading, onSelectLawyer, onSelectAuto, topicName }: Props) {
+export default function LawyerSelection({ lawyers, loading, onSelectLawyer, onSelectAuto, topicName, hasMore = false, loadingMore = false, onLoadMore }: Props) {
     if (loading) {
         return (
             <div className="flex flex-col items-center justify-center py-12">
@@ -150,6 +153,17 @@ export default function LawyerSelection({ lawyers, loading, onSelectLawyer, onSe
                             </div>
                         </button>
                     ))}
+
+                    {/* Próxima página */}
+                    {hasMore && onLoadMore && (
+                        <button
+                            onClick={onLoadMore}
+                            disabled={loadingMore}
+                            className="w-full py-3 text-sm font-medium text-red-600 dark:text-red-400 border-2 border-dashed border-gray-300 dark:border-gray-600 rounded-xl hover:border-red-400 dark:hover:border-red-500 transition-colors disabled:opacity-50"
+                        >
+                            {loadingMore ? 'Carregando...' : 'Carregar mais advogados'}
+                        </button>
+                    )}
                 </div>
             )}
         </div>
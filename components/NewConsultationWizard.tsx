@@ -33,6 +33,8 @@ export default function NewConsultationWizard({ onComplete, onBack }: Props) {
   const [selectedLawyer, setSelectedLawyer] = useState<Lawyer | 'auto' | null>(null);
   const [availableLawyers, setAvailableLawyers] = useState<Lawyer[]>([]);
   const [loadingLawyers, setLoadingLawyers] = useState(false);
+  const [lawyersCursor, setLawyersCursor] = useState<string | null>(null);
+  const [loadingMoreLawyers, setLoadingMoreLawyers] = useState(false);
   const [selectedPackage, setSelectedPackage] = useState<ConsultationPackage | null>(null);
   const [selectedType, setSelectedType] = useState<ConsultationType | null>(null);
   const [isAnimating, setIsAnimating] = useState(false);
@@ -44,18 +46,30 @@ export default function NewConsultationWizard({ onComplete, onBack }: Props) {
     return () => clearTimeout(timer);
   }, [step]);
 
+  // Uma página de advogados (filtrada por especialidade no servidor)
+  const fetchLawyersPage = async (topic: ServiceTopic, cursor: string | null) => {
+    const params = new URLSearchParams({ specialty: topic.name, view: 'card', limit: '20' });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`http://localhost:8000/api/v1/lawyers?${params}`);
+    const data = await response.json();
+    if (!data.success) return { lawyers: [] as Lawyer[], nextCursor: null };
+    return {
+      lawyers: (data.data || []) as Lawyer[],
+      nextCursor: data.pagination?.hasMore ? (data.pagination.nextCursor as string) : null
+    };
+  };
+
   const handleSelectTopic = async (topic: ServiceTopic) => {
     setSelectedTopic(topic);
     setStep('lawyer');
 
-    // Buscar advogados disponíveis
+    // Buscar a primeira página de advogados; as seguintes só a pedido
     setLoadingLawyers(true);
+    setLawyersCursor(null);
     try {
-      const response = await fetch(`http://localhost:8000/api/v1/lawyers?specialty=${encodeURIComponent(topic.name)}`);
-      const data = await response.json();
-      if (data.success) {
-        setAvailableLawyers(data.data || []);
-      }
+      const page = await fetchLawyersPage(topic, null);
+      setAvailableLawyers(page.lawyers);
+      setLawyersCursor(page.nextCursor);
     } catch (error) {
       console.error('Erro ao buscar advogados:', error);
       setAvailableLawyers([]);
@@ -64,6 +78,20 @@ export default function NewConsultationWizard({ onComplete, onBack }: Props) {
     }
   };
 
+  const handleLoadMoreLawyers = async () => {
+    if (!selectedTopic || !lawyersCursor || loadingMoreLawyers) return;
+    setLoadingMoreLawyers(true);
+    try {
+      const page = await fetchLawyersPage(selectedTopic, lawyersCursor);
+      setAvailableLawyers((current) => [...current, ...page.lawyers]);
+      setLawyersCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Erro ao buscar advogados:', error);
+    } finally {
+      setLoadingMoreLawyers(false);
+    }
+  };
+
   const handleSelectLawyer = (lawyer: Lawyer | 'auto') => {
     setSelectedLawyer(lawyer);
     setStep('package');
@@ -225,6 +253,21 @@ export default function NewConsultationWizard({ onComplete, onBack }: Props) {
             </div>
           </div>
         );
+      case 'lawyer':
+        return (
+          <div className={`transition-all duration-500 ease-out transform ${animationClass}`}>
+            <LawyerSelection
+              lawyers={availableLawyers}
+              loading={loadingLawyers}
+              onSelectLawyer={handleSelectLawyer}
+              onSelectAuto={() => handleSelectLawyer('auto')}
+              topicName={selectedTopic?.name || ''}
+              hasMore={lawyersCursor !== null}
+              loadingMore={loadingMoreLawyers}
+              onLoadMore={handleLoadMoreLawyers}
+            />
+          </div>
+        );
       case 'package':
         return (
           <div className={`transition-all duration-500 ease-out transform ${animationClass}`}>